@@ -0,0 +1,179 @@
+
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from benchmarks.synthetic import SyntheticIPLGenerator
+from etl.extract import DataExtractor
+from etl.logs import configure_logging
+from etl.metrics import RunMetrics, stage
+from etl.parallel import ParallelTransformer
+from etl.transform import DataTransformer
+import logging
+
+logger = logging.getLogger('benchmarks')
+
+BENCH_DIR = Path(__file__).parent
+
+
+def dataset_path(data_dir, scale, seed):
+    path = Path(data_dir) / f"synthetic_x{scale:g}_seed{seed}.csv"
+    if not path.exists():
+        logger.info(f"Generating {path}...")
+        SyntheticIPLGenerator(scale=scale, seed=seed).generate(path)
+    return path
+
+
+def run_scale(csv_path, load=True, load_method='copy', marts=True, transform_workers=1):
+    """Run the ETL once, collecting the same stage metrics as a pipeline run"""
+    metrics = RunMetrics(source_file=str(csv_path))
+    metrics.activate()
+    rows = None
+    status = 'failed'
+    try:
+        with stage('extract') as step:
+            df = DataExtractor(str(csv_path)).extract()
+            step.rows_out = len(df)
+        rows = len(df)
+
+        # DataTransformer records each of its _* steps as transform.<step>;
+        # the sharded transform records transform.shard/wait/stitch instead
+        with stage('transform', rows_in=rows) as step:
+            if transform_workers == 1:
+                transformed_df = DataTransformer(df, copy=False).transform()
+            else:
+                with ParallelTransformer(workers=transform_workers or None) as transformer:
+                    transformed_df = transformer.transform(df)
+            step.rows_out = len(transformed_df)
+        del df
+
+        if load:
+            from etl.load import DataLoader
+
+            loader = DataLoader(load_method=load_method)
+            with stage('load_dimensions', rows_in=rows):
+                loader.load_dimensions(transformed_df)
+            with stage('load_facts', rows_in=rows):
+                loader.load_facts(transformed_df)
+            if marts:
+                with stage('refresh_marts'):
+                    loader.refresh_marts()
+        status = 'success'
+    finally:
+        metrics.finish(status, rows_processed=rows)
+
+    for name, entry in metrics.stages.items():
+        logger.info(f"  {name:45} {entry['seconds']:9.3f}s  rss {entry['peak_rss_mb']} MB")
+    return {'rows': rows, 'stages': metrics.as_dict()['stages']}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=BENCH_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform()
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage ratios against the baseline, return the regressed stages"""
+    regressions = []
+    for scale, run in results['scales'].items():
+        base_run = baseline.get('scales', {}).get(scale)
+        if not base_run:
+            logger.warning(f"Baseline has no results for scale {scale}")
+            continue
+
+        print(f"\nScale {scale} ({run['rows']:,} rows) vs baseline {baseline.get('git_commit')}:")
+        print(f"  {'stage':45} {'baseline':>10} {'current':>10} {'change':>8}")
+        for name, current in run['stages'].items():
+            base = base_run['stages'].get(name)
+            if not base or not base['seconds']:
+                continue
+            change = current['seconds'] / base['seconds'] - 1
+            # Ignore noise on stages that take a few milliseconds
+            regressed = change > threshold and current['seconds'] - base['seconds'] > 0.05
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {name:45} {base['seconds']:9.3f}s {current['seconds']:9.3f}s {change:+7.1%}{flag}")
+            if regressed:
+                regressions.append((scale, name, change))
+    return regressions
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Benchmark the IPL ETL stages on synthetic data')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0],
+                       help='Dataset sizes relative to the real data (e.g. 1 10 100)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed of the synthetic data generator')
+    parser.add_argument('--data-dir', default=str(BENCH_DIR / 'data'),
+                       help='Where generated datasets are kept between runs')
+    parser.add_argument('--output', default=None,
+                       help='Results JSON (default: benchmarks/results/bench_<timestamp>.json)')
+    parser.add_argument('--baseline', default=str(BENCH_DIR / 'baseline.json'),
+                       help='Baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                       help='Relative slowdown reported as a regression')
+    parser.add_argument('--skip-load', action='store_true',
+                       help='Only benchmark extract and transform (no database needed)')
+    parser.add_argument('--skip-marts', action='store_true',
+                       help='Do not refresh the marts after loading')
+    parser.add_argument('--load-method', choices=['copy', 'batch'], default='copy')
+    parser.add_argument('--transform-workers', type=int, default=1,
+                       help='Processes for the match-sharded transform (0 = one per core)')
+    parser.add_argument('--verbose', action='store_true', help='Show the ETL log output')
+
+    args = parser.parse_args(argv)
+
+    configure_logging(level=logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    results = {**environment(), 'seed': args.seed, 'load_method': args.load_method,
+               'transform_workers': args.transform_workers, 'scales': {}}
+    for scale in args.scales:
+        csv_path = dataset_path(args.data_dir, scale, args.seed)
+        logger.info(f"Scale {scale:g}: {csv_path}")
+        results['scales'][f"{scale:g}"] = run_scale(
+            csv_path, load=not args.skip_load, load_method=args.load_method, marts=not args.skip_marts,
+            transform_workers=args.transform_workers
+        )
+
+    output = Path(args.output or BENCH_DIR / 'results' / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"Results written to {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        logger.info(f"Baseline saved to {baseline_path}")
+        return
+
+    if baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stages regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+    else:
+        logger.info(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+
+
+if __name__ == "__main__":
+    main()
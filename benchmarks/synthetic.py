@@ -0,0 +1,263 @@
+import csv
+import logging
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BASE_MATCHES = 1169
+SEASONS = list(range(2008, 2024))
+
+COLUMNS = [
+    'match_id', 'date', 'match_type', 'event_name', 'innings', 'batting_team',
+    'bowling_team', 'over', 'ball', 'ball_no', 'batter', 'bat_pos', 'runs_batter',
+    'balls_faced', 'bowler', 'valid_ball', 'runs_extras', 'runs_total',
+    'runs_bowler', 'runs_not_boundary', 'extra_type', 'non_striker',
+    'non_striker_pos', 'wicket_kind', 'player_out', 'fielders', 'runs_target',
+    'review_batter', 'team_reviewed', 'review_decision', 'umpire',
+    'umpires_call', 'player_of_match', 'match_won_by', 'win_outcome',
+    'toss_winner', 'toss_decision', 'venue', 'city', 'day', 'month', 'year',
+    'season', 'gender', 'team_type', 'superover_winner', 'result_type',
+    'method', 'balls_per_over', 'overs', 'event_match_no', 'stage',
+    'match_number', 'team_runs', 'team_balls', 'team_wicket', 'new_batter',
+    'batter_runs', 'batter_balls', 'bowler_wicket', 'batting_partners',
+    'next_batter', 'striker_out'
+]
+
+TEAM_NAMES = [
+    'Chennai Super Kings', 'Mumbai Indians', 'Royal Challengers Bangalore',
+    'Kolkata Knight Riders', 'Delhi Capitals', 'Punjab Kings',
+    'Rajasthan Royals', 'Sunrisers Hyderabad', 'Gujarat Titans',
+    'Lucknow Super Giants'
+]
+
+VENUES = [
+    ('Wankhede Stadium', 'Mumbai'), ('MA Chidambaram Stadium', 'Chennai'),
+    ('Eden Gardens', 'Kolkata'), ('M Chinnaswamy Stadium', 'Bangalore'),
+    ('Arun Jaitley Stadium', 'Delhi'), ('Sawai Mansingh Stadium', 'Jaipur'),
+    ('Rajiv Gandhi International Stadium', 'Hyderabad'),
+    ('Narendra Modi Stadium', 'Ahmedabad'), ('Sharjah Cricket Stadium', None),
+    ('Dubai International Cricket Stadium', None)
+]
+
+WICKET_KINDS = ['caught', 'bowled', 'lbw', 'run out', 'stumped', 'caught and bowled']
+
+RUN_WEIGHTS = [(0, 36), (1, 37), (2, 7), (3, 1), (4, 12), (6, 5)]
+
+
+class SyntheticIPLGenerator:
+    """Deterministic IPL ball-by-ball CSV in the layout of the real dataset.
+    
+    The output depends only on scale and seed; scale=1.0 gives as many
+    matches (~278K deliveries) as the real file.
+    """
+
+    def __init__(self, scale=1.0, seed=42, players_per_team=25, umpires=47):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.n_matches = max(1, int(round(BASE_MATCHES * scale)))
+        self.squads = {
+            team: [f"{team.split()[0][0]}{team.split()[-1][0]} Player {i + 1:02d}"
+                   for i in range(players_per_team)]
+            for team in TEAM_NAMES
+        }
+        self.umpires = [f"Umpire {i + 1:02d}" for i in range(umpires)]
+
+    def _pick_runs(self):
+        r = self.rng.random() * 98
+        for runs, weight in RUN_WEIGHTS:
+            if r < weight:
+                return runs
+            r -= weight
+        return 0
+
+    def generate(self, output_path):
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Generating {self.n_matches} synthetic matches (scale={self.scale}) into {output_path}")
+
+        per_season = self.n_matches / len(SEASONS)
+        total_rows = 0
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for i in range(self.n_matches):
+                season_idx = min(int(i / per_season), len(SEASONS) - 1)
+                rows = self._generate_match(i, SEASONS[season_idx], i - int(season_idx * per_season))
+                writer.writerows(rows)
+                total_rows += len(rows)
+
+        logger.info(f"Generated {total_rows:,} rows")
+        return total_rows
+
+    def _generate_match(self, index, year, number_in_season):
+        rng = self.rng
+        match_id = 335982 + index
+        match_date = date(year, 4, 1) + timedelta(days=number_in_season // 2)
+        team1, team2 = rng.sample(TEAM_NAMES, 2)
+        venue, city = rng.choice(VENUES)
+        umpire = rng.choice(self.umpires)
+        toss_winner = rng.choice([team1, team2])
+        toss_decision = rng.choice(['bat', 'field'])
+        season = f"{year - 1}/{str(year)[2:]}" if year in (2008, 2010, 2020) else str(year)
+
+        match_ctx = {
+            'match_id': match_id, 'date': match_date.isoformat(), 'match_type': 'T20',
+            'event_name': 'Indian Premier League', 'umpire': umpire,
+            'toss_winner': toss_winner, 'toss_decision': toss_decision,
+            'venue': venue, 'city': city, 'day': match_date.day,
+            'month': match_date.month, 'year': year, 'season': season,
+            'gender': 'male', 'team_type': 'club', 'balls_per_over': 6,
+            'overs': 20, 'event_match_no': number_in_season + 1,
+            'stage': 'Final' if number_in_season == 0 else 'Unknown',
+            'match_number': number_in_season + 1 if number_in_season % 17 else 'Unknown',
+        }
+
+        innings1, total1 = self._generate_innings(1, team1, team2, None)
+        innings2, total2 = self._generate_innings(2, team2, team1, total1 + 1)
+        if total1 > total2:
+            winner, outcome = team1, f"{total1 - total2} runs"
+        elif total2 > total1:
+            winner, outcome = team2, "wickets"
+        else:
+            winner, outcome = None, 'tie'
+        pom_team = winner or team1
+        match_ctx.update({
+            'match_won_by': winner if winner else 'Unknown',
+            'win_outcome': outcome,
+            'player_of_match': rng.choice(self.squads[pom_team][:11]),
+            'result_type': 'tie' if winner is None else None,
+        })
+
+        rows = []
+        for ball in innings1 + innings2:
+            ball.update(match_ctx)
+            rows.append([ball.get(col) for col in COLUMNS])
+        return rows
+
+    def _generate_innings(self, innings, batting_team, bowling_team, target):
+        rng = self.rng
+        batters = rng.sample(self.squads[batting_team], 11)
+        bowlers = rng.sample(self.squads[bowling_team], 6)
+        fielders = self.squads[bowling_team]
+
+        striker, non_striker = 0, 1
+        next_in = 2
+        positions = {0: 1, 1: 2}
+        batter_runs = [0] * 11
+        batter_balls = [0] * 11
+        bowler_wickets = {b: 0 for b in bowlers}
+        team_runs = team_balls = team_wicket = 0
+        rows = []
+
+        for over in range(20):
+            bowler = bowlers[(over * 7 + innings) % len(bowlers)]
+            legal = 0
+            ball = 0
+            while legal < 6:
+                ball += 1
+                extra_type = None
+                runs_extras = 0
+                runs_batter = 0
+                valid = True
+                r = rng.random()
+                if r < 0.03:
+                    extra_type, runs_extras, valid = 'wides', 1, False
+                elif r < 0.037:
+                    extra_type, runs_extras, valid = 'noballs', 1, False
+                    runs_batter = self._pick_runs()
+                elif r < 0.05:
+                    extra_type, runs_extras = rng.choice(['legbyes', 'byes']), rng.choice([1, 1, 2, 4])
+                else:
+                    runs_batter = self._pick_runs()
+
+                wicket_kind = player_out = fielder = None
+                striker_out = False
+                if valid and runs_batter == 0 and rng.random() < 0.13:
+                    wicket_kind = rng.choice(WICKET_KINDS)
+                    out_idx = non_striker if wicket_kind == 'run out' and rng.random() < 0.3 else striker
+                    player_out = batters[out_idx]
+                    striker_out = out_idx == striker
+                    if wicket_kind in ('caught', 'run out', 'stumped'):
+                        fielder = rng.choice(fielders)
+                    if wicket_kind != 'run out':
+                        bowler_wickets[bowler] += 1
+
+                runs_total = runs_batter + runs_extras
+                runs_bowler = runs_batter + (runs_extras if extra_type in ('wides', 'noballs') else 0)
+                team_runs += runs_total
+                if valid:
+                    team_balls += 1
+                    legal += 1
+                if extra_type != 'wides':
+                    batter_balls[striker] += 1
+                batter_runs[striker] += runs_batter
+                if wicket_kind:
+                    team_wicket += 1
+
+                next_batter = None
+                if wicket_kind and team_wicket < 10 and next_in < 11:
+                    next_batter = batters[next_in]
+
+                rows.append({
+                    'innings': innings, 'batting_team': batting_team,
+                    'bowling_team': bowling_team, 'over': over, 'ball': ball,
+                    'ball_no': f"{over}.{ball}", 'batter': batters[striker],
+                    'bat_pos': positions[striker], 'runs_batter': runs_batter,
+                    'balls_faced': 0 if extra_type == 'wides' else 1,
+                    'bowler': bowler, 'valid_ball': int(valid),
+                    'runs_extras': runs_extras, 'runs_total': runs_total,
+                    'runs_bowler': runs_bowler,
+                    'runs_not_boundary': runs_batter not in (4, 6),
+                    'extra_type': extra_type, 'non_striker': batters[non_striker],
+                    'non_striker_pos': positions[non_striker],
+                    'wicket_kind': wicket_kind, 'player_out': player_out,
+                    'fielders': fielder, 'runs_target': target,
+                    'team_runs': team_runs, 'team_balls': team_balls,
+                    'team_wicket': team_wicket,
+                    'new_batter': next_batter,
+                    'batter_runs': batter_runs[striker],
+                    'batter_balls': batter_balls[striker],
+                    'bowler_wicket': bowler_wickets[bowler],
+                    'batting_partners': f"('{batters[striker]}', '{batters[non_striker]}')",
+                    'next_batter': next_batter, 'striker_out': striker_out,
+                })
+
+                if wicket_kind:
+                    if team_wicket >= 10 or next_in >= 11:
+                        return rows, team_runs
+                    out_idx = striker if striker_out else non_striker
+                    positions[next_in] = next_in + 1
+                    if out_idx == striker:
+                        striker = next_in
+                    else:
+                        non_striker = next_in
+                    next_in += 1
+                elif (runs_batter + (runs_extras if extra_type in ('byes', 'legbyes') else 0)) % 2 == 1:
+                    striker, non_striker = non_striker, striker
+
+                if target is not None and team_runs >= target:
+                    return rows, team_runs
+            striker, non_striker = non_striker, striker
+
+        return rows, team_runs
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic IPL ball-by-ball CSV')
+    parser.add_argument('output', help='Path of the CSV to write')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help=f'Size relative to the real dataset ({BASE_MATCHES} matches, ~278K rows)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed, same file')
+
+    args = parser.parse_args()
+    SyntheticIPLGenerator(scale=args.scale, seed=args.seed).generate(args.output)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
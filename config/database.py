@@ -1,36 +1,180 @@
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Named engine profiles: pool sizing plus server settings applied to every
+# connection of the pool (libpq 'options', so no extra round trip per checkout).
+#   bulk_load - ETL writes. synchronous_commit=off only risks losing the last
+#               commits on a server crash, never corrupts; a rerun reloads them.
+#   read      - mart queries, validation and reports
+ENGINE_PROFILES = {
+    'default': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'settings': {}
+    },
+    'bulk_load': {
+        'pool_size': 8,
+        'max_overflow': 8,
+        'settings': {
+            'synchronous_commit': 'off',
+            'work_mem': os.getenv('DB_LOAD_WORK_MEM', '256MB'),
+            'maintenance_work_mem': os.getenv('DB_LOAD_MAINTENANCE_WORK_MEM', '512MB'),
+            'statement_timeout': os.getenv('DB_LOAD_STATEMENT_TIMEOUT', '30min')
+        }
+    },
+    'read': {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'settings': {
+            'work_mem': os.getenv('DB_READ_WORK_MEM', '64MB'),
+            'statement_timeout': os.getenv('DB_READ_STATEMENT_TIMEOUT', '2min')
+        }
+    }
+}
+
+
+class PoolMetrics:
+    """Checkout counters of one engine's pool.
+
+    Checkout latency is the time to get a connection from the pool,
+    including opening a new one. A checkout waits when every connection
+    of the pool (overflow included) was in use at the time of the request.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, seconds, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def as_dict(self, pool):
+        with self._lock:
+            return {
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'avg_checkout_ms': round(self.checkout_seconds * 1000 / self.checkouts, 3) if self.checkouts else None,
+                'max_checkout_ms': round(self.max_checkout_seconds * 1000, 3),
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool timing every checkout into its PoolMetrics"""
+
+    metrics = None
+
+    def _do_get(self):
+        exhausted = self.checkedout() >= self.size() + max(self._max_overflow, 0)
+        start = time.perf_counter()
+        connection = super()._do_get()
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - start, exhausted)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
 class DatabaseConfig:
 
-    
+
     def __init__(self):
         self.host = os.getenv('DB_HOST', 'localhost')
         self.port = os.getenv('DB_PORT', '5432')
         self.database = os.getenv('DB_NAME', 'ipl_analytics')
         self.user = os.getenv('DB_USER', 'postgres')
         self.password = os.getenv('DB_PASSWORD', '26557')
-        
+        self._engines = {}
+        self._engines_lock = threading.Lock()
+        self._pid = os.getpid()
+
     @property
     def connection_string(self):
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
-    
-    def get_engine(self):
-        return create_engine(
+
+    def get_engine(self, profile='default'):
+        """Shared engine of profile (see ENGINE_PROFILES), created on first use"""
+        if profile not in ENGINE_PROFILES:
+            raise ValueError(f"Unknown engine profile '{profile}', expected one of {sorted(ENGINE_PROFILES)}")
+
+        with self._engines_lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's connections are not ours to use or close
+                for engine in self._engines.values():
+                    engine.dispose(close=False)
+                self._engines.clear()
+                self._pid = os.getpid()
+
+            key = (profile, self.connection_string)
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._create_engine(profile)
+                self._engines[key] = engine
+            return engine
+
+    def _create_engine(self, profile):
+        config = ENGINE_PROFILES[profile]
+        options = ' '.join(f"-c {name}={value}" for name, value in config['settings'].items())
+        engine = create_engine(
             self.connection_string,
+            poolclass=MeteredQueuePool,
             pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            connect_args={'options': options} if options else {}
         )
-    
-    def get_session(self):
-        engine = self.get_engine()
-        Session = sessionmaker(bind=engine)
+        metrics = PoolMetrics()
+        engine.pool.metrics = metrics
+        event.listen(engine, 'connect', lambda dbapi_connection, record: metrics.record_connect())
+        return engine
+
+    def pool_stats(self):
+        """{profile: pool metrics} of every engine created in this process"""
+        with self._engines_lock:
+            return {profile: engine.pool.metrics.as_dict(engine.pool)
+                    for (profile, _), engine in self._engines.items()}
+
+    def dispose(self):
+        """Close every pooled connection and forget the engines"""
+        with self._engines_lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+    def get_session(self, profile='default'):
+        # The ORM is only needed here, keep it out of every command's startup
+        from sqlalchemy.orm import sessionmaker
+
+        Session = sessionmaker(bind=self.get_engine(profile))
         return Session()
 
-db_config = DatabaseConfig()
\ No newline at end of file
+db_config = DatabaseConfig()
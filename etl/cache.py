@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # optional dependency, only needed when caching is enabled
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+class FrameCache:
+    """Columnar (Arrow IPC / Feather v2) cache of frames derived from a CSV.
+
+    Entries are keyed on the source file's size, mtime and SHA-256. A size
+    and mtime match is trusted as is; if only the mtime moved the content
+    hash decides, so a touched but unchanged file still hits. Files are
+    written uncompressed so a hit can be memory-mapped instead of decoded.
+    """
+
+    def __init__(self, cache_dir):
+        if feather is None:
+            raise ImportError("pyarrow is required for the staging cache (pip install pyarrow)")
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, name, source_path):
+        stem = f"{Path(source_path).stem}.{name}"
+        return self.cache_dir / f"{stem}.arrow", self.cache_dir / f"{stem}.json"
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self, name, source_path, variant=''):
+        """Return the cached frame, or None on a miss"""
+        data_path, manifest_path = self._paths(name, source_path)
+        if not data_path.exists() or not manifest_path.exists():
+            logger.info(f"Cache miss for {name}: no cached copy")
+            return None
+
+        manifest = json.loads(manifest_path.read_text())
+        stat = Path(source_path).stat()
+
+        if manifest.get('version') != CACHE_FORMAT_VERSION or manifest.get('variant') != variant:
+            logger.info(f"Cache miss for {name}: built with different options")
+            return None
+
+        if manifest['size'] != stat.st_size:
+            logger.info(f"Cache miss for {name}: source size changed")
+            return None
+
+        if manifest['mtime_ns'] != stat.st_mtime_ns:
+            if self._hash_file(source_path) != manifest['sha256']:
+                logger.info(f"Cache miss for {name}: source content changed")
+                return None
+            manifest['mtime_ns'] = stat.st_mtime_ns
+            manifest_path.write_text(json.dumps(manifest, indent=2))
+
+        df = feather.read_table(data_path, memory_map=True).to_pandas()
+        logger.info(f"Cache hit for {name}: {len(df)} rows from {data_path}")
+        return df
+
+    def store(self, name, source_path, df, variant=''):
+        """Write df to the cache; failures are logged and never fatal"""
+        data_path, manifest_path = self._paths(name, source_path)
+        stat = Path(source_path).stat()
+        tmp_path = data_path.with_suffix('.arrow.tmp')
+
+        try:
+            feather.write_feather(
+                df.reset_index(drop=True),
+                tmp_path,
+                compression='uncompressed'
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache {name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+        tmp_path.replace(data_path)
+        manifest = {
+            'version': CACHE_FORMAT_VERSION,
+            'variant': variant,
+            'source': str(source_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self._hash_file(source_path),
+            'rows': len(df),
+            'created_at': datetime.now().isoformat()
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+
+        logger.info(f"Cached {name} ({len(df)} rows) at {data_path}")
+        return True
@@ -0,0 +1,422 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # optional dependency, only the embedded warehouse needs it
+    duckdb = None
+
+from .load import DIMENSION_KEYS, DIMENSION_TABLES, FACT_TABLES, FLAG_COLUMNS
+from .marts import MARTS, load_mart_definitions
+from .metrics import stage
+from .migrations import INDEX_STATEMENT, MIGRATIONS_DIR, SQL_DIR, VERSIONED_MIGRATIONS, split_statements
+from .staging import DIMENSION_COLUMNS, DIMENSION_SELECTS, FACT_SQL, STAGING_TABLE, check_fact_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE = 'data/ipl.duckdb'
+
+# The warehouse DDL files the embedded copy is built from (run history stays
+# in Postgres), followed by sql/migrations/*.sql
+EMBEDDED_MIGRATIONS = [name for name in VERSIONED_MIGRATIONS if name != 'create_run_history.sql']
+
+# Postgres-only statements with no DuckDB counterpart. Indexes are left out
+# as well: every mart is a full scan, which DuckDB runs column-wise on all
+# cores without them.
+SKIPPED_STATEMENTS = [
+    INDEX_STATEMENT,
+    re.compile(r'^COMMENT\s+ON\s+SCHEMA\s', re.IGNORECASE),
+    re.compile(r'^CREATE\s+TABLE\s+\w+\s+PARTITION\s+OF\s', re.IGNORECASE)
+]
+
+# (pattern, replacement) applied to every statement, DDL and queries alike.
+# Foreign keys are dropped because DuckDB checks them row by row and will
+# not empty a referenced table; the loads resolve every key by join anyway.
+# A bare NUMERIC (only staging has them) is DECIMAL(18,3) in DuckDB, which
+# would round the staged run rates twice on their way into DECIMAL(5,2).
+# Ten decimals keep the value Postgres parses from the float's text (9.825,
+# not 9.82499...), and 18 digits keep the casts on 64-bit integers.
+TRANSLATIONS = [
+    (re.compile(r'\bNUMERIC\b(?!\s*\()', re.IGNORECASE), 'DECIMAL(18, 10)'),
+    (re.compile(r'^(\s*CREATE\s+)UNLOGGED\s+', re.IGNORECASE), r'\1'),
+    (re.compile(r'\s*PARTITION\s+BY\s+RANGE\s*\(\w+\)', re.IGNORECASE), ''),
+    (re.compile(r'\s+REFERENCES\s+\w+\s*\(\w+\)', re.IGNORECASE), ''),
+    (re.compile(r"to_char\(([^,()]+), 'YYYYMMDD'\)"), r"strftime(\1, '%Y%m%d')"),
+    (re.compile(r"to_char\(([^,()]+), 'FMMonth'\)"), r"strftime(\1, '%B')")
+]
+
+# Keys of the fact tables are not declared: DuckDB keeps an index per key
+# up to date on every insert, which costs more than the fact inserts
+# themselves. load() rejects duplicate deliveries up front instead, as
+# StagingLoader does.
+FACT_KEYS = [
+    re.compile(r',\s*(?:CONSTRAINT\s+\w+\s+)?(?:PRIMARY\s+KEY|UNIQUE)\s*\([^)]*\)', re.IGNORECASE),
+    re.compile(r'\s+PRIMARY\s+KEY\b', re.IGNORECASE)
+]
+
+SQL_COMMENT = re.compile(r'--[^\n]*')
+SERIAL_COLUMN = re.compile(r'\b(\w+)\s+(BIG)?SERIAL\b', re.IGNORECASE)
+CREATE_TABLE = re.compile(r'^\s*CREATE\s+TABLE\s+(?:\w+\.)?(\w+)', re.IGNORECASE)
+
+# Serial surrogate key of each dimension that has one
+SERIAL_KEYS = {
+    'dim_player': 'player_id',
+    'dim_team': 'team_id',
+    'dim_venue': 'venue_id',
+    'dim_event': 'event_id',
+    'dim_umpire': 'umpire_id'
+}
+
+# Natural key of each mart's rows, used to line up the DuckDB and Postgres
+# rows in compare_marts (surrogate ids depend on the load history)
+MART_KEYS = {
+    'mart_death_over_specialists': ['player_name', 'season'],
+    'mart_powerplay_performers': ['player_name', 'season'],
+    'mart_pressure_performance': ['player_name', 'season', 'pressure_level'],
+    'mart_partnership_analysis': ['player1_name', 'player2_name', 'team_name', 'season'],
+    'mart_venue_analytics': ['venue_name', 'city', 'season'],
+    'mart_player_stats': ['player_name', 'season']
+}
+
+# The marts round to at most 2 decimals in Postgres NUMERIC. DuckDB computes
+# the same ratios in DOUBLE, so a value can land one unit either side.
+COMPARE_TOLERANCE = 0.01
+
+
+def translate(sql):
+    """Postgres statement -> DuckDB statements (none if it has no counterpart)"""
+    sql = sql.strip()
+    if any(pattern.match(sql) for pattern in SKIPPED_STATEMENTS):
+        return []
+    for pattern, replacement in TRANSLATIONS:
+        sql = pattern.sub(replacement, sql)
+
+    # SERIAL columns become a sequence default, named as Postgres names them
+    table = CREATE_TABLE.match(sql)
+    sequences = []
+    if table:
+        if table.group(1) in FACT_TABLES:
+            for pattern in FACT_KEYS:
+                sql = pattern.sub('', sql)
+        def serial(match):
+            sequence = f"{table.group(1)}_{match.group(1)}_seq"
+            sequences.append(f"CREATE SEQUENCE {sequence}")
+            column_type = 'BIGINT' if match.group(2) else 'INTEGER'
+            return f"{match.group(1)} {column_type} DEFAULT nextval('{sequence}')"
+        sql = SERIAL_COLUMN.sub(serial, sql)
+    return sequences + [sql]
+
+
+def warehouse_ddl(sql_dir=SQL_DIR):
+    """The warehouse DDL translated for DuckDB, as a list of statements"""
+    sql_dir = Path(sql_dir)
+    paths = [sql_dir / name for name in EMBEDDED_MIGRATIONS]
+    migrations_dir = sql_dir / MIGRATIONS_DIR.name
+    if migrations_dir.is_dir():
+        paths += sorted(migrations_dir.glob('*.sql'))
+
+    statements = []
+    for path in paths:
+        # Comments go first, some of them hold a ';'
+        sql = SQL_COMMENT.sub('', path.read_text(encoding='utf-8'))
+        for statement in split_statements(sql):
+            statements += translate(statement)
+    return statements
+
+
+class DuckDBWarehouse:
+    """The star schema and marts in an embedded DuckDB file, no Postgres needed.
+
+    Loads the transformed frame with the same set-based SQL as
+    StagingLoader (etl/staging.py), or a Parquet export of the star
+    schema, and builds the marts from sql/create_marts.sql. DuckDB runs
+    them vectorized on all cores (or on threads). The loader methods the
+    pipeline calls are here too, so it can stand in for DataLoader
+    (run_etl.py --target duckdb).
+    """
+
+    rebuild_indexes = False
+
+    def __init__(self, path=DEFAULT_DATABASE, threads=None):
+        if duckdb is None:
+            raise ImportError("duckdb is required for the embedded warehouse (pip install duckdb)")
+
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = duckdb.connect(self.path)
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        self.threads = self.conn.execute("SELECT current_setting('threads')").fetchone()[0]
+        # Integer / integer truncates in Postgres, the marts rely on it
+        self.conn.execute("SET integer_division = true")
+        # The mart definitions name the tables without their schema
+        self.conn.execute("CREATE SCHEMA IF NOT EXISTS ipl_analytics")
+        self.conn.execute("SET search_path TO ipl_analytics")
+        self.workers = self.threads
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def has_schema(self):
+        return bool(self.conn.execute("""
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = 'ipl_analytics' AND table_name = 'fact_ball_delivery'
+        """).fetchone()[0])
+
+    def create_schema(self, conn=None):
+        """Drop and recreate both schemas from the warehouse DDL (the tables start empty)"""
+        conn = conn or self.conn
+        conn.execute("DROP SCHEMA IF EXISTS ipl_analytics CASCADE")
+        conn.execute("DROP SCHEMA IF EXISTS staging CASCADE")
+        for statement in warehouse_ddl():
+            conn.execute(statement)
+        conn.execute("SET search_path TO ipl_analytics")
+
+    def load(self, df, incremental=False, dimensions=True, facts=True):
+        """Load the transformed frame, as StagingLoader.load does into Postgres"""
+        if not (dimensions or facts):
+            return
+        if facts:
+            check_fact_rows(df)
+        start = time.perf_counter()
+        with self.transaction() as conn:
+            if not self.has_schema() or (dimensions and not incremental):
+                # A full dimension load also empties the facts (TRUNCATE ... CASCADE in Postgres)
+                self.create_schema(conn)
+            elif facts and not incremental:
+                for table in FACT_TABLES:
+                    conn.execute(f"DELETE FROM ipl_analytics.{table}")
+
+            self._stage(conn, df)
+            if dimensions:
+                for table in DIMENSION_TABLES:
+                    self._upsert_dimension(conn, table)
+            if facts:
+                if incremental:
+                    for table in FACT_TABLES:
+                        conn.execute(f"DELETE FROM ipl_analytics.{table} "
+                                     f"WHERE match_id IN (SELECT DISTINCT match_id FROM {STAGING_TABLE})")
+                for table in FACT_TABLES:
+                    self._insert_fact(conn, table)
+            conn.execute(f"DELETE FROM {STAGING_TABLE}")
+        logger.info(f"All tables loaded into {self.path} ({time.perf_counter() - start:.2f}s, "
+                    f"{self.threads} threads)")
+
+    def _stage(self, conn, df):
+        """Insert the columns staging.ball_delivery has, in frame order"""
+        with stage('load.staging', rows_in=len(df)) as metrics:
+            staged = [row[0] for row in conn.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'staging' AND table_name = 'ball_delivery'
+                ORDER BY ordinal_position
+            """).fetchall()]
+            columns = [col for col in staged if col in df.columns]
+            frame = pd.DataFrame({
+                'source_row': np.arange(len(df), dtype='int64'),
+                **{col: df[col].astype(bool) if col in FLAG_COLUMNS else df[col] for col in columns}
+            })
+            # DuckDB scans the registered frame in place, no CSV round trip
+            conn.register('staged_frame', frame)
+            try:
+                conn.execute(f"INSERT INTO {STAGING_TABLE} BY NAME SELECT * FROM staged_frame")
+            finally:
+                conn.unregister('staged_frame')
+            metrics.rows_out = len(df)
+
+    def _upsert_dimension(self, conn, table):
+        with stage(f"load.{table}") as metrics:
+            columns = DIMENSION_COLUMNS[table]
+            select = ', '.join(f"s.{col}" for col in columns)
+            key_match = ' AND '.join(f"t.{key} IS NOT DISTINCT FROM s.{key}" for key in DIMENSION_KEYS[table])
+            if table in SERIAL_KEYS:
+                # nextval() runs ahead of the ORDER BY in DuckDB, so the keys
+                # are numbered explicitly, in sort_key order
+                id_col = SERIAL_KEYS[table]
+                columns = [id_col] + columns
+                select = (f"(SELECT COALESCE(MAX({id_col}), 0) FROM ipl_analytics.{table}) "
+                          f"+ row_number() OVER (ORDER BY s.sort_key), {select}")
+            before = self._count(conn, table)
+            conn.execute(translate(f"""
+                INSERT INTO ipl_analytics.{table} ({', '.join(columns)})
+                SELECT {select} FROM ({DIMENSION_SELECTS[table]}) s
+                WHERE NOT EXISTS (SELECT 1 FROM ipl_analytics.{table} t WHERE {key_match})
+            """)[0])
+            metrics.rows_out = self._count(conn, table) - before
+        logger.info(f"Loaded {metrics.rows_out} rows into {table}")
+
+    def _insert_fact(self, conn, table):
+        with stage(f"load.{table}") as metrics:
+            before = self._count(conn, table)
+            conn.execute(translate(FACT_SQL[table])[0])
+            metrics.rows_out = self._count(conn, table) - before
+        logger.info(f"Loaded {metrics.rows_out} {table} rows")
+
+    @staticmethod
+    def _count(conn, table):
+        return conn.execute(f"SELECT COUNT(*) FROM ipl_analytics.{table}").fetchone()[0]
+
+    def load_parquet(self, directory):
+        """Rebuild the star schema from <table>.parquet files (see export_parquet).
+
+        Surrogate ids are taken as they are, so the file is meant for
+        building marts: a later incremental load would reuse them.
+        """
+        directory = Path(directory)
+        tables = DIMENSION_TABLES + FACT_TABLES
+        missing = [table for table in tables if not (directory / f"{table}.parquet").exists()]
+        if missing:
+            raise FileNotFoundError(f"No Parquet file for {', '.join(missing)} in {directory}")
+
+        with self.transaction() as conn:
+            self.create_schema(conn)
+            for table in tables:
+                with stage(f"load.{table}") as metrics:
+                    conn.execute(f"INSERT INTO ipl_analytics.{table} BY NAME SELECT * FROM read_parquet(?)",
+                                 [str(directory / f"{table}.parquet")])
+                    metrics.rows_out = self._count(conn, table)
+        logger.info(f"Loaded the star schema from {directory}")
+
+    def export_parquet(self, directory):
+        """Write every dimension and fact table to directory/<table>.parquet"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for table in DIMENSION_TABLES + FACT_TABLES:
+            self.conn.execute(f"COPY ipl_analytics.{table} TO '{directory / table}.parquet' (FORMAT parquet)")
+        logger.info(f"Exported the star schema to {directory}")
+
+    def build_marts(self, marts=None):
+        """(Re)create the marts as tables from the definitions in sql/create_marts.sql"""
+        definitions = load_mart_definitions()
+        timings = {}
+        for mart in marts or MARTS:
+            start = time.perf_counter()
+            with stage(f"mart.{mart}") as metrics:
+                self.conn.execute(f"CREATE OR REPLACE TABLE ipl_analytics.{mart} AS {definitions[mart]}")
+                metrics.rows_out = self._count(self.conn, mart)
+            timings[mart] = time.perf_counter() - start
+            logger.info(f"✓ {mart}: {metrics.rows_out:,} rows ({timings[mart]:.2f}s)")
+        return timings
+
+    def read_mart(self, mart):
+        return self.conn.execute(f"SELECT * FROM ipl_analytics.{mart}").df()
+
+    def compare_marts(self, engine=None, marts=None, tolerance=COMPARE_TOLERANCE):
+        """Compare each mart with the Postgres one (engine: the 'read' profile by default).
+
+        Rows are matched on MART_KEYS. Returns {mart: counts of rows only in
+        DuckDB, only in Postgres, and matched rows with a differing value};
+        the marts agree when all three are 0. Both sides are expected to
+        hold a full load of the same source.
+        """
+        from sqlalchemy import text
+        from config.database import db_config
+
+        engine = engine or db_config.get_engine('read')
+        results = {}
+        for mart in marts or MARTS:
+            local = self.read_mart(mart)
+            with engine.connect() as conn:
+                remote = pd.read_sql(text(f"SELECT * FROM ipl_analytics.{mart}"), conn)
+            results[mart] = compare_frames(local, remote, MART_KEYS[mart], tolerance)
+            result = results[mart]
+            status = '✓' if not any(result[k] for k in ('only_duckdb', 'only_postgres', 'mismatched')) else '✗'
+            logger.info(f"{status} {mart}: {result['rows']:,} rows, {result['only_duckdb']} only in DuckDB, "
+                        f"{result['only_postgres']} only in Postgres, {result['mismatched']} differing"
+                        + (f" ({', '.join(result['columns'])})" if result['columns'] else ''))
+        return results
+
+    # Loader interface used by IPLDataPipeline
+
+    def refresh_marts(self, workers=None, concurrently=None, match_ids=None, warm_cache=False):
+        """Rebuild every mart (match_ids is ignored, a rebuild takes seconds here)"""
+        return self.build_marts()
+
+    def get_loaded_match_ids(self):
+        if not self.has_schema():
+            return set()
+        rows = self.conn.execute("SELECT DISTINCT match_id FROM ipl_analytics.fact_ball_delivery").fetchall()
+        return {row[0] for row in rows}
+
+    def truncate_tables(self, dimensions=True, facts=True):
+        if dimensions or not self.has_schema():
+            self.create_schema()
+        elif facts:
+            for table in FACT_TABLES:
+                self.conn.execute(f"DELETE FROM ipl_analytics.{table}")
+
+    @contextmanager
+    def bulk_load_indexes(self, enabled=True):
+        yield
+
+    def reload_season(self, df, year):
+        raise ValueError("Season reloads need the Postgres warehouse")
+
+
+def export_postgres_parquet(directory, engine=None):
+    """Write the Postgres star schema to directory/<table>.parquet (for load_parquet)"""
+    from sqlalchemy import text
+    from config.database import db_config
+
+    engine = engine or db_config.get_engine('read')
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for table in DIMENSION_TABLES + FACT_TABLES:
+        with stage(f"export.{table}") as metrics:
+            with engine.connect() as conn:
+                df = pd.read_sql(text(f"SELECT * FROM ipl_analytics.{table}"), conn)
+            df.to_parquet(directory / f"{table}.parquet", index=False)
+            metrics.rows_out = len(df)
+    logger.info(f"Exported the Postgres star schema to {directory}")
+
+
+def compare_frames(local, remote, keys, tolerance=COMPARE_TOLERANCE):
+    """Outer join two versions of a mart on keys and count the differences.
+
+    Surrogate id columns are left out. Numbers are equal within tolerance,
+    everything else exactly (NULL equal to NULL).
+    """
+    columns = [col for col in local.columns if col in remote.columns and not col.endswith('_id')]
+    local, remote = local[columns], remote[columns]
+    merged = local.merge(remote, on=keys, how='outer', suffixes=('_duckdb', '_postgres'), indicator=True)
+    both = merged[merged['_merge'] == 'both']
+
+    differing = set()
+    mismatched = np.zeros(len(both), dtype=bool)
+    for col in columns:
+        if col in keys:
+            continue
+        a, b = both[f"{col}_duckdb"], both[f"{col}_postgres"]
+        numeric_a, numeric_b = pd.to_numeric(a, errors='coerce'), pd.to_numeric(b, errors='coerce')
+        if numeric_a.notna().sum() == a.notna().sum() and numeric_b.notna().sum() == b.notna().sum():
+            equal = np.isclose(numeric_a.astype('float64'), numeric_b.astype('float64'),
+                               rtol=0, atol=tolerance + 1e-9, equal_nan=True)
+        else:
+            equal = ((a == b) | (a.isna() & b.isna())).to_numpy()
+        if not equal.all():
+            differing.add(col)
+            mismatched |= ~equal
+
+    return {
+        'rows': len(local),
+        'postgres_rows': len(remote),
+        'only_duckdb': int((merged['_merge'] == 'left_only').sum()),
+        'only_postgres': int((merged['_merge'] == 'right_only').sum()),
+        'mismatched': int(mismatched.sum()),
+        'columns': sorted(differing)
+    }
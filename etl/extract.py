@@ -1,14 +1,79 @@
 
 import pandas as pd
+import numpy as np
 import logging
 from pathlib import Path
 
+from .cache import FrameCache
+
 logger = logging.getLogger(__name__)
 
+# Text columns of the source CSV. Pinned to str when streaming so every chunk
+# gets the same dtype (per-chunk inference turns e.g. season into int64 in a
+# chunk without any '2007/08'-style values)
+STRING_COLUMNS = [
+    'match_type', 'event_name', 'batting_team', 'bowling_team', 'batter',
+    'bowler', 'extra_type', 'non_striker', 'wicket_kind', 'player_out',
+    'fielders', 'review_batter', 'team_reviewed', 'review_decision', 'umpire',
+    'player_of_match', 'match_won_by', 'win_outcome', 'toss_winner',
+    'toss_decision', 'venue', 'city', 'season', 'gender', 'team_type',
+    'superover_winner', 'result_type', 'method', 'stage', 'match_number',
+    'new_batter', 'batting_partners', 'next_batter'
+]
+
+# Narrow dtypes for the numeric columns. Columns that contain NaN are
+# switched to the matching nullable extension type instead of float64.
+# ball_no is left out: in the source it is the decimal over.ball notation.
+COMPACT_DTYPES = {
+    'match_id': 'int32',
+    'innings': 'int8',
+    'over': 'int8',
+    'ball': 'int8',
+    'bat_pos': 'int8',
+    'non_striker_pos': 'int8',
+    'runs_batter': 'int8',
+    'balls_faced': 'int8',
+    'runs_extras': 'int8',
+    'runs_total': 'int8',
+    'runs_bowler': 'int8',
+    'valid_ball': 'bool',
+    'runs_target': 'int16',
+    'team_runs': 'int16',
+    'team_balls': 'int16',
+    'team_wicket': 'int8',
+    'batter_runs': 'int16',
+    'batter_balls': 'int16',
+    'bowler_wicket': 'int8',
+    'balls_per_over': 'int8',
+    'overs': 'int8'
+}
+
+NULLABLE_DTYPES = {
+    'int8': 'Int8',
+    'int16': 'Int16',
+    'int32': 'Int32',
+    'bool': 'boolean'
+}
+
+# Low-cardinality strings repeated on every ball
+CATEGORY_COLUMNS = [
+    'batter', 'bowler', 'non_striker', 'player_out', 'next_batter',
+    'batting_team', 'bowling_team', 'toss_winner', 'match_won_by',
+    'player_of_match', 'venue', 'city', 'umpire', 'wicket_kind',
+    'extra_type', 'event_name', 'season', 'match_type', 'gender',
+    'team_type', 'toss_decision', 'stage'
+]
+
 class DataExtractor:
     
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, optimize_memory=False, cache_dir=None):
         self.csv_path = Path(csv_path)
+        self.optimize_memory = optimize_memory
+        self.cache = FrameCache(cache_dir) if cache_dir else None
+    
+    @property
+    def cache_variant(self):
+        return 'compact' if self.optimize_memory else 'default'
         
     def extract(self):
 
@@ -17,21 +82,10 @@ class DataExtractor:
         if not self.csv_path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
         
-        # Read CSV with proper dtypes
-        dtype_dict = {
-            'match_id': 'int32',
-            'innings': 'int8',
-            'over': 'int8',
-            'ball': 'int8',
-            'ball_no': 'int16',
-            'runs_batter': 'int8',
-            'runs_extras': 'int8',
-            'runs_total': 'int8',
-            'valid_ball': 'bool',
-            'team_runs': 'int16',
-            'team_balls': 'int16',
-            'team_wicket': 'int8'
-        }
+        if self.cache:
+            df = self.cache.load('extract', self.csv_path, variant=self.cache_variant)
+            if df is not None:
+                return df
         
         df = pd.read_csv(
             self.csv_path,
@@ -43,8 +97,117 @@ class DataExtractor:
         
         self._validate_data(df)
         
+        if self.optimize_memory:
+            df = self._optimize_dtypes(df)
+        
+        if self.cache:
+            self.cache.store('extract', self.csv_path, df, variant=self.cache_variant)
+        
+        return df
+    
+    def extract_chunks(self, chunk_size):
+        """Yield the CSV in chunks of roughly chunk_size rows.
+        
+        Chunks are cut on match boundaries so no match (and therefore no
+        innings) is split across two chunks. Requires the rows of each match
+        to be contiguous in the file, as they are in the source dataset.
+        """
+        logger.info(f"Streaming data from {self.csv_path} in chunks of {chunk_size:,} rows")
+        
+        if not self.csv_path.exists():
+            raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
+        
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        
+        reader = pd.read_csv(
+            self.csv_path,
+            parse_dates=['date'],
+            dtype={col: str for col in STRING_COLUMNS if col in header},
+            low_memory=False,
+            chunksize=chunk_size
+        )
+        
+        seen_matches = set()
+        carry = None
+        total_rows = 0
+        
+        for chunk in reader:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            
+            # Hold back the trailing match, it may continue in the next chunk
+            match_ids = chunk['match_id'].to_numpy()
+            boundaries = np.flatnonzero(match_ids != match_ids[-1])
+            split = boundaries[-1] + 1 if len(boundaries) else 0
+            
+            carry = chunk.iloc[split:]
+            if split == 0:
+                continue
+            
+            ready = chunk.iloc[:split].copy()
+            self._check_match_contiguity(ready, seen_matches)
+            self._validate_data(ready)
+            total_rows += len(ready)
+            yield self._optimize_dtypes(ready) if self.optimize_memory else ready
+        
+        if carry is not None and not carry.empty:
+            ready = carry.copy()
+            self._check_match_contiguity(ready, seen_matches)
+            self._validate_data(ready)
+            total_rows += len(ready)
+            yield self._optimize_dtypes(ready) if self.optimize_memory else ready
+        
+        logger.info(f"Streamed {total_rows} rows covering {len(seen_matches)} matches")
+    
+    def _optimize_dtypes(self, df):
+        """Apply COMPACT_DTYPES and store CATEGORY_COLUMNS as pandas categories"""
+        before = df.memory_usage(deep=True).sum()
+        
+        for col, dtype in COMPACT_DTYPES.items():
+            if col not in df.columns:
+                continue
+            
+            series = df[col]
+            if series.isna().any():
+                dtype = NULLABLE_DTYPES[dtype]
+            
+            if not self._fits_dtype(series, dtype):
+                logger.warning(f"Keeping {col} as {series.dtype}: values do not fit {dtype}")
+                continue
+            df[col] = series.astype(dtype)
+        
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns and df[col].dtype == object:
+                df[col] = df[col].astype('category')
+        
+        after = df.memory_usage(deep=True).sum()
+        logger.info(f"Memory footprint: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+                    f"({(1 - after / before) * 100:.0f}% smaller)")
         return df
     
+    def _fits_dtype(self, series, dtype):
+        if dtype in ('bool', 'boolean'):
+            return series.dropna().isin([0, 1]).all()
+        
+        values = pd.to_numeric(series.dropna(), errors='coerce')
+        if values.isna().any() or (values % 1 != 0).any():
+            return False
+        
+        limits = np.iinfo(dtype.lower())
+        return values.empty or (values.min() >= limits.min and values.max() <= limits.max)
+    
+    def _check_match_contiguity(self, df, seen_matches):
+        match_ids = df['match_id']
+        runs = (match_ids != match_ids.shift()).sum()
+        chunk_matches = set(match_ids.unique())
+        
+        if runs != len(chunk_matches) or chunk_matches & seen_matches:
+            raise ValueError(
+                "Rows of a match are not contiguous in the CSV; "
+                "chunked streaming requires the file to be grouped by match_id"
+            )
+        seen_matches.update(chunk_matches)
+    
     def _validate_data(self, df):
         logger.info("Validating extracted data...")
         
@@ -0,0 +1,158 @@
+import logging
+import re
+import time
+from pathlib import Path
+from sqlalchemy import text
+from .scheduler import LoadScheduler
+
+logger = logging.getLogger(__name__)
+
+FACTS_SQL_FILE = Path(__file__).resolve().parent.parent / 'sql' / 'create_facts.sql'
+
+FOREIGN_KEYS_SQL = """
+    SELECT conname, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = to_regclass(:name) AND contype = 'f'
+    ORDER BY conname
+"""
+
+
+def load_index_definitions(path=FACTS_SQL_FILE):
+    """Return {table: {index: CREATE INDEX statement}} parsed from sql/create_facts.sql"""
+    sql = Path(path).read_text(encoding='utf-8')
+    definitions = {}
+    for statement in sql.split(';'):
+        match = re.search(r'(CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+).*)',
+                          statement, re.DOTALL | re.IGNORECASE)
+        if match:
+            definitions.setdefault(match.group(3), {})[match.group(2)] = match.group(1).strip()
+    return definitions
+
+
+class BulkLoadIndexes:
+    """Drop the secondary indexes and FKs of the fact tables around a full reload.
+
+    Postgres maintains every index and checks every FK row by row during a
+    load; building them once afterwards is much cheaper. drop() removes the
+    indexes declared in sql/create_facts.sql (primary keys and unique
+    constraints stay, they guard the natural keys) and the FKs, remembering
+    the FK definitions. rebuild() recreates the indexes in parallel, checks
+    all FKs of a table in a single scan and adds them back. restore() puts
+    back whatever is still missing, e.g. after a failed load.
+    """
+
+    def __init__(self, engine, tables, workers=4, maintenance_work_mem='256MB'):
+        self.engine = engine
+        self.tables = list(tables)
+        self.workers = workers
+        self.maintenance_work_mem = maintenance_work_mem
+        definitions = load_index_definitions()
+        self.indexes = {table: definitions.get(table, {}) for table in self.tables}
+        self.foreign_keys = {}
+        self.timings = {}
+
+    def drop(self):
+        start = time.perf_counter()
+        with self.engine.begin() as conn:
+            for table in self.tables:
+                self.foreign_keys[table] = conn.execute(
+                    text(FOREIGN_KEYS_SQL), {'name': f"ipl_analytics.{table}"}
+                ).all()
+                for name, _ in self.foreign_keys[table]:
+                    conn.execute(text(f"ALTER TABLE ipl_analytics.{table} DROP CONSTRAINT {name}"))
+                for index in self.indexes[table]:
+                    conn.execute(text(f"DROP INDEX IF EXISTS ipl_analytics.{index}"))
+
+        self.timings['drop'] = time.perf_counter() - start
+        dropped = sum(len(indexes) for indexes in self.indexes.values())
+        fks = sum(len(fks) for fks in self.foreign_keys.values())
+        logger.info(f"Dropped {dropped} indexes and {fks} foreign keys in {self.timings['drop']:.2f}s")
+
+    def rebuild(self):
+        start = time.perf_counter()
+        scheduler = LoadScheduler(max_workers=self.workers)
+        for table in self.tables:
+            for index, statement in self.indexes[table].items():
+                scheduler.add(index, lambda statement=statement: self._create_index(statement))
+        scheduler.run()
+        self.timings['indexes'] = time.perf_counter() - start
+        logger.info(f"Rebuilt indexes with {self.workers} workers in {self.timings['indexes']:.2f}s")
+
+        start = time.perf_counter()
+        for table in self.tables:
+            self._check_foreign_keys(table)
+        self.timings['validate'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with self.engine.begin() as conn:
+            for table in self.tables:
+                for name, definition in self.foreign_keys.get(table, []):
+                    conn.execute(text(f"ALTER TABLE ipl_analytics.{table} ADD CONSTRAINT {name} {definition}"))
+        self.timings['constraints'] = time.perf_counter() - start
+        logger.info(f"Validated and restored foreign keys in "
+                    f"{self.timings['validate'] + self.timings['constraints']:.2f}s")
+
+    def _create_index(self, statement):
+        with self.engine.begin() as conn:
+            conn.execute(text("SET LOCAL search_path TO ipl_analytics, public"))
+            conn.execute(text(f"SET LOCAL maintenance_work_mem = '{self.maintenance_work_mem}'"))
+            conn.execute(text(statement))
+
+    def _check_foreign_keys(self, table):
+        """Count orphans of every FK of table in one pass over the table"""
+        foreign_keys = self.foreign_keys.get(table, [])
+        if not foreign_keys:
+            return
+
+        joins, checks = [], []
+        for i, (name, definition) in enumerate(foreign_keys):
+            match = re.match(r'FOREIGN KEY \((\w+)\) REFERENCES ([\w.]+)\((\w+)\)', definition)
+            column, parent, parent_column = match.groups()
+            joins.append(f"LEFT JOIN {parent} p{i} ON p{i}.{parent_column} = f.{column}")
+            checks.append(f"COUNT(*) FILTER (WHERE f.{column} IS NOT NULL AND p{i}.{parent_column} IS NULL) AS {name}")
+
+        with self.engine.connect() as conn:
+            conn.execute(text("SET search_path TO ipl_analytics, public"))
+            orphans = conn.execute(text(
+                f"SELECT {', '.join(checks)} FROM ipl_analytics.{table} f {' '.join(joins)}"
+            )).one()._asdict()
+
+        orphans = {name: count for name, count in orphans.items() if count}
+        if orphans:
+            raise ValueError(f"{table} has rows without a parent row: {orphans}")
+
+    def restore(self):
+        """Recreate every dropped index and FK that does not exist (best effort)"""
+        logger.warning("Restoring fact table indexes and foreign keys...")
+        for table in self.tables:
+            for index, statement in self.indexes[table].items():
+                try:
+                    with self.engine.begin() as conn:
+                        if conn.execute(text("SELECT to_regclass(:name)"), {'name': f"ipl_analytics.{index}"}).scalar():
+                            continue
+                    self._create_index(statement)
+                except Exception as e:
+                    logger.error(f"Could not restore index {index}: {e}")
+
+            for name, definition in self.foreign_keys.get(table, []):
+                try:
+                    with self.engine.begin() as conn:
+                        exists = conn.execute(text(
+                            "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) AND conname = :name"
+                        ), {'table': f"ipl_analytics.{table}", 'name': name}).scalar()
+                        if not exists:
+                            conn.execute(text(f"ALTER TABLE ipl_analytics.{table} ADD CONSTRAINT {name} {definition}"))
+                except Exception as e:
+                    logger.error(f"Could not restore foreign key {table}.{name}: {e}")
+
+    def analyze(self, tables):
+        start = time.perf_counter()
+        with self.engine.begin() as conn:
+            for table in tables:
+                conn.execute(text(f"ANALYZE ipl_analytics.{table}"))
+        self.timings['analyze'] = self.timings.get('analyze', 0) + time.perf_counter() - start
+
+    def report(self):
+        logger.info("Bulk load phases: " + ", ".join(
+            f"{phase}={seconds:.2f}s" for phase, seconds in self.timings.items()
+        ))
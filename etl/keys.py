@@ -0,0 +1,135 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# lookup name -> (dimension table, surrogate key, natural key columns)
+KEY_DIMENSIONS = {
+    'date': ('dim_date', 'date_id', ['full_date']),
+    'player': ('dim_player', 'player_id', ['player_name']),
+    'team': ('dim_team', 'team_id', ['team_name']),
+    'venue': ('dim_venue', 'venue_id', ['venue_name', 'city']),
+    'umpire': ('dim_umpire', 'umpire_id', ['umpire_name'])
+}
+
+# Stands in for NULL parts of composite keys (e.g. venues without a city)
+NULL_KEY = '\x00'
+
+
+class SurrogateKeyResolver:
+    """Vectorized natural key -> surrogate id mapping shared by the fact loaders.
+
+    Each dimension is read once into an index of natural keys with an aligned
+    id array. resolve() factorizes the input column(s) so only the distinct
+    values are looked up, then expands the ids back through the integer
+    codes - no per-row dict lookups and no merges. A dimension is re-read
+    only after invalidate() is called for it (i.e. after it was reloaded).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.unresolved = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, table=None):
+        """Drop cached keys of a dimension table (all when table is None)"""
+        with self._lock:
+            for name, (dim_table, _, _) in KEY_DIMENSIONS.items():
+                if table is None or table == dim_table:
+                    self._keys.pop(name, None)
+
+    def _lookup(self, name):
+        with self._lock:
+            if name not in self._keys:
+                self._keys[name] = self._read_dimension(name)
+            return self._keys[name]
+
+    def _read_dimension(self, name):
+        table, id_col, key_cols = KEY_DIMENSIONS[name]
+        try:
+            dim_df = pd.read_sql(
+                f"SELECT {id_col}, {', '.join(key_cols)} FROM ipl_analytics.{table}",
+                self.engine
+            )
+        except Exception as e:
+            logger.warning(f"Could not read {table}, {name} keys will be unresolved: {e}")
+            dim_df = pd.DataFrame(columns=[id_col] + key_cols)
+
+        index = self._encode(name, dim_df[key_cols])
+        ids = dim_df[id_col].to_numpy(dtype='int64')
+
+        # The natural key constraints ignore NULL parts; keep the newest id
+        keep = ~index.duplicated(keep='last')
+        logger.debug(f"Loaded {keep.sum()} {name} keys from {table}")
+        return index[keep], ids[keep]
+
+    def _encode(self, name, keys_df):
+        """Turn key columns into a flat Index comparable across frames"""
+        if name == 'date':
+            return pd.DatetimeIndex(pd.to_datetime(keys_df.iloc[:, 0])).normalize()
+        if keys_df.shape[1] == 1:
+            return pd.Index(keys_df.iloc[:, 0].astype(object))
+
+        parts = [keys_df[col].astype(object).where(keys_df[col].notna(), NULL_KEY).astype(str)
+                 for col in keys_df.columns]
+        combined = parts[0]
+        for part in parts[1:]:
+            combined = combined + '\x1f' + part
+        return pd.Index(combined)
+
+    def resolve(self, name, *columns):
+        """Map one or more natural key columns to a nullable Int64 id array"""
+        codes, uniques = self._factorize(columns)
+
+        index, ids = self._lookup(name)
+        positions = index.get_indexer(self._encode(name, uniques))
+        found = positions >= 0
+        self._record_unresolved(name, uniques, found, codes)
+
+        # Code -1 (a NULL key) picks the trailing "not found" slot
+        matched = ids.take(positions, mode='clip') if len(ids) else np.zeros(len(positions), dtype='int64')
+        unique_ids = np.append(np.where(found, matched, 0), 0)
+        found = np.append(found, False)
+        return pd.arrays.IntegerArray(unique_ids[codes], ~found[codes])
+
+    def _factorize(self, columns):
+        """Integer codes per row plus a frame of the distinct keys"""
+        if len(columns) == 1:
+            codes, uniques = pd.factorize(columns[0])
+            return codes, pd.DataFrame({'key': np.asarray(uniques, dtype=object)})
+
+        # Combine per-column codes into one integer key; NULL parts count as
+        # a regular value so venues without a city still resolve
+        combined = np.zeros(len(columns[0]), dtype='int64')
+        for column in columns:
+            column_codes, column_uniques = pd.factorize(column)
+            combined = combined * (len(column_uniques) + 1) + (column_codes + 1)
+
+        codes, _ = pd.factorize(combined)
+        _, first = np.unique(codes, return_index=True)
+        uniques = pd.DataFrame({i: pd.Series(column).iloc[first].to_numpy(dtype=object)
+                                for i, column in enumerate(columns)})
+        return codes, uniques
+
+    def _record_unresolved(self, name, uniques, found, codes):
+        missing = ~found & uniques.notna().any(axis=1).to_numpy()
+        if not missing.any():
+            return
+
+        missing_keys = [tuple(row) if len(row) > 1 else row[0]
+                        for row in uniques[missing].itertuples(index=False)]
+        rows = int(np.isin(codes, np.flatnonzero(missing)).sum())
+        self.unresolved.setdefault(name, set()).update(missing_keys)
+        logger.warning(f"{rows} rows reference {len(missing_keys)} unknown {name} keys, "
+                       f"e.g. {missing_keys[:5]}")
+
+    def report(self):
+        """Log every natural key that could not be resolved so far"""
+        if not self.unresolved:
+            logger.info("All dimension keys resolved")
+            return
+        for name, keys in self.unresolved.items():
+            logger.warning(f"Unresolved {name} keys ({len(keys)}): {sorted(map(str, keys))[:20]}")
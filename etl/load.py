@@ -1,53 +1,189 @@
 
+import numpy as np
 import pandas as pd
 import logging
+import time
+from contextlib import contextmanager
 from sqlalchemy import text
 from config.database import db_config
+from .bulk import copy_dataframe
+from .indexes import BulkLoadIndexes
+from .keys import SurrogateKeyResolver
+from .marts import MartRefresher
+from .metrics import stage
+from .partitions import SeasonPartitioner, season_of
+from .queries import MartQueries, mart_cache
+from .scheduler import LoadScheduler
 
 logger = logging.getLogger(__name__)
 
+LOAD_METHODS = ('copy', 'batch')
+
+DIMENSION_TABLES = [
+    'dim_date', 'dim_player', 'dim_team', 'dim_venue',
+    'dim_event', 'dim_umpire', 'dim_match'
+]
+
+# Natural keys used to skip rows that already exist during incremental loads
+DIMENSION_KEYS = {
+    'dim_date': ['date_id'],
+    'dim_player': ['player_name'],
+    'dim_team': ['team_name'],
+    'dim_venue': ['venue_name', 'city'],
+    'dim_event': ['event_name', 'event_year'],
+    'dim_umpire': ['umpire_name'],
+    'dim_match': ['match_id']
+}
+
+FACT_TABLES = [
+    'fact_ball_delivery', 'fact_innings_summary', 'fact_batter_innings',
+    'fact_bowler_innings', 'fact_partnership', 'fact_match_summary'
+]
+
+# Per-ball flags, stored as BOOLEAN
+FLAG_COLUMNS = [
+    'is_valid_ball', 'is_wicket', 'is_boundary', 'is_six', 'is_four',
+    'is_dot_ball', 'is_new_batter', 'is_striker_out'
+]
+
+# Column prefix of each match_phase in the phase-split innings facts
+PHASE_PREFIXES = {'powerplay': 'Powerplay', 'middle_overs': 'Middle', 'death_overs': 'Death'}
+
+# Required run rate buckets of the pressure columns of fact_batter_innings
+PRESSURE_LEVELS = ['low', 'medium', 'high', 'extreme']
+
+# FK parents of each fact table (see sql/create_facts.sql). The dimensions
+# have no FKs between them, so they can all load at the same time.
+FACT_DEPENDENCIES = {
+    'fact_ball_delivery': ['dim_match', 'dim_date', 'dim_player', 'dim_team', 'dim_venue', 'dim_umpire'],
+    'fact_innings_summary': ['dim_match', 'dim_date', 'dim_player', 'dim_team', 'dim_venue'],
+    'fact_batter_innings': ['dim_match', 'dim_date', 'dim_player', 'dim_team', 'dim_venue'],
+    'fact_bowler_innings': ['dim_match', 'dim_date', 'dim_player', 'dim_team', 'dim_venue'],
+    'fact_partnership': ['dim_match', 'dim_date', 'dim_player', 'dim_team', 'dim_venue'],
+    'fact_match_summary': ['dim_match', 'dim_date', 'dim_event', 'dim_player', 'dim_team', 'dim_venue']
+}
+
 class DataLoader:
     
-    def __init__(self):
-        self.engine = db_config.get_engine()
+    def __init__(self, load_method='copy', workers=1, rebuild_indexes=False):
+        if load_method not in LOAD_METHODS:
+            raise ValueError(f"Unknown load method '{load_method}', expected one of {LOAD_METHODS}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        
+        self.engine = db_config.get_engine('bulk_load')
+        self.load_method = load_method
+        self.workers = workers
+        self.rebuild_indexes = rebuild_indexes
+        self.keys = SurrogateKeyResolver(self.engine)
+        self.partitions = SeasonPartitioner(self.engine)
         self.batch_size = 10000
-        self.dimension_batch_size = 100  
+        self.dimension_batch_size = 5000
+        self.copy_chunk_size = 50000
         
-    def load_dimensions(self, df):
-        """Load all dimension tables"""
-        logger.info("Loading dimension tables...")
+    def load_dimensions(self, df, incremental=False):
+        """Load all dimension tables in a single transaction.
         
-        self._truncate_dimensions()
-        
-        self._load_dim_date(df)
-        self._load_dim_player(df)
-        self._load_dim_team(df)
-        self._load_dim_venue(df)
-        self._load_dim_event(df)
-        self._load_dim_umpire(df)
-        self._load_dim_match(df)
+        With incremental=True nothing is truncated: only rows whose natural
+        key is not in the table yet are inserted, so existing surrogate keys
+        are left untouched.
+        """
+        logger.info("Loading dimension tables...")
         
+        timings = {}
+        with self.engine.begin() as conn:
+            if not incremental:
+                self._truncate_dimensions(conn)
+            
+            changed = []
+            for table, build in self._dimension_builders():
+                start = time.perf_counter()
+                if self._load_dimension(conn, df, table, build, incremental):
+                    changed.append(table)
+                timings[table] = time.perf_counter() - start
+        
+        for table in changed:
+            self.keys.invalidate(table)
+        logger.info("Dimension timings: " + ", ".join(f"{table}={elapsed:.2f}s" for table, elapsed in timings.items()))
         logger.info("All dimensions loaded successfully")
     
-    def _truncate_dimensions(self):
-        logger.info("Truncating dimension tables...")
-        
-        dimension_tables = [
-            'dim_date', 'dim_player', 'dim_team', 'dim_venue',
-            'dim_event', 'dim_umpire', 'dim_match'
+    def _dimension_builders(self):
+        return [
+            ('dim_date', self._build_dim_date),
+            ('dim_player', self._build_dim_player),
+            ('dim_team', self._build_dim_team),
+            ('dim_venue', self._build_dim_venue),
+            ('dim_event', self._build_dim_event),
+            ('dim_umpire', self._build_dim_umpire),
+            ('dim_match', self._build_dim_match)
         ]
+    
+    def _load_dimension(self, conn, df, table, build, incremental):
+        start = time.perf_counter()
+        with stage(f"load.{table}", rows_in=len(df)) as metrics:
+            dim_df = build(df)
+            written = 0
+            if dim_df is not None:
+                if incremental:
+                    written = self._upsert_dimension(conn, dim_df, table)
+                else:
+                    self._write_dimension(conn, dim_df, table)
+                    written = len(dim_df)
+            metrics.rows_out = written
+        logger.info(f"Loaded {written} rows into {table} ({time.perf_counter() - start:.2f}s)")
+        return written
+    
+    def _truncate_dimensions(self, conn):
+        logger.info("Truncating dimension tables...")
         
-        with self.engine.begin() as conn:
-            for table in dimension_tables:
-                try:
-                    conn.execute(text(f"TRUNCATE TABLE ipl_analytics.{table} CASCADE"))
-                    logger.debug(f"Truncated {table}")
-                except Exception as e:
-                    logger.warning(f"Could not truncate {table}: {e}")
+        tables = ', '.join(f"ipl_analytics.{table}" for table in DIMENSION_TABLES)
+        conn.execute(text(f"TRUNCATE TABLE {tables} CASCADE"))
+        self.keys.invalidate()
         
         logger.info("Dimension tables truncated")
     
-    def _load_dim_date(self, df):
+    def _write_dimension(self, conn, dim_df, table):
+        """Write one dimension frame on the shared dimension transaction"""
+        if self.load_method == 'copy':
+            copy_dataframe(conn, dim_df, table, chunk_size=self.copy_chunk_size)
+        else:
+            # Multi-row VALUES statements, one per dimension_batch_size rows
+            dim_df.to_sql(
+                table,
+                conn,
+                schema='ipl_analytics',
+                if_exists='append',
+                index=False,
+                method='multi',
+                chunksize=self.dimension_batch_size
+            )
+    
+    def _upsert_dimension(self, conn, dim_df, table):
+        """Insert only new members of a dimension, keyed on its natural key"""
+        staging = f"tmp_{table}"
+        columns = ', '.join(dim_df.columns)
+        conn.execute(text(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM ipl_analytics.{table} WITH NO DATA"
+        ))
+        copy_dataframe(conn, dim_df, staging, schema='pg_temp', chunk_size=self.copy_chunk_size)
+        
+        # NOT EXISTS with IS NOT DISTINCT FROM also catches NULL key parts
+        # (e.g. venues without a city), which the unique constraints ignore
+        key_match = ' AND '.join(f"t.{key} IS NOT DISTINCT FROM s.{key}" for key in DIMENSION_KEYS[table])
+        result = conn.execute(text(f"""
+            INSERT INTO ipl_analytics.{table} ({columns})
+            SELECT {columns} FROM pg_temp.{staging} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ipl_analytics.{table} t WHERE {key_match}
+            )
+            ON CONFLICT DO NOTHING
+        """))
+        
+        logger.debug(f"{table}: {result.rowcount} new of {len(dim_df)} candidate rows")
+        return result.rowcount
+    
+    def _build_dim_date(self, df):
         logger.info("Loading dim_date...")
         
         dates_df = df[['date', 'day', 'month', 'year', 'season', 
@@ -66,20 +202,9 @@ class DataLoader:
             'quarter', 'is_weekend', 'is_holiday'
         ]]
         
-        total_rows = len(dates_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = dates_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_date',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(dates_df)} dates")
+        return dates_df
     
-    def _load_dim_player(self, df):
+    def _build_dim_player(self, df):
 
         logger.info("Loading dim_player...")
         
@@ -99,20 +224,9 @@ class DataLoader:
         players_df['is_active'] = True
         players_df['debut_year'] = None
         
-        total_rows = len(players_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = players_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_player',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(players_df)} players")
+        return players_df
     
-    def _load_dim_team(self, df):
+    def _build_dim_team(self, df):
 
         logger.info("Loading dim_team...")
         
@@ -133,20 +247,9 @@ class DataLoader:
         teams_df['is_active'] = True
         teams_df['championships_won'] = 0
         
-        total_rows = len(teams_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = teams_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_team',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(teams_df)} teams")
+        return teams_df
     
-    def _load_dim_venue(self, df):
+    def _build_dim_venue(self, df):
         logger.info("Loading dim_venue...")
         
         venues_df = df[['venue', 'city']].copy()
@@ -161,25 +264,14 @@ class DataLoader:
         venues_df['typical_score'] = None
         
 
-        total_rows = len(venues_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = venues_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_venue',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(venues_df)} venues")
+        return venues_df
     
-    def _load_dim_event(self, df):
+    def _build_dim_event(self, df):
         logger.info("Loading dim_event...")
         
         if 'event_name' not in df.columns:
             logger.warning("event_name column not found, skipping dim_event")
-            return
+            return None
         
         events_df = df[['event_name', 'year']].copy()
         events_df = events_df.dropna(subset=['event_name']).drop_duplicates()
@@ -190,25 +282,14 @@ class DataLoader:
         events_df['start_date'] = None
         events_df['end_date'] = None
         
-        total_rows = len(events_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = events_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_event',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(events_df)} events")
+        return events_df
     
-    def _load_dim_umpire(self, df):
+    def _build_dim_umpire(self, df):
         logger.info("Loading dim_umpire...")
         
         if 'umpire' not in df.columns:
             logger.warning("umpire column not found, skipping dim_umpire")
-            return
+            return None
         
         umpires = df['umpire'].dropna().unique()
         umpires_df = pd.DataFrame({
@@ -220,20 +301,9 @@ class DataLoader:
         umpires_df['is_elite_panel'] = False
         umpires_df['total_matches'] = 0
         
-        total_rows = len(umpires_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = umpires_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_umpire',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(umpires_df)} umpires")
+        return umpires_df
     
-    def _load_dim_match(self, df):
+    def _build_dim_match(self, df):
         logger.info("Loading dim_match...")
         
         matches_df = df[['match_id', 'match_type', 'balls_per_over', 
@@ -251,18 +321,7 @@ class DataLoader:
             
         matches_df = matches_df.drop_duplicates(subset=['match_id'])
         
-        total_rows = len(matches_df)
-        for i in range(0, total_rows, self.dimension_batch_size):
-            batch = matches_df.iloc[i:i+self.dimension_batch_size]
-            batch.to_sql(
-                'dim_match',
-                self.engine,
-                schema='ipl_analytics',
-                if_exists='append',
-                index=False
-            )
-        
-        logger.info(f"Loaded {len(matches_df)} matches")
+        return matches_df
     
     def _validate_fact_data(self, df):
 
@@ -291,37 +350,146 @@ class DataLoader:
         logger.info("Fact data validation passed")
         return df
     
-    def load_facts(self, df):
+    def load_facts(self, df, incremental=False):
         logger.info("Loading fact tables...")
         
 
         df = self._validate_fact_data(df)  
         
 
-        self._truncate_facts()
+        if incremental:
+            self._delete_fact_rows(df['match_id'].unique())
+        else:
+            self._truncate_facts()
         
-
-        lookups = self._get_dimension_lookups()
+        with self.bulk_load_indexes(enabled=not incremental):
+            for table in FACT_TABLES:
+                self._load_fact(table, df)
         
-        # Load ball delivery fact
-        self._load_fact_ball_delivery(df, lookups)  
+        self.keys.report()
+        logger.info("All facts loaded successfully")
+    
+    def load(self, df, incremental=False, dimensions=True, facts=True):
+        """Load dimensions and/or facts, concurrently when workers > 1"""
+        if self.workers == 1:
+            if dimensions:
+                self.load_dimensions(df, incremental=incremental)
+            if facts:
+                self.load_facts(df, incremental=incremental)
+            return
         
-
-        self._load_fact_innings_summary(df, lookups)
-        self._load_fact_match_summary(df, lookups)
+        self.load_parallel(df, incremental=incremental, dimensions=dimensions, facts=facts)
+    
+    def load_parallel(self, df, incremental=False, dimensions=True, facts=True):
+        """Load each table on its own pooled connection via LoadScheduler.
+        
+        Dimensions start together; each fact table starts once its FK parents
+        are loaded. Tables commit independently, so if any load fails the
+        tables touched by this run are emptied again (full load) or the facts
+        of these matches removed (incremental) before the error is re-raised.
+        """
+        logger.info(f"Loading tables with {self.workers} workers...")
+        
+        if facts:
+            df = self._validate_fact_data(df)
+        match_ids = df['match_id'].unique()
+        
+        if not incremental:
+            self.truncate_tables(dimensions=dimensions, facts=facts)
+        elif facts:
+            self._delete_fact_rows(match_ids)
+        
+        scheduler = LoadScheduler(max_workers=self.workers)
+        if dimensions:
+            for table, build in self._dimension_builders():
+                scheduler.add(table, self._dimension_task(df, table, build, incremental))
+        if facts:
+            for table in FACT_TABLES:
+                depends_on = FACT_DEPENDENCIES[table] if dimensions else []
+                scheduler.add(table, lambda table=table: self._load_fact(table, df), depends_on)
         
-        logger.info("All facts loaded successfully")
+        try:
+            with self.bulk_load_indexes(enabled=facts and not incremental):
+                timings = scheduler.run()
+        except Exception:
+            self._discard_partial_load(match_ids, incremental, dimensions, facts)
+            raise
+        
+        if facts:
+            self.keys.report()
+        logger.info("Table timings: " + ", ".join(f"{table}={elapsed:.2f}s" for table, elapsed in timings.items()))
+        logger.info("All tables loaded successfully")
+    
+    @contextmanager
+    def bulk_load_indexes(self, enabled=True):
+        """Load the (empty) fact tables without their secondary indexes and FKs.
+        
+        Only active with rebuild_indexes. The indexes are rebuilt and the FKs
+        validated once the block finishes; if anything fails the fact tables
+        are emptied and the original DDL is put back before re-raising.
+        """
+        if not (enabled and self.rebuild_indexes):
+            yield
+            return
+        
+        indexes = BulkLoadIndexes(self.engine, FACT_TABLES, workers=max(self.workers, 4))
+        indexes.drop()
+        start = time.perf_counter()
+        try:
+            yield
+            indexes.timings['load'] = time.perf_counter() - start
+            indexes.rebuild()
+        except Exception:
+            logger.error("Bulk load failed - restoring fact table indexes and constraints")
+            try:
+                self._truncate_facts()
+            finally:
+                indexes.restore()
+            raise
+        
+        indexes.analyze(DIMENSION_TABLES + FACT_TABLES)
+        indexes.report()
+    
+    def analyze_tables(self, tables):
+        """Refresh planner statistics, e.g. of the marts after a bulk reload"""
+        with self.engine.begin() as conn:
+            for table in tables:
+                conn.execute(text(f"ANALYZE ipl_analytics.{table}"))
+    
+    def _dimension_task(self, df, table, build, incremental):
+        def task():
+            with self.engine.begin() as conn:
+                written = self._load_dimension(conn, df, table, build, incremental)
+            if written:
+                self.keys.invalidate(table)
+        return task
+    
+    def _discard_partial_load(self, match_ids, incremental, dimensions, facts):
+        logger.error("Parallel load failed - discarding partially loaded tables")
+        try:
+            if not incremental:
+                self.truncate_tables(dimensions=dimensions, facts=facts)
+            elif facts:
+                # New dimension members are harmless and reused by the next run
+                self._delete_fact_rows(match_ids)
+        except Exception as e:
+            logger.error(f"Cleanup after failed load also failed: {e}")
+    
+    def truncate_tables(self, dimensions=True, facts=True):
+        """Empty the warehouse ahead of a streamed full reload"""
+        if dimensions:
+            # CASCADE also empties the fact tables
+            with self.engine.begin() as conn:
+                self._truncate_dimensions(conn)
+        elif facts:
+            self._truncate_facts()
     
     def _truncate_facts(self):
 
         logger.info("Truncating fact tables...")
         
-        fact_tables = [
-            'fact_ball_delivery', 'fact_innings_summary', 'fact_match_summary'
-        ]
-        
         with self.engine.begin() as conn:
-            for table in fact_tables:
+            for table in FACT_TABLES:
                 try:
                     sql = text(f"TRUNCATE TABLE ipl_analytics.{table} CASCADE")
                     conn.execute(sql)
@@ -332,68 +500,41 @@ class DataLoader:
         
         logger.info("Fact tables truncated successfully")
     
-    def _get_dimension_lookups(self):
-        logger.info("Creating dimension lookups...")
-        
-        lookups = {}
-        
-        # Date lookup
-        date_df = pd.read_sql("SELECT date_id, full_date FROM ipl_analytics.dim_date", self.engine)
-
-        date_df['full_date'] = pd.to_datetime(date_df['full_date'])
-        lookups['date'] = dict(zip(date_df['full_date'].dt.date, date_df['date_id']))
+    def _delete_fact_rows(self, match_ids):
+        """Remove leftovers of a previously interrupted load for these matches"""
+        match_ids = [int(m) for m in match_ids]
         
-  
-        player_df = pd.read_sql("SELECT player_id, player_name FROM ipl_analytics.dim_player", self.engine)
-        lookups['player'] = dict(zip(player_df['player_name'], player_df['player_id']))
-        
-        # Team lookup
-        team_df = pd.read_sql("SELECT team_id, team_name FROM ipl_analytics.dim_team", self.engine)
-        lookups['team'] = dict(zip(team_df['team_name'], team_df['team_id']))
-        
-        # Venue lookup
-        venue_df = pd.read_sql("SELECT venue_id, venue_name, city FROM ipl_analytics.dim_venue", self.engine)
-        lookups['venue'] = {(row['venue_name'], row['city']): row['venue_id'] 
-                           for _, row in venue_df.iterrows()}
-        
-        # Umpire lookup (if exists)
-        try:
-            umpire_df = pd.read_sql("SELECT umpire_id, umpire_name FROM ipl_analytics.dim_umpire", self.engine)
-            lookups['umpire'] = dict(zip(umpire_df['umpire_name'], umpire_df['umpire_id']))
-        except:
-            lookups['umpire'] = {}
-        
-        return lookups
+        with self.engine.begin() as conn:
+            for table in FACT_TABLES:
+                result = conn.execute(
+                    text(f"DELETE FROM ipl_analytics.{table} WHERE match_id = ANY(:match_ids)"),
+                    {'match_ids': match_ids}
+                )
+                if result.rowcount:
+                    logger.info(f"Removed {result.rowcount} stale rows from {table}")
     
-    def _load_fact_ball_delivery(self, df, lookups):
+    def get_loaded_match_ids(self):
+        """Match ids already present in both dim_match and fact_match_summary"""
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT m.match_id
+                FROM ipl_analytics.dim_match m
+                JOIN ipl_analytics.fact_match_summary s ON s.match_id = m.match_id
+            """))
+            return {row[0] for row in result}
+    
+    def _load_fact(self, table, df):
+        """Run the _load_<table> loader, recording its stage metrics"""
+        with stage(f"load.{table}", rows_in=len(df)) as metrics:
+            metrics.rows_out = getattr(self, f"_load_{table}")(df)
+    
+    def _load_fact_ball_delivery(self, df):
         """Load ball delivery fact table"""
         logger.info("Loading fact_ball_delivery...")
-        
-        fact_df = df.copy()
-        
-        # Map foreign keys - using vectorized operations for speed
-        # Convert date to date object first (vectorized)
-        fact_df['date_key'] = fact_df['date'].dt.date
-        fact_df['date_id'] = fact_df['date_key'].map(lookups['date'])
-        
-        fact_df['batter_id'] = fact_df['batter'].map(lookups['player'])
-        fact_df['bowler_id'] = fact_df['bowler'].map(lookups['player'])
-        fact_df['non_striker_id'] = fact_df['non_striker'].map(lookups['player'])
-        fact_df['batting_team_id'] = fact_df['batting_team'].map(lookups['team'])
-        fact_df['bowling_team_id'] = fact_df['bowling_team'].map(lookups['team'])
-        fact_df['player_out_id'] = fact_df['player_out'].map(lookups['player'])
-        fact_df['next_batter_id'] = fact_df.get('next_batter', pd.Series()).map(lookups['player'])
-        fact_df['umpire_id'] = fact_df.get('umpire', pd.Series()).map(lookups['umpire'])
-        
-        # Venue lookup - use merge for better performance
-        venue_df_lookup = pd.DataFrame([
-            {'venue': k[0], 'city': k[1], 'venue_id': v} 
-            for k, v in lookups['venue'].items()
-        ])
-        fact_df = fact_df.merge(venue_df_lookup, on=['venue', 'city'], how='left')
-        
-        # Rename columns to match schema
-        # Rename columns to match schema
+        return self._write_fact_ball_delivery(self._build_fact_ball_delivery(df))
+    
+    def _build_fact_ball_delivery(self, df):
+        """Map the transformed frame onto the fact_ball_delivery columns"""
         # Rename columns to match schema
         column_mapping = {
             'over': 'over_number',
@@ -406,7 +547,6 @@ class DataLoader:
             'team_wicket': 'team_wickets',
             'bowler_wicket': 'bowler_wickets'
         }
-        fact_df = fact_df.rename(columns=column_mapping)
         
         # Select columns for fact table
         fact_columns = [
@@ -425,18 +565,82 @@ class DataLoader:
             'batting_partners', 'next_batter_id'
         ]
         
+        # Only the columns that end up in the fact table are copied out of df
+        source_columns = [col for col in df.columns if column_mapping.get(col, col) in fact_columns]
+        fact_df = df[source_columns].rename(columns=column_mapping)
+        
+        # Map foreign keys through the shared resolver (vectorized, no merges)
+        fact_df['date_id'] = self.keys.resolve('date', df['date'])
+        fact_df['batter_id'] = self.keys.resolve('player', df['batter'])
+        fact_df['bowler_id'] = self.keys.resolve('player', df['bowler'])
+        fact_df['non_striker_id'] = self.keys.resolve('player', df['non_striker'])
+        fact_df['batting_team_id'] = self.keys.resolve('team', df['batting_team'])
+        fact_df['bowling_team_id'] = self.keys.resolve('team', df['bowling_team'])
+        fact_df['venue_id'] = self.keys.resolve('venue', df['venue'], df['city'])
+        fact_df['player_out_id'] = self.keys.resolve('player', df['player_out'])
+        if 'next_batter' in df.columns:
+            fact_df['next_batter_id'] = self.keys.resolve('player', df['next_batter'])
+        if 'umpire' in df.columns:
+            fact_df['umpire_id'] = self.keys.resolve('umpire', df['umpire'])
+        
         # Filter to existing columns
-        fact_columns = [col for col in fact_columns if col in fact_df.columns]
-        fact_df = fact_df[fact_columns]
+        fact_df = fact_df[[col for col in fact_columns if col in fact_df.columns]]
         
         # Convert integer boolean columns to actual booleans
-        bool_cols = ['is_valid_ball', 'is_wicket', 'is_boundary', 'is_six', 'is_four',
-                     'is_dot_ball', 'is_new_batter', 'is_striker_out']
-        for col in bool_cols:
+        for col in FLAG_COLUMNS:
             if col in fact_df.columns:
                 fact_df[col] = fact_df[col].astype(bool)
         
-        # Load in batches (smaller batches and no 'multi' to avoid parameter limits)
+        return fact_df
+    
+    def _write_fact_ball_delivery(self, fact_df):
+        total_rows = len(fact_df)
+        start = time.perf_counter()
+        
+        if self.load_method == 'copy':
+            self._copy_fact_ball_delivery(fact_df)
+        else:
+            self._batch_insert_fact_ball_delivery(fact_df)
+        
+        elapsed = time.perf_counter() - start
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        logger.info(f"Loaded {total_rows} ball delivery records via {self.load_method} "
+                    f"in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        return total_rows
+    
+    def _copy_fact_ball_delivery(self, fact_df):
+        """Stream the prepared frame with COPY FROM STDIN in one transaction"""
+        with self.engine.begin() as conn:
+            if self.partitions.is_partitioned('fact_ball_delivery'):
+                self._copy_into_partitions(conn, fact_df, 'fact_ball_delivery')
+            else:
+                copy_dataframe(conn, fact_df, 'fact_ball_delivery', chunk_size=self.copy_chunk_size)
+    
+    def _copy_into_partitions(self, conn, fact_df, table):
+        """COPY each season's rows straight into its partition, skipping tuple routing"""
+        years = season_of(fact_df['date_id'])
+        if years.isna().any():
+            raise ValueError(f"{int(years.isna().sum())} {table} rows have no date_id "
+                             f"and cannot be placed in a season partition")
+        
+        years = years.astype('int64')
+        self.partitions.ensure_partitions(conn, table, years.unique())
+        for year, season_df in fact_df.groupby(years.to_numpy(), sort=True):
+            partition = self.partitions.partition_name(table, year)
+            copy_dataframe(conn, season_df, partition, chunk_size=self.copy_chunk_size)
+            logger.debug(f"Copied {len(season_df)} rows into {partition}")
+    
+    def _ensure_partitions(self, table, date_ids):
+        """Create the season partitions inserts through the parent table will need"""
+        if not self.partitions.is_partitioned(table):
+            return
+        with self.engine.begin() as conn:
+            self.partitions.ensure_partitions(conn, table, season_of(date_ids.dropna()).unique())
+    
+    def _batch_insert_fact_ball_delivery(self, fact_df):
+        """Fallback: per-batch to_sql inserts"""
+        self._ensure_partitions('fact_ball_delivery', fact_df['date_id'])
+        # Smaller batches and no 'multi' to avoid parameter limits
         total_rows = len(fact_df)
         batch_size = 1000  # Smaller batch size for fact tables
         for i in range(0, total_rows, batch_size):
@@ -449,17 +653,15 @@ class DataLoader:
                 index=False
             )
             logger.info(f"Loaded batch {i//batch_size + 1}/{(total_rows//batch_size) + 1}")
-        
-        logger.info(f"Loaded {total_rows} ball delivery records")
     
-    def _load_fact_innings_summary(self, df, lookups):
+    def _load_fact_innings_summary(self, df):
         """Load innings summary from ball delivery data"""
         logger.info("Aggregating and loading fact_innings_summary...")
         
         # This would be aggregated from fact_ball_delivery
         # For now, we'll create from source data
         
-        innings_agg = df.groupby(['match_id', 'innings', 'batting_team', 'bowling_team']).agg({
+        innings_agg = df.groupby(['match_id', 'innings', 'batting_team', 'bowling_team'], observed=True).agg({
             'runs_total': 'sum',
             'ball_no': 'count',
             'is_wicket': 'sum',
@@ -471,8 +673,8 @@ class DataLoader:
         }).reset_index()
         
         # Map to schema
-        innings_agg['batting_team_id'] = innings_agg['batting_team'].map(lookups['team'])
-        innings_agg['bowling_team_id'] = innings_agg['bowling_team'].map(lookups['team'])
+        innings_agg['batting_team_id'] = self.keys.resolve('team', innings_agg['batting_team'])
+        innings_agg['bowling_team_id'] = self.keys.resolve('team', innings_agg['bowling_team'])
         innings_agg['innings_number'] = innings_agg['innings']
         innings_agg['total_runs'] = innings_agg['runs_total']
         innings_agg['total_wickets'] = innings_agg['is_wicket']
@@ -484,15 +686,8 @@ class DataLoader:
         innings_agg = innings_agg.merge(match_info, on='match_id')
         
         # Vectorized lookups
-        innings_agg['date_key'] = innings_agg['date'].dt.date
-        innings_agg['date_id'] = innings_agg['date_key'].map(lookups['date'])
-        
-        # Venue lookup via merge
-        venue_df_lookup = pd.DataFrame([
-            {'venue': k[0], 'city': k[1], 'venue_id': v} 
-            for k, v in lookups['venue'].items()
-        ])
-        innings_agg = innings_agg.merge(venue_df_lookup, on=['venue', 'city'], how='left')
+        innings_agg['date_id'] = self.keys.resolve('date', innings_agg['date'])
+        innings_agg['venue_id'] = self.keys.resolve('venue', innings_agg['venue'], innings_agg['city'])
         
         # Select final columns
         innings_cols = [
@@ -500,6 +695,7 @@ class DataLoader:
             'date_id', 'venue_id', 'total_runs', 'total_wickets', 'total_overs', 'total_balls'
         ]
         innings_final = innings_agg[[col for col in innings_cols if col in innings_agg.columns]]
+        self._ensure_partitions('fact_innings_summary', innings_final['date_id'])
         
         innings_final.to_sql(
             'fact_innings_summary',
@@ -510,8 +706,205 @@ class DataLoader:
         )
         
         logger.info(f"Loaded {len(innings_final)} innings summaries")
+        return len(innings_final)
+    
+    def _load_fact_batter_innings(self, df):
+        """Aggregate each batter's innings from the deliveries they faced, phase by phase"""
+        logger.info("Aggregating and loading fact_batter_innings...")
+        
+        measures = {
+            'balls': np.ones(len(df), dtype='int64'),
+            'runs': self._measure(df, 'runs_batter'),
+            'fours': self._measure(df, 'is_four'),
+            'sixes': self._measure(df, 'is_six'),
+            'boundaries': self._measure(df, 'is_boundary'),
+            'dots': self._measure(df, 'is_dot_ball'),
+            'extras': self._measure(df, 'runs_extras'),
+            'wickets': self._measure(df, 'is_wicket')
+        }
+        columns = dict(measures)
+        columns['dismissals'] = measures['wickets'] * (
+            df['batter'].to_numpy(dtype=object) == df['player_out'].to_numpy(dtype=object)
+        )
+        for prefix, mask in self._phase_masks(df):
+            columns.update({f"{prefix}_{name}": values * mask for name, values in measures.items()})
+        
+        # Chasing in the last 10 overs, bucketed by required run rate the way
+        # mart_pressure_performance has always bucketed its balls
+        rrr = df['required_run_rate'].to_numpy(dtype='float64', na_value=np.nan)
+        balls_remaining = df['balls_remaining'].to_numpy(dtype='float64', na_value=np.nan)
+        runs_required = df['runs_required'].to_numpy(dtype='float64', na_value=np.nan)
+        chasing = (df['innings'].to_numpy() == 2) & (balls_remaining <= 60) & \
+            (balls_remaining > 0) & (runs_required > 0)
+        levels = np.select([rrr > 12, rrr > 9, rrr > 6], ['extreme', 'high', 'medium'], 'low')
+        for level in PRESSURE_LEVELS:
+            mask = chasing & (levels == level)
+            for name in ('balls', 'runs', 'boundaries', 'wickets'):
+                columns[f"pressure_{level}_{name}"] = measures[name] * mask
+        
+        aggregations = dict.fromkeys(columns, 'sum')
+        columns['highest_batter_runs'] = df['batter_runs'].to_numpy(dtype='float64', na_value=np.nan)
+        aggregations['highest_batter_runs'] = 'max'
+        
+        innings_df = self._aggregate_innings(df, 'batter', 'batter_id', columns, aggregations)
+        return self._write_innings_fact('fact_batter_innings', innings_df)
+    
+    def _load_fact_bowler_innings(self, df):
+        """Aggregate each bowler's innings from the deliveries they bowled, phase by phase"""
+        logger.info("Aggregating and loading fact_bowler_innings...")
+        
+        # Bowling figures count legal deliveries only, extras count every delivery
+        legal = df['is_valid_ball'].astype(bool).to_numpy()
+        extras = self._measure(df, 'runs_extras')
+        measures = {
+            'balls': legal.astype('int64'),
+            'runs_conceded': self._measure(df, 'runs_bowler') * legal,
+            'wickets': self._measure(df, 'is_wicket') * legal,
+            'dots': self._measure(df, 'is_dot_ball') * legal,
+            'boundaries': self._measure(df, 'is_boundary') * legal
+        }
+        columns = {
+            'deliveries': np.ones(len(df), dtype='int64'),
+            'extras': extras,
+            'all_wickets': self._measure(df, 'is_wicket'),
+            **measures
+        }
+        for prefix, mask in self._phase_masks(df):
+            columns.update({f"{prefix}_{name}": values * mask for name, values in measures.items()})
+            columns[f"{prefix}_extras"] = extras * mask
+        
+        innings_df = self._aggregate_innings(df, 'bowler', 'bowler_id', columns, dict.fromkeys(columns, 'sum'))
+        return self._write_innings_fact('fact_bowler_innings', innings_df)
+    
+    @staticmethod
+    def _measure(df, col):
+        """A count or flag column as int64, missing values counting as 0"""
+        return np.nan_to_num(df[col].to_numpy(dtype='float64', na_value=np.nan)).astype('int64')
+    
+    @staticmethod
+    def _phase_masks(df):
+        phase = df['match_phase'].to_numpy(dtype=object)
+        return [(prefix, phase == label) for prefix, label in PHASE_PREFIXES.items()]
+    
+    def _context_keys(self, df):
+        """Date, team and venue ids of every ball, resolved as for fact_ball_delivery"""
+        return {
+            'date_id': self.keys.resolve('date', df['date']),
+            'batting_team_id': self.keys.resolve('team', df['batting_team']),
+            'bowling_team_id': self.keys.resolve('team', df['bowling_team']),
+            'venue_id': self.keys.resolve('venue', df['venue'], df['city'])
+        }
+    
+    def _aggregate_innings(self, df, player_col, player_key, columns, aggregations):
+        """Sum the per-ball measure columns in one groupby by match, innings and player id.
+        
+        Keys are resolved per ball, so every innings row carries the same
+        date, team and venue ids as its balls.
+        """
+        context = self._context_keys(df)
+        frame = pd.DataFrame({
+            'match_id': df['match_id'].to_numpy(),
+            'innings': df['innings'].to_numpy(),
+            player_key: self.keys.resolve('player', df[player_col]),
+            **context,
+            **columns
+        })
+        
+        grouped = frame.groupby(['match_id', 'innings', player_key], sort=True)
+        return grouped.agg({**dict.fromkeys(context, 'first'), **aggregations}).reset_index()
     
-    def _load_fact_match_summary(self, df, lookups):
+    def _load_fact_partnership(self, df):
+        """Split every innings into partnerships and load one row per partnership"""
+        logger.info("Computing and loading fact_partnership...")
+        if df.empty:
+            return 0
+        return self._write_innings_fact('fact_partnership', self._build_fact_partnership(df))
+    
+    def _build_fact_partnership(self, df):
+        """Partnerships from segment boundaries over the balls of each innings.
+        
+        A partnership starts with the innings, after every wicket ball and
+        wherever the pair at the crease changes (e.g. a batter retiring).
+        Its measures are np.add.reduceat sums over the segment.
+        """
+        order = np.lexsort((df['ball_sequence'].to_numpy(), df['innings'].to_numpy(), df['match_id'].to_numpy()))
+        if (order[1:] < order[:-1]).any():
+            df = df.take(order)
+        
+        match_id = df['match_id'].to_numpy()
+        innings = df['innings'].to_numpy()
+        batter = self.keys.resolve('player', df['batter']).to_numpy(dtype='int64', na_value=-1)
+        non_striker = self.keys.resolve('player', df['non_striker']).to_numpy(dtype='int64', na_value=-1)
+        player1 = np.minimum(batter, non_striker)
+        player2 = np.maximum(batter, non_striker)
+        wicket = df['is_wicket'].to_numpy(dtype=bool)
+        
+        new_innings = np.r_[True, (match_id[1:] != match_id[:-1]) | (innings[1:] != innings[:-1])]
+        starts = np.flatnonzero(
+            new_innings | np.r_[True, (player1[1:] != player1[:-1]) | (player2[1:] != player2[:-1]) | wicket[:-1]]
+        )
+        ends = np.r_[starts[1:], len(df)] - 1
+        
+        # Numbered within the innings: offset from the innings' first segment
+        segments = np.arange(len(starts))
+        number = segments - np.maximum.accumulate(np.where(new_innings[starts], segments, 0)) + 1
+        
+        runs_batter = self._measure(df, 'runs_batter')
+        sums = {
+            'runs': self._measure(df, 'runs_total'),
+            'player1_runs': runs_batter * (batter == player1),
+            'player2_runs': runs_batter * (batter != player1),
+            'extras': self._measure(df, 'runs_extras'),
+            'balls': df['is_valid_ball'].astype(bool).to_numpy().astype('int64'),
+            'deliveries': np.ones(len(df), dtype='int64'),
+            'boundaries': self._measure(df, 'is_boundary'),
+            'fours': self._measure(df, 'is_four'),
+            'sixes': self._measure(df, 'is_six')
+        }
+        
+        ball_sequence = df['ball_sequence'].to_numpy()
+        dismissed = self.keys.resolve('player', df['player_out'])[ends]
+        dismissed[~wicket[ends]] = pd.NA
+        partnership_df = pd.DataFrame({
+            'match_id': match_id[starts],
+            'innings': innings[starts],
+            'partnership_number': number,
+            **{col: ids[starts] for col, ids in self._context_keys(df).items()},
+            'player1_id': player1[starts],
+            'player2_id': player2[starts],
+            'start_ball': ball_sequence[starts],
+            'end_ball': ball_sequence[ends],
+            **{col: np.add.reduceat(values, starts) for col, values in sums.items()},
+            'dismissed_player_id': dismissed
+        })
+        
+        # Balls with an unknown batter or non-striker (or both the same) form no pair
+        return partnership_df[(partnership_df['player1_id'] > 0) &
+                              (partnership_df['player1_id'] != partnership_df['player2_id'])]
+    
+    def _write_innings_fact(self, table, innings_df):
+        """COPY (or to_sql in batch mode) an aggregated fact, season partitions included"""
+        if self.load_method == 'copy':
+            with self.engine.begin() as conn:
+                if self.partitions.is_partitioned(table):
+                    self._copy_into_partitions(conn, innings_df, table)
+                else:
+                    copy_dataframe(conn, innings_df, table, chunk_size=self.copy_chunk_size)
+        else:
+            self._ensure_partitions(table, innings_df['date_id'])
+            innings_df.to_sql(
+                table,
+                self.engine,
+                schema='ipl_analytics',
+                if_exists='append',
+                index=False,
+                chunksize=self.batch_size
+            )
+        
+        logger.info(f"Loaded {len(innings_df)} {table} rows")
+        return len(innings_df)
+    
+    def _load_fact_match_summary(self, df):
         """Load match summary"""
         logger.info("Loading fact_match_summary...")
         
@@ -519,28 +912,20 @@ class DataLoader:
         match_df = df.groupby('match_id').first().reset_index()
         
         # Map foreign keys - vectorized lookups
-        match_df['date_key'] = match_df['date'].dt.date
-        match_df['date_id'] = match_df['date_key'].map(lookups['date'])
-        
-        # Venue lookup via merge
-        venue_df_lookup = pd.DataFrame([
-            {'venue': k[0], 'city': k[1], 'venue_id': v} 
-            for k, v in lookups['venue'].items()
-        ])
-        match_df = match_df.merge(venue_df_lookup, on=['venue', 'city'], how='left')
+        match_df['date_id'] = self.keys.resolve('date', match_df['date'])
+        match_df['venue_id'] = self.keys.resolve('venue', match_df['venue'], match_df['city'])
         
         # Get teams (first batting/bowling teams)
-        first_ball = df.groupby('match_id').first().reset_index()
-        match_df['team1_id'] = first_ball['batting_team'].map(lookups['team'])
-        match_df['team2_id'] = first_ball['bowling_team'].map(lookups['team'])
+        match_df['team1_id'] = self.keys.resolve('team', match_df['batting_team'])
+        match_df['team2_id'] = self.keys.resolve('team', match_df['bowling_team'])
         
         # Map other IDs
         if 'toss_winner' in match_df.columns:
-            match_df['toss_winner_id'] = match_df['toss_winner'].map(lookups['team'])
+            match_df['toss_winner_id'] = self.keys.resolve('team', match_df['toss_winner'])
         if 'match_won_by' in match_df.columns:
-            match_df['match_winner_id'] = match_df['match_won_by'].map(lookups['team'])
+            match_df['match_winner_id'] = self.keys.resolve('team', match_df['match_won_by'])
         if 'player_of_match' in match_df.columns:
-            match_df['player_of_match_id'] = match_df['player_of_match'].map(lookups['player'])
+            match_df['player_of_match_id'] = self.keys.resolve('player', match_df['player_of_match'])
         
         # Calculate team totals from innings
         # FIX: Use 'team_wicket' (singular) not 'team_wickets' (plural)
@@ -589,28 +974,59 @@ class DataLoader:
         )
         
         logger.info(f"Loaded {len(match_final)} match summaries")
+        return len(match_final)
     
-    def refresh_marts(self):
-        """Refresh all materialized views"""
-        logger.info("Refreshing analytical marts...")
-        
-        marts = [
-            'mart_death_over_specialists',
-            'mart_powerplay_performers',
-            'mart_pressure_performance',
-            'mart_partnership_analysis',
-            'mart_venue_analytics',
-            'mart_player_stats'
-        ]
+    def reload_season(self, df, year):
+        """Replace the facts of one season, leaving every other season alone.
+        
+        Ball deliveries are built in a side table and swapped in as the
+        season's partition, so readers see the old season until the swap
+        commits (on an unpartitioned table the season is deleted and
+        re-inserted instead). The summaries are emptied per season and
+        reloaded. Returns the match ids of the season.
+        """
+        df = df[pd.to_datetime(df['date']).dt.year == year]
+        if df.empty:
+            raise ValueError(f"No deliveries for season {year} in the source data")
+        
+        logger.info(f"Reloading season {year} ({df['match_id'].nunique()} matches)...")
+        self.load_dimensions(df, incremental=True)
+        df = self._validate_fact_data(df)
+        fact_df = self._build_fact_ball_delivery(df)
+        
+        if self.partitions.is_partitioned('fact_ball_delivery'):
+            self.partitions.swap_season(
+                'fact_ball_delivery', year,
+                lambda conn, staging: copy_dataframe(conn, fact_df, staging, chunk_size=self.copy_chunk_size)
+            )
+        else:
+            with self.engine.begin() as conn:
+                self.partitions.truncate_season(conn, 'fact_ball_delivery', year)
+            self._write_fact_ball_delivery(fact_df)
         
-        for mart in marts:
-            try:
-                logger.info(f"Refreshing {mart}...")
-                with self.engine.connect() as conn:
-                    conn.execute(text(f"REFRESH MATERIALIZED VIEW ipl_analytics.{mart}"))
-                    conn.commit()
-                logger.info(f"✓ {mart} refreshed")
-            except Exception as e:
-                logger.error(f"✗ Error refreshing {mart}: {e}")
-        
-        logger.info("All marts refreshed successfully")
\ No newline at end of file
+        with self.engine.begin() as conn:
+            for table in ('fact_innings_summary', 'fact_batter_innings', 'fact_bowler_innings',
+                          'fact_partnership', 'fact_match_summary'):
+                self.partitions.truncate_season(conn, table, year)
+        self._load_fact_innings_summary(df)
+        self._load_fact_batter_innings(df)
+        self._load_fact_bowler_innings(df)
+        self._load_fact_partnership(df)
+        self._load_fact_match_summary(df)
+        
+        self.keys.report()
+        logger.info(f"Season {year} reloaded")
+        return set(df['match_id'].unique())
+    
+    def refresh_marts(self, workers=3, concurrently=True, match_ids=None, warm_cache=False):
+        """Refresh all marts (see MartRefresher) and drop their cached query results.
+        
+        warm_cache re-runs the common MartQueries afterwards, so the first
+        dashboard requests of this process hit the cache.
+        """
+        refresher = MartRefresher(self.engine, workers=workers, concurrently=concurrently)
+        results = refresher.refresh(match_ids=match_ids)
+        mart_cache.invalidate(results)
+        if warm_cache:
+            MartQueries().warm()
+        return results
@@ -0,0 +1,22 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def configure_logging(level=logging.INFO, log_dir=None, prefix='etl'):
+    """Log to stderr and, if log_dir is given, to a timestamped file in it.
+
+    Called by the command being run, never on import. Returns the log
+    file path (None without log_dir).
+    """
+    handlers = [logging.StreamHandler()]
+    log_file = None
+    if log_dir:
+        log_file = Path(log_dir) / f"{prefix}_{datetime.now():%Y%m%d_%H%M%S}.log"
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file))
+
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+    return log_file
@@ -0,0 +1,346 @@
+import logging
+import re
+import time
+from pathlib import Path
+from sqlalchemy import text
+from config.database import db_config
+from .metrics import record
+from .scheduler import LoadScheduler
+
+logger = logging.getLogger(__name__)
+
+MARTS = [
+    'mart_death_over_specialists',
+    'mart_powerplay_performers',
+    'mart_pressure_performance',
+    'mart_partnership_analysis',
+    'mart_venue_analytics',
+    'mart_player_stats'
+]
+
+MARTS_SQL_FILE = Path(__file__).resolve().parent.parent / 'sql' / 'create_marts.sql'
+
+# Rows of each mart are partitioned by season plus the key below. A new match
+# can only change the partitions of its season, its players and its venue,
+# which is what incremental maintenance deletes and rebuilds.
+MART_PARTITION_KEYS = {
+    'mart_death_over_specialists': 'player_id = ANY(:players)',
+    'mart_powerplay_performers': 'player_id = ANY(:players)',
+    'mart_pressure_performance': 'player_id = ANY(:players)',
+    'mart_partnership_analysis': '(player1_id = ANY(:players) OR player2_id = ANY(:players))',
+    'mart_venue_analytics': 'venue_id = ANY(:venues)',
+    'mart_player_stats': 'player_id = ANY(:players)'
+}
+
+# Every fact row that can contribute to an affected partition: the affected
+# seasons, restricted to rows involving an affected player or venue. The
+# literal date_id range lets the planner prune the season partitions.
+MART_SCOPE_FILTERS = {
+    'fact_ball_delivery': """f.batter_id = ANY(:players) OR f.bowler_id = ANY(:players)
+           OR f.non_striker_id = ANY(:players) OR f.venue_id = ANY(:venues)""",
+    'fact_batter_innings': "f.batter_id = ANY(:players)",
+    'fact_bowler_innings': "f.bowler_id = ANY(:players)",
+    'fact_partnership': "f.player1_id = ANY(:players) OR f.player2_id = ANY(:players)"
+}
+
+MART_SCOPE_SQL = """
+    CREATE TEMP TABLE scope_{fact} ON COMMIT DROP AS
+    SELECT f.*
+    FROM ipl_analytics.{fact} f
+    JOIN ipl_analytics.dim_date d ON f.date_id = d.date_id
+    WHERE f.date_id BETWEEN :first_date_id AND :last_date_id
+      AND d.season = ANY(:seasons)
+      AND ({filter})
+"""
+
+AFFECTED_PARTITIONS_SQL = """
+    WITH seasons AS (
+        SELECT DISTINCT d.season
+        FROM ipl_analytics.fact_ball_delivery f
+        JOIN ipl_analytics.dim_date d ON f.date_id = d.date_id
+        WHERE f.match_id = ANY(:match_ids)
+    )
+    SELECT ARRAY(SELECT season FROM seasons) AS seasons,
+           (SELECT MIN(date_id) FROM ipl_analytics.dim_date
+            WHERE season IN (SELECT season FROM seasons)) AS first_date_id,
+           (SELECT MAX(date_id) FROM ipl_analytics.dim_date
+            WHERE season IN (SELECT season FROM seasons)) AS last_date_id,
+           ARRAY(SELECT player_id FROM (
+                     SELECT batter_id AS player_id FROM ipl_analytics.fact_ball_delivery WHERE match_id = ANY(:match_ids)
+                     UNION SELECT bowler_id FROM ipl_analytics.fact_ball_delivery WHERE match_id = ANY(:match_ids)
+                     UNION SELECT non_striker_id FROM ipl_analytics.fact_ball_delivery WHERE match_id = ANY(:match_ids)
+                 ) p WHERE player_id IS NOT NULL) AS players,
+           ARRAY(SELECT DISTINCT venue_id
+                 FROM ipl_analytics.fact_ball_delivery
+                 WHERE match_id = ANY(:match_ids)) AS venues
+"""
+
+# REFRESH ... CONCURRENTLY needs a unique index on plain columns that covers
+# all rows (no expressions, no WHERE clause)
+MART_INFO_SQL = """
+    SELECT c.relname,
+           c.relkind,
+           c.relispopulated,
+           EXISTS (
+               SELECT 1 FROM pg_index i
+               WHERE i.indrelid = c.oid
+                 AND i.indisunique AND i.indisvalid
+                 AND i.indexprs IS NULL AND i.indpred IS NULL
+           ) AS has_unique_index
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'ipl_analytics' AND c.relkind IN ('m', 'r') AND c.relname LIKE 'mart\\_%'
+"""
+
+# Marts whose query reads another materialized view
+MART_DEPENDENCIES_SQL = """
+    SELECT DISTINCT v.relname AS mart, d.relname AS depends_on
+    FROM pg_rewrite r
+    JOIN pg_depend dep ON dep.objid = r.oid AND dep.classid = 'pg_rewrite'::regclass
+    JOIN pg_class v ON v.oid = r.ev_class
+    JOIN pg_class d ON d.oid = dep.refobjid
+    JOIN pg_namespace n ON n.oid = v.relnamespace
+    WHERE n.nspname = 'ipl_analytics'
+      AND v.relkind = 'm' AND d.relkind = 'm' AND v.oid <> d.oid
+"""
+
+
+def load_mart_definitions(path=MARTS_SQL_FILE):
+    """Return {mart: SELECT statement} parsed from sql/create_marts.sql"""
+    sql = Path(path).read_text(encoding='utf-8')
+    definitions = {}
+    for statement in sql.split(';'):
+        match = re.search(r'CREATE MATERIALIZED VIEW\s+(\w+)\s+AS\s+(.*?)(\s+WITH\s+NO\s+DATA)?\s*$',
+                          statement, re.DOTALL | re.IGNORECASE)
+        if match:
+            definitions[match.group(1)] = match.group(2).strip()
+    return definitions
+
+
+class MartRefresher:
+    """Refresh the analytical marts in parallel, in dependency order.
+
+    Marts with a suitable unique index are refreshed CONCURRENTLY so readers
+    keep seeing the old contents until the new ones are ready; the others
+    (and marts that were never populated) fall back to a plain REFRESH.
+
+    Marts can also be converted into regular tables (convert_to_tables).
+    Those are rebuilt with DELETE + INSERT in one transaction, or, when the
+    loaded match ids are passed to refresh(), maintained incrementally by
+    replacing only the (key, season) partitions those matches touch.
+    """
+
+    def __init__(self, engine=None, workers=3, concurrently=True):
+        self.engine = engine or db_config.get_engine()
+        self.workers = workers
+        self.concurrently = concurrently
+
+    def _inspect(self, marts):
+        with self.engine.connect() as conn:
+            info = {row.relname: row for row in conn.execute(text(MART_INFO_SQL))}
+            dependencies = {}
+            for row in conn.execute(text(MART_DEPENDENCIES_SQL)):
+                if row.mart in marts and row.depends_on in marts:
+                    dependencies.setdefault(row.mart, []).append(row.depends_on)
+        return info, dependencies
+
+    def refresh(self, marts=None, match_ids=None):
+        """Refresh marts (all by default) and return {mart: result}.
+
+        With match_ids, marts stored as tables only get the partitions of
+        those matches rebuilt; materialized views are always fully refreshed.
+        """
+        marts = list(marts or MARTS)
+        logger.info(f"Refreshing {len(marts)} analytical marts with {self.workers} workers...")
+
+        info, dependencies = self._inspect(marts)
+        results = {}
+        scheduler = LoadScheduler(max_workers=self.workers)
+
+        table_marts = [mart for mart in marts if mart in info and info[mart].relkind == 'r']
+        if match_ids is not None and table_marts:
+            results.update(self._update_partitions(table_marts, match_ids))
+
+        for mart in marts:
+            if mart in results:
+                continue
+            if mart not in info:
+                logger.error(f"✗ {mart} does not exist")
+                results[mart] = {'status': 'failed', 'mode': None, 'seconds': 0.0, 'rows': None,
+                                 'error': 'mart not found'}
+                continue
+
+            if info[mart].relkind == 'r':
+                task = self._rebuild_table_task(mart, results)
+            else:
+                concurrent = self.concurrently and info[mart].has_unique_index and info[mart].relispopulated
+                task = self._refresh_task(mart, concurrent, results)
+            scheduler.add(mart, task, [dep for dep in dependencies.get(mart, []) if dep in info])
+
+        scheduler.run()
+        results = {mart: results[mart] for mart in marts}
+        for mart, result in results.items():
+            record(f"marts.{mart}", result['seconds'], rows_out=result['rows'])
+        self._log_summary(results)
+        return results
+
+    def _refresh_task(self, mart, concurrent, results):
+        # Errors are recorded rather than raised so one broken mart does not
+        # keep the others stale
+        def task():
+            mode = 'concurrent' if concurrent else 'blocking'
+            start = time.perf_counter()
+            try:
+                logger.info(f"Refreshing {mart} ({mode})...")
+                with self.engine.begin() as conn:
+                    keyword = ' CONCURRENTLY' if concurrent else ''
+                    conn.execute(text(f"REFRESH MATERIALIZED VIEW{keyword} ipl_analytics.{mart}"))
+                    rows = conn.execute(text(f"SELECT COUNT(*) FROM ipl_analytics.{mart}")).scalar()
+
+                elapsed = time.perf_counter() - start
+                results[mart] = {'status': 'ok', 'mode': mode, 'seconds': elapsed, 'rows': rows, 'error': None}
+                logger.info(f"✓ {mart} refreshed: {rows} rows in {elapsed:.2f}s")
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                results[mart] = {'status': 'failed', 'mode': mode, 'seconds': elapsed, 'rows': None, 'error': str(e)}
+                logger.error(f"✗ Error refreshing {mart}: {e}")
+        return task
+
+    def _rebuild_table_task(self, mart, results):
+        def task():
+            start = time.perf_counter()
+            try:
+                logger.info(f"Rebuilding {mart} (table)...")
+                definition = load_mart_definitions()[mart]
+                with self.engine.begin() as conn:
+                    conn.execute(text("SET LOCAL search_path TO ipl_analytics, public"))
+                    # DELETE rather than TRUNCATE so readers keep the old rows until commit
+                    conn.execute(text(f"DELETE FROM ipl_analytics.{mart}"))
+                    rows = conn.execute(text(f"INSERT INTO ipl_analytics.{mart} {definition}")).rowcount
+
+                elapsed = time.perf_counter() - start
+                results[mart] = {'status': 'ok', 'mode': 'table', 'seconds': elapsed, 'rows': rows, 'error': None}
+                logger.info(f"✓ {mart} rebuilt: {rows} rows in {elapsed:.2f}s")
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                results[mart] = {'status': 'failed', 'mode': 'table', 'seconds': elapsed, 'rows': None, 'error': str(e)}
+                logger.error(f"✗ Error rebuilding {mart}: {e}")
+        return task
+
+    def _update_partitions(self, marts, match_ids):
+        """Delete and re-insert the (key, season) partitions touched by match_ids.
+
+        All marts are updated in one transaction against temp tables holding
+        only the fact rows those partitions are computed from, so the cost
+        follows the size of the new matches rather than of the whole facts.
+        """
+        match_ids = [int(m) for m in match_ids]
+        definitions = load_mart_definitions()
+        results = {}
+
+        with self.engine.begin() as conn:
+            affected = conn.execute(text(AFFECTED_PARTITIONS_SQL), {'match_ids': match_ids}).one()
+            params = {'seasons': list(affected.seasons), 'players': list(affected.players),
+                      'venues': list(affected.venues), 'first_date_id': affected.first_date_id,
+                      'last_date_id': affected.last_date_id}
+            logger.info(f"Incremental mart update for {len(match_ids)} matches: "
+                        f"{len(params['seasons'])} seasons, {len(params['players'])} players, "
+                        f"{len(params['venues'])} venues")
+
+            conn.execute(text("SET LOCAL search_path TO ipl_analytics, public"))
+            facts = [fact for fact in MART_SCOPE_FILTERS
+                     if any(re.search(rf'\b{fact}\b', definitions[mart]) for mart in marts)]
+            for fact in facts:
+                start = time.perf_counter()
+                conn.execute(text(MART_SCOPE_SQL.format(fact=fact, filter=MART_SCOPE_FILTERS[fact])), params)
+                conn.execute(text(f"ANALYZE pg_temp.scope_{fact}"))
+                scope_rows = conn.execute(text(f"SELECT COUNT(*) FROM pg_temp.scope_{fact}")).scalar()
+                logger.info(f"Scoped {scope_rows} {fact} rows in {time.perf_counter() - start:.2f}s")
+
+            for mart in marts:
+                start = time.perf_counter()
+                partition = f"season = ANY(:seasons) AND {MART_PARTITION_KEYS[mart]}"
+                scoped = definitions[mart]
+                for fact in facts:
+                    scoped = re.sub(rf'\b{fact}\b', f'pg_temp.scope_{fact}', scoped)
+
+                deleted = conn.execute(text(f"DELETE FROM ipl_analytics.{mart} WHERE {partition}"), params).rowcount
+                inserted = conn.execute(text(
+                    f"INSERT INTO ipl_analytics.{mart} SELECT * FROM ({scoped}) m WHERE {partition}"
+                ), params).rowcount
+
+                elapsed = time.perf_counter() - start
+                results[mart] = {'status': 'ok', 'mode': 'incremental', 'seconds': elapsed,
+                                 'rows': inserted, 'error': None}
+                logger.info(f"✓ {mart}: replaced {deleted} rows with {inserted} in {elapsed:.2f}s")
+
+        return results
+
+    def convert_to_tables(self, marts=None):
+        """Replace materialized views with regular tables holding the same rows"""
+        marts = list(marts or MARTS)
+        definitions = load_mart_definitions()
+        info, _ = self._inspect(marts)
+
+        with self.engine.begin() as conn:
+            conn.execute(text("SET LOCAL search_path TO ipl_analytics, public"))
+            for mart in marts:
+                if mart not in info or info[mart].relkind != 'm':
+                    logger.info(f"Skipping {mart}: not a materialized view")
+                    continue
+
+                indexes, comment = self._index_definitions(conn, mart)
+                conn.execute(text(f"CREATE TABLE ipl_analytics.{mart}_tbl AS SELECT * FROM ipl_analytics.{mart} WITH NO DATA"))
+                source = f"ipl_analytics.{mart}" if info[mart].relispopulated else f"({definitions[mart]}) m"
+                conn.execute(text(f"INSERT INTO ipl_analytics.{mart}_tbl SELECT * FROM {source}"))
+                conn.execute(text(f"DROP MATERIALIZED VIEW ipl_analytics.{mart}"))
+                conn.execute(text(f"ALTER TABLE ipl_analytics.{mart}_tbl RENAME TO {mart}"))
+                self._restore_indexes(conn, mart, 'TABLE', indexes, comment)
+                logger.info(f"✓ {mart} is now a table")
+
+    def convert_to_views(self, marts=None):
+        """Turn table marts back into materialized views"""
+        marts = list(marts or MARTS)
+        definitions = load_mart_definitions()
+        info, _ = self._inspect(marts)
+
+        with self.engine.begin() as conn:
+            conn.execute(text("SET LOCAL search_path TO ipl_analytics, public"))
+            for mart in marts:
+                if mart not in info or info[mart].relkind != 'r':
+                    logger.info(f"Skipping {mart}: not a table")
+                    continue
+
+                indexes, comment = self._index_definitions(conn, mart)
+                conn.execute(text(f"DROP TABLE ipl_analytics.{mart}"))
+                conn.execute(text(f"CREATE MATERIALIZED VIEW ipl_analytics.{mart} AS {definitions[mart]}"))
+                self._restore_indexes(conn, mart, 'MATERIALIZED VIEW', indexes, comment)
+                logger.info(f"✓ {mart} is now a materialized view")
+
+    def _index_definitions(self, conn, mart):
+        indexes = conn.execute(text(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = 'ipl_analytics' AND tablename = :mart"
+        ), {'mart': mart}).scalars().all()
+        comment = conn.execute(text(
+            "SELECT obj_description(to_regclass(:name), 'pg_class')"
+        ), {'name': f"ipl_analytics.{mart}"}).scalar()
+        return indexes, comment
+
+    def _restore_indexes(self, conn, mart, kind, indexes, comment):
+        for indexdef in indexes:
+            conn.execute(text(indexdef))
+        if comment:
+            conn.execute(text(f"COMMENT ON {kind} ipl_analytics.{mart} IS :comment"), {'comment': comment})
+
+    def _log_summary(self, results):
+        logger.info("Mart refresh summary:")
+        for mart, result in results.items():
+            rows = '-' if result['rows'] is None else f"{result['rows']:,}"
+            logger.info(f"  {mart:<32} {result['status']:<7} {result['mode'] or '-':<11} "
+                        f"{result['seconds']:>7.2f}s {rows:>10} rows")
+
+        failed = [mart for mart, result in results.items() if result['status'] != 'ok']
+        if failed:
+            logger.error(f"{len(failed)} mart(s) failed to refresh: {', '.join(failed)}")
+        else:
+            logger.info("All marts refreshed successfully")
@@ -0,0 +1,206 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from config.database import db_config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Statements sent to the database by any engine of this process. COPY
+# chunks go through the raw DBAPI cursor and are added by count_round_trips.
+_round_trips = 0
+_round_trips_lock = threading.Lock()
+
+# Collector of the pipeline run in progress (None outside a run)
+_active = None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    count_round_trips()
+
+
+def count_round_trips(n=1):
+    global _round_trips
+    with _round_trips_lock:
+        _round_trips += n
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class StageMetrics:
+    """Mutable handle yielded by stage(); set rows_out inside the block"""
+
+    def __init__(self, rows_in=None):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Measure a pipeline step for the active RunMetrics (no-op outside a run).
+
+    Wall time, CPU time, round trips and peak RSS are process-wide, so
+    stages that run concurrently (parallel loads) see each other's work.
+    Stages entered repeatedly under the same name (streamed chunks) are
+    summed.
+    """
+    handle = StageMetrics(rows_in)
+    metrics = _active
+    if metrics is None:
+        yield handle
+        return
+
+    wall, cpu, trips = time.perf_counter(), time.process_time(), _round_trips
+    try:
+        yield handle
+    finally:
+        metrics.add(
+            name,
+            seconds=time.perf_counter() - wall,
+            cpu_seconds=time.process_time() - cpu,
+            rows_in=handle.rows_in,
+            rows_out=handle.rows_out,
+            round_trips=_round_trips - trips
+        )
+
+
+def record(name, seconds, **values):
+    """Add an already measured stage to the active RunMetrics, if any"""
+    if _active is not None:
+        _active.add(name, seconds, **values)
+
+
+def timed_iter(iterable, name):
+    """Yield from iterable, measuring each step as stage name (e.g. chunked reads)"""
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as metrics:
+            item = next(iterator, None)
+            metrics.rows_out = len(item) if item is not None else 0
+        if item is None:
+            return
+        yield item
+
+
+class RunMetrics:
+    """Per-stage metrics of one pipeline run, saved to JSON and etl_run_history"""
+
+    def __init__(self, source_file=None, options=None):
+        self.source_file = source_file
+        self.options = options or {}
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.status = 'running'
+        self.rows_processed = None
+        self.error = None
+        self.stages = {}
+        self.pools = {}
+        self._lock = threading.Lock()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._round_trips = _round_trips
+
+    def activate(self):
+        global _active
+        _active = self
+
+    def deactivate(self):
+        global _active
+        if _active is self:
+            _active = None
+
+    def add(self, name, seconds, cpu_seconds=None, rows_in=None, rows_out=None, round_trips=None):
+        with self._lock:
+            entry = self.stages.setdefault(name, {
+                'calls': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': None,
+                'rows_out': None, 'rows_per_sec': None, 'round_trips': 0, 'peak_rss_mb': None
+            })
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['cpu_seconds'] += cpu_seconds or 0.0
+            entry['round_trips'] += round_trips or 0
+            for key, value in (('rows_in', rows_in), ('rows_out', rows_out)):
+                if value is not None:
+                    entry[key] = (entry[key] or 0) + int(value)
+
+            rows = entry['rows_out'] if entry['rows_out'] is not None else entry['rows_in']
+            if rows is not None and entry['seconds'] > 0:
+                entry['rows_per_sec'] = round(rows / entry['seconds'], 1)
+            entry['peak_rss_mb'] = peak_rss_mb()
+
+    def finish(self, status, rows_processed=None, error=None):
+        self.status = status
+        self.rows_processed = rows_processed
+        self.error = str(error) if error else None
+        self.finished_at = datetime.now()
+        self.pools = db_config.pool_stats()
+        self.add('total', seconds=time.perf_counter() - self._wall,
+                 cpu_seconds=time.process_time() - self._cpu,
+                 rows_out=rows_processed, round_trips=_round_trips - self._round_trips)
+        self.deactivate()
+
+    def as_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': self.finished_at.isoformat(timespec='seconds') if self.finished_at else None,
+            'status': self.status,
+            'source_file': self.source_file,
+            'rows_processed': self.rows_processed,
+            'duration_seconds': round(self.stages.get('total', {}).get('seconds', 0.0), 3),
+            'options': self.options,
+            'error': self.error,
+            'pools': self.pools,
+            'stages': {name: {key: round(value, 4) if isinstance(value, float) else value
+                              for key, value in entry.items()}
+                       for name, entry in self.stages.items()}
+        }
+
+    def write_json(self, directory):
+        path = Path(directory) / f"etl_{self.started_at:%Y%m%d_%H%M%S}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_dict(), indent=2))
+        logger.info(f"Run metrics written to {path}")
+        return path
+
+    def save(self, engine):
+        """Insert this run into ipl_analytics.etl_run_history"""
+        run = self.as_dict()
+        with engine.begin() as conn:
+            return conn.execute(text("""
+                INSERT INTO ipl_analytics.etl_run_history
+                    (started_at, finished_at, status, source_file, rows_processed,
+                     duration_seconds, options, stages, error)
+                VALUES (:started_at, :finished_at, :status, :source_file, :rows_processed,
+                        :duration_seconds, CAST(:options AS JSONB), CAST(:stages AS JSONB), :error)
+                RETURNING run_id
+            """), {**run, 'options': json.dumps(run['options']), 'stages': json.dumps(run['stages'])}).scalar()
+
+    def log_summary(self):
+        logger.info("Stage metrics:")
+        for name, entry in self.stages.items():
+            rate = f"{entry['rows_per_sec']:>12,.0f} rows/s" if entry['rows_per_sec'] else ' ' * 19
+            logger.info(f"  {name:40} {entry['seconds']:8.2f}s  cpu {entry['cpu_seconds']:7.2f}s  "
+                        f"{rate}  {entry['round_trips']:6} trips  rss {entry['peak_rss_mb']} MB")
+        for profile, pool in self.pools.items():
+            logger.info(f"  pool {profile:35} {pool['connects']:4} connections  {pool['checkouts']:6} checkouts  "
+                        f"avg {pool['avg_checkout_ms']} ms  max {pool['max_checkout_ms']} ms  "
+                        f"{pool['waits']} waits ({pool['wait_seconds']}s)")
@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import re
+import time
+from pathlib import Path
+from sqlalchemy import text
+from config.database import db_config
+from .marts import MARTS, MARTS_SQL_FILE, MartRefresher
+from .scheduler import LoadScheduler
+
+logger = logging.getLogger(__name__)
+
+SQL_DIR = MARTS_SQL_FILE.parent
+
+# Baseline DDL, applied once each in this order. Schema changes after the
+# baseline go into new files under sql/migrations/ (applied in name order),
+# never into an applied file.
+VERSIONED_MIGRATIONS = [
+    'create_schema.sql',
+    'create_dimentions.sql',
+    'create_facts.sql',
+    'create_run_history.sql'
+]
+MIGRATIONS_DIR = SQL_DIR / 'migrations'
+
+# The marts hold no data of their own: whenever the file changes they are
+# dropped and recreated
+REPEATABLE_MIGRATIONS = ['create_marts.sql']
+
+MIGRATIONS_TABLE_SQL = """
+    CREATE SCHEMA IF NOT EXISTS ipl_analytics;
+    CREATE TABLE IF NOT EXISTS ipl_analytics.schema_migrations (
+        filename VARCHAR(200) PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        repeatable BOOLEAN NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT now(),
+        duration_seconds DECIMAL(10, 3)
+    );
+"""
+
+RECORD_MIGRATION_SQL = """
+    INSERT INTO ipl_analytics.schema_migrations (filename, checksum, repeatable, duration_seconds)
+    VALUES (:filename, :checksum, :repeatable, :seconds)
+    ON CONFLICT (filename) DO UPDATE
+    SET checksum = EXCLUDED.checksum, applied_at = now(), duration_seconds = EXCLUDED.duration_seconds
+"""
+
+INDEX_STATEMENT = re.compile(r'^CREATE\s+(UNIQUE\s+)?INDEX\s+', re.IGNORECASE)
+INDEX_TARGET = re.compile(r'\sON\s+(?:ipl_analytics\.)?(\w+)', re.IGNORECASE)
+
+
+def checksum(sql):
+    return hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+
+def split_statements(sql):
+    """Statements of a DDL file (the files keep ';' out of comments and strings)"""
+    return [statement.strip() for statement in sql.split(';') if statement.strip()]
+
+
+class MigrationRunner:
+    """Apply the SQL files that are new or changed since the last run.
+
+    Applied files and their SHA-256 are recorded in schema_migrations. Each
+    file runs as a whole in a single transaction, so a failing file leaves
+    nothing behind and stops the run. A versioned file that changed after
+    it was applied is an error; the repeatable marts file is re-applied
+    instead.
+
+    Marts are created WITH NO DATA, populated in one step after all files
+    ran, and only then indexed: the indexes are built CONCURRENTLY, in
+    parallel, instead of being maintained row by row during population.
+    """
+
+    def __init__(self, engine=None, sql_dir=SQL_DIR, workers=4):
+        self.engine = engine or db_config.get_engine()
+        self.sql_dir = Path(sql_dir)
+        self.workers = workers
+
+    def migrations(self):
+        """(path, repeatable) of every migration, in the order they apply"""
+        migrations = [(self.sql_dir / name, False) for name in VERSIONED_MIGRATIONS]
+        migrations_dir = self.sql_dir / MIGRATIONS_DIR.name
+        if migrations_dir.is_dir():
+            migrations += [(path, False) for path in sorted(migrations_dir.glob('*.sql'))]
+        migrations += [(self.sql_dir / name, True) for name in REPEATABLE_MIGRATIONS]
+        return migrations
+
+    def _name(self, path):
+        return path.relative_to(self.sql_dir).as_posix()
+
+    def applied(self):
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(MIGRATIONS_TABLE_SQL)
+            rows = conn.execute(text("SELECT filename, checksum FROM ipl_analytics.schema_migrations"))
+            return {row.filename: row.checksum.strip() for row in rows}
+
+    def pending(self):
+        """Migrations whose file is new or changed, as (path, repeatable, sql)"""
+        applied = self.applied()
+        pending = []
+        for path, repeatable in self.migrations():
+            if not path.exists():
+                raise FileNotFoundError(f"Migration file not found: {path}")
+            sql = path.read_text(encoding='utf-8')
+            recorded = applied.get(self._name(path))
+            if recorded == checksum(sql):
+                continue
+            if recorded is not None and not repeatable:
+                raise RuntimeError(
+                    f"{self._name(path)} was changed after it was applied; put schema changes "
+                    f"in a new file under {MIGRATIONS_DIR.name}/ (or reset the database)"
+                )
+            pending.append((path, repeatable, sql))
+        return pending
+
+    def run(self, populate=True):
+        """Apply pending migrations; returns the names of the files applied"""
+        pending = self.pending()
+        if not pending:
+            logger.info("Schema is up to date")
+            return []
+
+        applied = []
+        for path, repeatable, sql in pending:
+            if repeatable:
+                self._apply_marts(path, sql, populate)
+            else:
+                self._apply(path, sql)
+            applied.append(self._name(path))
+        return applied
+
+    def baseline(self):
+        """Record the baseline files as applied without running them (for a
+        database set up before migrations were tracked).
+
+        Files under sql/migrations/ postdate such a database, so they stay
+        pending and the next run() applies them.
+        """
+        baseline = [(self.sql_dir / name, False) for name in VERSIONED_MIGRATIONS]
+        baseline += [(self.sql_dir / name, True) for name in REPEATABLE_MIGRATIONS]
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(MIGRATIONS_TABLE_SQL)
+            for path, repeatable in baseline:
+                conn.execute(text(RECORD_MIGRATION_SQL), {
+                    'filename': self._name(path), 'checksum': checksum(path.read_text(encoding='utf-8')),
+                    'repeatable': repeatable, 'seconds': 0
+                })
+        logger.info(f"Recorded {len(baseline)} migrations as applied")
+
+    def _record(self, conn, path, sql, repeatable, seconds):
+        conn.execute(text(RECORD_MIGRATION_SQL), {
+            'filename': self._name(path), 'checksum': checksum(sql),
+            'repeatable': repeatable, 'seconds': round(seconds, 3)
+        })
+
+    def _apply(self, path, sql):
+        logger.info(f"Applying {self._name(path)}...")
+        start = time.perf_counter()
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+            # The files SET search_path; keep it from leaking into the pool
+            conn.exec_driver_sql("RESET search_path")
+            self._record(conn, path, sql, False, time.perf_counter() - start)
+        logger.info(f"✓ {self._name(path)} applied in {time.perf_counter() - start:.2f}s")
+
+    def _apply_marts(self, path, sql, populate):
+        """Recreate the marts empty, populate them, then build their indexes"""
+        logger.info(f"Applying {self._name(path)}...")
+        start = time.perf_counter()
+        statements = split_statements(sql)
+        indexes = [statement for statement in statements if INDEX_STATEMENT.match(statement)]
+        ddl = [statement for statement in statements if not INDEX_STATEMENT.match(statement)]
+
+        with self.engine.begin() as conn:
+            existing = dict(conn.execute(text("""
+                SELECT c.relname, c.relkind FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'ipl_analytics' AND c.relkind IN ('m', 'r') AND c.relname = ANY(:marts)
+            """), {'marts': MARTS}).all())
+            for mart, relkind in existing.items():
+                kind = 'MATERIALIZED VIEW' if relkind == 'm' else 'TABLE'
+                conn.exec_driver_sql(f"DROP {kind} ipl_analytics.{mart} CASCADE")
+            conn.exec_driver_sql(';\n'.join(ddl))
+            conn.exec_driver_sql("RESET search_path")
+        logger.info(f"Created {len(MARTS)} marts (no data) in {time.perf_counter() - start:.2f}s")
+
+        refresher = MartRefresher(self.engine, workers=self.workers, concurrently=False)
+        if populate:
+            results = refresher.refresh()
+            failed = [mart for mart, result in results.items() if result['status'] != 'ok']
+            if failed:
+                raise RuntimeError(f"Populating {', '.join(failed)} failed")
+
+        self._build_indexes(indexes)
+
+        # Marts kept as tables for incremental maintenance stay tables
+        table_marts = [mart for mart, relkind in existing.items() if relkind == 'r']
+        if table_marts:
+            refresher.convert_to_tables(table_marts)
+
+        with self.engine.begin() as conn:
+            self._record(conn, path, sql, True, time.perf_counter() - start)
+        logger.info(f"✓ {self._name(path)} applied in {time.perf_counter() - start:.2f}s")
+
+    def _build_indexes(self, statements):
+        """CREATE INDEX CONCURRENTLY each statement, several marts at a time.
+
+        Two concurrent builds on the same relation deadlock on its
+        SHARE UPDATE EXCLUSIVE lock, so each mart's indexes run in turn.
+        """
+        start = time.perf_counter()
+        by_mart = {}
+        for statement in statements:
+            mart = INDEX_TARGET.search(statement).group(1)
+            by_mart.setdefault(mart, []).append(INDEX_STATEMENT.sub(
+                lambda match: f"CREATE {match.group(1) or ''}INDEX CONCURRENTLY IF NOT EXISTS ", statement
+            ))
+
+        def build(mart_statements):
+            # CONCURRENTLY cannot run inside a transaction block
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.exec_driver_sql("SET search_path TO ipl_analytics, public")
+                try:
+                    for statement in mart_statements:
+                        conn.exec_driver_sql(statement)
+                finally:
+                    conn.exec_driver_sql("RESET search_path")
+
+        scheduler = LoadScheduler(max_workers=self.workers)
+        for mart, mart_statements in by_mart.items():
+            scheduler.add(f"{mart}_indexes", lambda mart_statements=mart_statements: build(mart_statements))
+        scheduler.run()
+        logger.info(f"Built {len(statements)} mart indexes with {self.workers} workers "
+                    f"in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency, only needed for the parallel transform
+    pa = None
+
+from .metrics import stage
+from .transform import DataTransformer
+
+logger = logging.getLogger(__name__)
+
+
+def _write_shared(df):
+    """Serialize df as an Arrow IPC stream into a new shared memory block"""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    size = sink.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        buffer = pa.py_buffer(block.buf)
+        with pa.ipc.new_stream(pa.FixedSizeBufferWriter(buffer), table.schema) as writer:
+            writer.write_table(table)
+        del buffer
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    return block, size
+
+
+def _read_shared(name, size, unlink=False):
+    """Read back a frame written by _write_shared, optionally freeing the block"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # One memcpy out of the block: to_pandas may return views into the
+        # buffer it reads, and the block has to be closed before returning
+        df = pa.ipc.open_stream(pa.py_buffer(block.buf[:size].tobytes())).read_all().to_pandas()
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+
+    # Arrow hands back missing strings as None; keep the NaN that read_csv gives
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].to_numpy()
+        values[pd.isna(values)] = np.nan
+    return df
+
+
+def _transform_shard(name, size):
+    """Worker side: transform one shard, return the shared block holding the result"""
+    df = DataTransformer(_read_shared(name, size), copy=False).transform()
+    block, size = _write_shared(df)
+    block.close()
+    return block.name, size
+
+
+class ParallelTransformer:
+    """Run DataTransformer over match-sharded slices of a frame on a process pool.
+
+    Every derived column depends only on the rows of its own match, so
+    shards are contiguous match_id ranges of roughly equal row counts.
+    Shards and results travel as Arrow IPC streams in shared memory
+    instead of being pickled. Results are stitched back in match_id order,
+    which is the order a single DataTransformer produces, and at most two
+    shards per worker are in flight at once.
+
+    Use it as a context manager so the pool is reused across calls (e.g.
+    streamed chunks) and shut down at the end.
+    """
+
+    def __init__(self, workers=None, shards_per_worker=2):
+        if pa is None:
+            raise ImportError("pyarrow is required for the parallel transform (pip install pyarrow)")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: workers must not inherit the parent's database connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def shard_bounds(self, match_ids):
+        """Split the sorted distinct match ids into contiguous ranges of similar row counts"""
+        matches, counts = np.unique(match_ids, return_counts=True)
+        shards = min(len(matches), self.workers * self.shards_per_worker)
+        if shards <= 1:
+            return [matches[-1]] if len(matches) else []
+
+        # Last match id of each shard: where the running row count crosses k/shards of the total
+        cumulative = np.cumsum(counts)
+        targets = cumulative[-1] * np.arange(1, shards) / shards
+        cuts = np.unique(np.searchsorted(cumulative, targets))
+        return list(matches[cuts]) + ([matches[-1]] if cuts[-1] != len(matches) - 1 else [])
+
+    def _shards(self, df):
+        match_ids = df['match_id'].to_numpy()
+        bounds = self.shard_bounds(match_ids)
+
+        if len(match_ids) < 2 or (match_ids[1:] >= match_ids[:-1]).all():
+            # Already grouped by match: shards are plain slices
+            ends = np.searchsorted(match_ids, bounds, side='right')
+            starts = np.r_[0, ends[:-1]]
+            for start, end in zip(starts, ends):
+                yield df.iloc[start:end]
+        else:
+            shard_of = np.searchsorted(bounds, match_ids)
+            for shard in range(len(bounds)):
+                yield df[shard_of == shard]
+
+    def transform(self, df):
+        if self.workers <= 1 or df.empty:
+            return DataTransformer(df).transform()
+
+        pool = self._get_pool()
+        pending = deque()
+        results = []
+
+        def collect():
+            block, future = pending.popleft()
+            try:
+                name, size = future.result()
+            finally:
+                block.close()
+                block.unlink()
+            results.append(_read_shared(name, size, unlink=True))
+
+        try:
+            for shard in self._shards(df):
+                with stage('transform.shard', rows_in=len(shard)):
+                    block, size = _write_shared(shard)
+                pending.append((block, pool.submit(_transform_shard, block.name, size)))
+                if len(pending) >= self.workers * self.shards_per_worker:
+                    with stage('transform.wait'):
+                        collect()
+            with stage('transform.wait'):
+                while pending:
+                    collect()
+        finally:
+            # Free the blocks of shards that were not collected after a failure
+            for block, future in pending:
+                future.cancel()
+                block.close()
+                block.unlink()
+
+        with stage('transform.stitch', rows_in=len(df)) as metrics:
+            transformed_df = self._stitch(results)
+            metrics.rows_out = len(transformed_df)
+        logger.info(f"Transformed {len(df):,} rows in {len(results)} shards on {self.workers} workers")
+        return transformed_df
+
+    def _stitch(self, frames):
+        """Concatenate shard results; categoricals built per shard get the union of their categories"""
+        for col in frames[0].columns:
+            dtypes = [frame[col].dtype for frame in frames]
+            if not isinstance(dtypes[0], pd.CategoricalDtype) or all(dtype == dtypes[0] for dtype in dtypes):
+                continue
+            categories = pd.api.types.union_categoricals(
+                [frame[col] for frame in frames], sort_categories=True
+            ).categories
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+        return pd.concat(frames, copy=False)
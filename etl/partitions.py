@@ -0,0 +1,234 @@
+import logging
+import re
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Fact tables are range partitioned on date_id (YYYYMMDD), one partition per
+# season. IPL seasons run within a calendar year, so a season's partition
+# holds date_ids [YYYY0101, (YYYY+1)0101).
+PARTITION_KEY = 'date_id'
+
+PARTITIONED_TABLES_SQL = """
+    SELECT c.relname
+    FROM pg_partitioned_table pt
+    JOIN pg_class c ON c.oid = pt.partrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'ipl_analytics'
+"""
+
+
+def season_bounds(year):
+    """date_id range [low, high) covered by a season partition"""
+    return year * 10000 + 101, (year + 1) * 10000 + 101
+
+
+def season_of(date_ids):
+    """Partition year of date_id values (scalar or Series)"""
+    return date_ids // 10000
+
+
+class SeasonPartitioner:
+    """Create, truncate and swap the season partitions of the fact tables"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._partitioned = None
+
+    def is_partitioned(self, table):
+        if self._partitioned is None:
+            with self.engine.connect() as conn:
+                self._partitioned = set(conn.execute(text(PARTITIONED_TABLES_SQL)).scalars())
+        return table in self._partitioned
+
+    def partition_name(self, table, year):
+        return f"{table}_{year}"
+
+    def ensure_partitions(self, conn, table, years):
+        """Create missing season partitions of table for the given years"""
+        for year in sorted({int(year) for year in years}):
+            partition = self.partition_name(table, year)
+            exists = conn.execute(text("SELECT to_regclass(:name)"),
+                                  {'name': f"ipl_analytics.{partition}"}).scalar()
+            if exists:
+                continue
+
+            low, high = season_bounds(year)
+            stray = conn.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM ipl_analytics.{table}_default "
+                f"WHERE {PARTITION_KEY} >= :low AND {PARTITION_KEY} < :high)"
+            ), {'low': low, 'high': high}).scalar()
+
+            if stray:
+                # The default partition already holds rows of this season:
+                # move them into a new table and attach that instead
+                conn.execute(text(
+                    f"CREATE TABLE ipl_analytics.{partition} "
+                    f"(LIKE ipl_analytics.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                ))
+                conn.execute(text(
+                    f"WITH moved AS (DELETE FROM ipl_analytics.{table}_default "
+                    f"WHERE {PARTITION_KEY} >= :low AND {PARTITION_KEY} < :high RETURNING *) "
+                    f"INSERT INTO ipl_analytics.{partition} SELECT * FROM moved"
+                ), {'low': low, 'high': high})
+                conn.execute(text(
+                    f"ALTER TABLE ipl_analytics.{table} ATTACH PARTITION ipl_analytics.{partition} "
+                    f"FOR VALUES FROM ({low}) TO ({high})"
+                ))
+            else:
+                conn.execute(text(
+                    f"CREATE TABLE ipl_analytics.{partition} PARTITION OF ipl_analytics.{table} "
+                    f"FOR VALUES FROM ({low}) TO ({high})"
+                ))
+            logger.info(f"Created partition {partition}")
+
+    def truncate_season(self, conn, table, year):
+        """Empty one season; falls back to DELETE on unpartitioned tables"""
+        if self.is_partitioned(table):
+            self.ensure_partitions(conn, table, [year])
+            conn.execute(text(f"TRUNCATE TABLE ipl_analytics.{self.partition_name(table, year)}"))
+        else:
+            low, high = season_bounds(year)
+            conn.execute(text(
+                f"DELETE FROM ipl_analytics.{table} WHERE {PARTITION_KEY} >= :low AND {PARTITION_KEY} < :high"
+            ), {'low': low, 'high': high})
+
+    def swap_season(self, table, year, load):
+        """Rebuild one season in a side table and swap it in as the partition.
+
+        load(conn, staging_table) fills the side table. Its indexes are built
+        before the swap, so the parent is only locked for the final
+        DETACH/ATTACH and readers keep seeing the old season until commit.
+        """
+        partition = self.partition_name(table, year)
+        staging = f"{partition}_load"
+        low, high = season_bounds(year)
+
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS ipl_analytics.{staging}"))
+            conn.execute(text(
+                f"CREATE TABLE ipl_analytics.{staging} "
+                f"(LIKE ipl_analytics.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            # Lets ATTACH PARTITION skip its validation scan
+            conn.execute(text(
+                f"ALTER TABLE ipl_analytics.{staging} ADD CONSTRAINT {staging}_bounds "
+                f"CHECK ({PARTITION_KEY} >= {low} AND {PARTITION_KEY} < {high})"
+            ))
+
+            rows = load(conn, staging)
+
+            # Matching constraints and indexes are attached to the parent's
+            # instead of being built again during ATTACH
+            for name, definition in self._parent_unique_constraints(conn, table):
+                conn.execute(text(f"ALTER TABLE ipl_analytics.{staging} ADD CONSTRAINT {staging}_{name} {definition}"))
+            for indexdef in self._parent_index_definitions(conn, table):
+                conn.execute(text(re.sub(
+                    r'^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+',
+                    lambda m: f"CREATE {m.group(1) or ''}INDEX ON ipl_analytics.{staging}",
+                    indexdef
+                )))
+
+            if conn.execute(text("SELECT to_regclass(:name)"), {'name': f"ipl_analytics.{partition}"}).scalar():
+                conn.execute(text(f"ALTER TABLE ipl_analytics.{table} DETACH PARTITION ipl_analytics.{partition}"))
+                conn.execute(text(f"DROP TABLE ipl_analytics.{partition}"))
+            conn.execute(text(f"ALTER TABLE ipl_analytics.{staging} RENAME TO {partition}"))
+            conn.execute(text(
+                f"ALTER TABLE ipl_analytics.{table} ATTACH PARTITION ipl_analytics.{partition} "
+                f"FOR VALUES FROM ({low}) TO ({high})"
+            ))
+            conn.execute(text(f"ALTER TABLE ipl_analytics.{partition} DROP CONSTRAINT {staging}_bounds"))
+            for index in self._index_names(conn, partition):
+                if index.startswith(staging):
+                    conn.execute(text(
+                        f"ALTER INDEX ipl_analytics.{index} RENAME TO {partition}{index[len(staging):]}"
+                    ))
+
+        logger.info(f"Swapped in {partition} ({rows} rows)")
+        return rows
+
+    def _parent_unique_constraints(self, conn, table):
+        return conn.execute(text("""
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(:name) AND contype IN ('p', 'u')
+        """), {'name': f"ipl_analytics.{table}"}).all()
+
+    def _parent_index_definitions(self, conn, table):
+        """Indexes of table that do not back a constraint"""
+        return conn.execute(text("""
+            SELECT pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            WHERE i.indrelid = to_regclass(:name)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """), {'name': f"ipl_analytics.{table}"}).scalars().all()
+
+    def _index_names(self, conn, table):
+        return conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = 'ipl_analytics' AND tablename = :table"
+        ), {'table': table}).scalars().all()
+
+    def partition_table(self, table):
+        """Convert an existing (unpartitioned) fact table into a partitioned one.
+
+        Rows, defaults, CHECK/FK constraints, indexes and the comment are
+        carried over; primary key and unique constraints get date_id appended
+        as partitioning requires. Fails (and rolls back) if views depend on
+        the table.
+        """
+        if self.is_partitioned(table):
+            logger.info(f"{table} is already partitioned")
+            return
+
+        heap = f"{table}_unpartitioned"
+        with self.engine.begin() as conn:
+            constraints = conn.execute(text("""
+                SELECT conname, contype, pg_get_constraintdef(oid) AS definition
+                FROM pg_constraint
+                WHERE conrelid = to_regclass(:name) AND contype IN ('p', 'u', 'f')
+                ORDER BY contype DESC
+            """), {'name': f"ipl_analytics.{table}"}).all()
+            indexes = conn.execute(text("""
+                SELECT indexdef FROM pg_indexes i
+                WHERE schemaname = 'ipl_analytics' AND tablename = :table
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint c
+                                  WHERE c.conindid = to_regclass('ipl_analytics.' || i.indexname))
+            """), {'table': table}).scalars().all()
+            comment = conn.execute(text("SELECT obj_description(to_regclass(:name), 'pg_class')"),
+                                   {'name': f"ipl_analytics.{table}"}).scalar()
+            sequences = conn.execute(text("""
+                SELECT a.attname, pg_get_serial_sequence(:name, a.attname)
+                FROM pg_attribute a
+                WHERE a.attrelid = to_regclass(:name) AND a.attnum > 0 AND NOT a.attisdropped
+                  AND pg_get_serial_sequence(:name, a.attname) IS NOT NULL
+            """), {'name': f"ipl_analytics.{table}"}).all()
+
+            conn.execute(text(f"ALTER TABLE ipl_analytics.{table} RENAME TO {heap}"))
+            conn.execute(text(
+                f"CREATE TABLE ipl_analytics.{table} (LIKE ipl_analytics.{heap} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+                f"PARTITION BY RANGE ({PARTITION_KEY})"
+            ))
+            conn.execute(text(f"CREATE TABLE ipl_analytics.{table}_default PARTITION OF ipl_analytics.{table} DEFAULT"))
+
+            years = conn.execute(text(
+                f"SELECT DISTINCT {PARTITION_KEY} / 10000 FROM ipl_analytics.{heap}"
+            )).scalars().all()
+            self.ensure_partitions(conn, table, years)
+            rows = conn.execute(text(f"INSERT INTO ipl_analytics.{table} SELECT * FROM ipl_analytics.{heap}")).rowcount
+
+            for column, sequence in sequences:
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY ipl_analytics.{table}.{column}"))
+            conn.execute(text(f"DROP TABLE ipl_analytics.{heap}"))
+
+            for name, contype, definition in constraints:
+                if contype in ('p', 'u') and PARTITION_KEY not in definition:
+                    definition = re.sub(r'\)', f", {PARTITION_KEY})", definition, count=1)
+                conn.execute(text(f"ALTER TABLE ipl_analytics.{table} ADD CONSTRAINT {name} {definition}"))
+            for indexdef in indexes:
+                conn.execute(text(indexdef))
+            if comment:
+                conn.execute(text(f"COMMENT ON TABLE ipl_analytics.{table} IS :comment"), {'comment': comment})
+
+        self._partitioned = None
+        logger.info(f"✓ {table} is now partitioned by season ({len(years)} partitions, {rows} rows)")
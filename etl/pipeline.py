@@ -1,81 +1,305 @@
 
+import hashlib
 import logging
 from datetime import datetime
-from pathlib import Path
+
+import pandas as pd
 
 from .extract import DataExtractor
+from . import transform
 from .transform import DataTransformer
 from .load import DataLoader
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'data/logs/etl_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-        logging.StreamHandler()
-    ]
-)
+from .marts import MARTS
+from .metrics import RunMetrics, stage, timed_iter
+from .validation import validate_frame
 
 logger = logging.getLogger(__name__)
 
 class IPLDataPipeline:
     
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, load_method='copy', optimize_memory=False, cache_dir=None,
+                 cache_transformed=False, workers=1, rebuild_indexes=False, metrics_dir='data/metrics',
+                 record_history=True, transform_workers=1, validate=False, target='postgres',
+                 duckdb_path=None, threads=None):
         self.csv_path = csv_path
-        self.extractor = DataExtractor(csv_path)
-        self.loader = DataLoader()
+        self.extractor = DataExtractor(csv_path, optimize_memory=optimize_memory, cache_dir=cache_dir)
+        # The other loaders are imported only when asked for (duckdb is optional)
+        if target == 'duckdb':
+            from .embedded import DEFAULT_DATABASE, DuckDBWarehouse
+            # The embedded warehouse loads set-based whatever the load_method,
+            # and there is no etl_run_history to record the run in
+            self.loader = DuckDBWarehouse(duckdb_path or DEFAULT_DATABASE, threads=threads)
+            record_history = False
+        elif load_method == 'elt':
+            from .staging import StagingLoader
+            self.loader = StagingLoader(workers=workers, rebuild_indexes=rebuild_indexes)
+        else:
+            self.loader = DataLoader(load_method=load_method, workers=workers, rebuild_indexes=rebuild_indexes)
+        # Loaders that take the whole frame in one set-based load()
+        self.set_based = target == 'duckdb' or load_method == 'elt'
+        self.cache_transformed = cache_transformed and self.extractor.cache is not None
+        self.loaded_match_ids = set()
+        self.metrics_dir = metrics_dir
+        self.record_history = record_history
+        self.metrics = None
+        # 0 means one transform process per core
+        self.transform_workers = transform_workers
+        self.parallel = None
+        self.validate = validate
+        self.options = {
+            'load_method': load_method, 'optimize_memory': optimize_memory,
+            'cache_transformed': self.cache_transformed, 'workers': workers,
+            'rebuild_indexes': rebuild_indexes, 'transform_workers': transform_workers,
+            'validate': validate, 'target': target
+        }
         
-    def run(self, load_dimensions=True, load_facts=True, refresh_marts=True):
+    def run(self, load_dimensions=True, load_facts=True, refresh_marts=True, incremental=False,
+            chunk_size=None, reload_season=None):
         start_time = datetime.now()
         logger.info("="*60)
         logger.info("IPL DATA WAREHOUSE ETL PIPELINE")
         logger.info("="*60)
         
+        self.metrics = RunMetrics(source_file=str(self.csv_path), options={
+            **self.options, 'load_dimensions': load_dimensions, 'load_facts': load_facts,
+            'refresh_marts': refresh_marts, 'incremental': incremental,
+            'chunk_size': chunk_size, 'reload_season': reload_season
+        })
+        self.metrics.activate()
+        rows_processed = None
+        error = None
+        
         try:
+            if self.transform_workers != 1:
+                from .parallel import ParallelTransformer
+                self.parallel = ParallelTransformer(workers=self.transform_workers or None)
     
-            logger.info("\n[STEP 1/5] EXTRACTING DATA")
-            df = self.extractor.extract()
-            
-            logger.info("\n[STEP 2/5] TRANSFORMING DATA")
-            transformer = DataTransformer(df)
-            transformed_df = transformer.transform()
-            
-            if load_dimensions:
-                logger.info("\n[STEP 3/5] LOADING DIMENSIONS")
-                self.loader.load_dimensions(transformed_df)
+            if reload_season:
+                rows_processed = self._run_season_reload(reload_season)
+            elif chunk_size:
+                rows_processed = self._run_streaming(chunk_size, load_dimensions, load_facts, incremental)
             else:
-                logger.info("\n[STEP 3/5] SKIPPING DIMENSIONS")
-
-            if load_facts:
-                logger.info("\n[STEP 4/5] LOADING FACTS")
-                self.loader.load_facts(transformed_df)
-            else:
-                logger.info("\n[STEP 4/5] SKIPPING FACTS")
+                rows_processed = self._run_in_memory(load_dimensions, load_facts, incremental)
             
+            if incremental and rows_processed == 0:
+                logger.info("No new matches found - warehouse is up to date")
+                return True
 
             if refresh_marts:
                 logger.info("\n[STEP 5/5] REFRESHING ANALYTICAL MARTS")
-                self.loader.refresh_marts()
+                # Table-backed marts only rebuild the partitions of the new matches
+                scoped = incremental or reload_season
+                with stage('refresh_marts'):
+                    self.loader.refresh_marts(match_ids=self.loaded_match_ids if scoped else None)
+                    if self.loader.rebuild_indexes and not scoped:
+                        self.loader.analyze_tables(MARTS)
             else:
                 logger.info("\n[STEP 5/5] SKIPPING MARTS")
             
             duration = (datetime.now() - start_time).total_seconds()
             logger.info("\n" + "="*60)
             logger.info("ETL PIPELINE COMPLETED SUCCESSFULLY!")
-            logger.info(f"Total rows processed: {len(transformed_df):,}")
+            logger.info(f"Total rows processed: {rows_processed:,}")
             logger.info(f"Duration: {duration:.2f} seconds ({duration/60:.2f} minutes)")
             logger.info("="*60)
             
             return True
             
         except Exception as e:
+            error = e
             logger.error(f"\n✗ PIPELINE FAILED: {e}", exc_info=True)
             return False
+        
+        finally:
+            if self.parallel is not None:
+                self.parallel.close()
+                self.parallel = None
+            self._record_metrics(rows_processed, error)
+    
+    def _record_metrics(self, rows_processed, error):
+        """Write the run's stage metrics to a JSON file and etl_run_history"""
+        self.metrics.finish('failed' if error else 'success', rows_processed=rows_processed, error=error)
+        self.metrics.log_summary()
+        
+        if self.metrics_dir:
+            try:
+                self.metrics.write_json(self.metrics_dir)
+            except OSError as e:
+                logger.warning(f"Could not write run metrics: {e}")
+        if self.record_history:
+            try:
+                run_id = self.metrics.save(self.loader.engine)
+                logger.info(f"Recorded run {run_id} in etl_run_history")
+            except Exception as e:
+                logger.warning(f"Could not record run in etl_run_history: {e}")
+    
+    def _run_in_memory(self, load_dimensions, load_facts, incremental):
+        transformed_df = None
+        if self.cache_transformed and not incremental:
+            transformed_df = self.extractor.cache.load(
+                'transform', self.extractor.csv_path, variant=self._transform_cache_variant()
+            )
+        
+        if transformed_df is not None:
+            logger.info("\n[STEPS 1-2/5] USING CACHED TRANSFORMED DATA")
+        else:
+            logger.info("\n[STEP 1/5] EXTRACTING DATA")
+            with stage('extract') as metrics:
+                df = self.extractor.extract()
+                
+                if incremental:
+                    df = self._filter_new_matches(df)
+                metrics.rows_out = len(df)
+            if df.empty:
+                return 0
+            
+            logger.info("\n[STEP 2/5] TRANSFORMING DATA")
+            with stage('transform', rows_in=len(df)) as metrics:
+                transformed_df = self._transform(df)
+                metrics.rows_out = len(transformed_df)
+            
+            if self.cache_transformed and not incremental:
+                self.extractor.cache.store(
+                    'transform', self.extractor.csv_path, transformed_df,
+                    variant=self._transform_cache_variant()
+                )
+        
+        self.loaded_match_ids = set(transformed_df['match_id'].unique())
+        
+        if self.set_based and (load_dimensions or load_facts):
+            logger.info(f"\n[STEPS 3-4/5] LOADING TABLES (set-based, {self.loader.workers} workers)")
+            with stage('load_tables', rows_in=len(transformed_df)):
+                self.loader.load(transformed_df, incremental=incremental,
+                                 dimensions=load_dimensions, facts=load_facts)
+            return len(transformed_df)
+        
+        if self.loader.workers > 1 and (load_dimensions or load_facts):
+            logger.info(f"\n[STEPS 3-4/5] LOADING TABLES ({self.loader.workers} workers)")
+            with stage('load_tables', rows_in=len(transformed_df)):
+                self.loader.load_parallel(transformed_df, incremental=incremental,
+                                          dimensions=load_dimensions, facts=load_facts)
+            return len(transformed_df)
+        
+        if load_dimensions:
+            logger.info("\n[STEP 3/5] LOADING DIMENSIONS")
+            with stage('load_dimensions', rows_in=len(transformed_df)):
+                self.loader.load_dimensions(transformed_df, incremental=incremental)
+        else:
+            logger.info("\n[STEP 3/5] SKIPPING DIMENSIONS")
+
+        if load_facts:
+            logger.info("\n[STEP 4/5] LOADING FACTS")
+            with stage('load_facts', rows_in=len(transformed_df)):
+                self.loader.load_facts(transformed_df, incremental=incremental)
+        else:
+            logger.info("\n[STEP 4/5] SKIPPING FACTS")
+        
+        return len(transformed_df)
+    
+    def _run_season_reload(self, year):
+        """Reload the facts of a single season from the source file"""
+        logger.info(f"\n[STEP 1/5] EXTRACTING DATA (season {year})")
+        with stage('extract') as metrics:
+            df = self.extractor.extract()
+            df = df[pd.to_datetime(df['date']).dt.year == year]
+            metrics.rows_out = len(df)
+        if df.empty:
+            raise ValueError(f"No matches of season {year} in {self.csv_path}")
+        
+        logger.info("\n[STEP 2/5] TRANSFORMING DATA")
+        with stage('transform', rows_in=len(df)) as metrics:
+            transformed_df = self._transform(df)
+            metrics.rows_out = len(transformed_df)
+        
+        logger.info(f"\n[STEPS 3-4/5] RELOADING SEASON {year}")
+        with stage('reload_season', rows_in=len(transformed_df)):
+            self.loaded_match_ids = self.loader.reload_season(transformed_df, year)
+        return len(transformed_df)
+    
+    def _run_streaming(self, chunk_size, load_dimensions, load_facts, incremental):
+        """Extract, transform and load one match-aligned chunk at a time.
+        
+        Only one chunk is held in memory at once. Every chunk is appended
+        with the incremental loaders; a full run empties the tables once up
+        front instead of per chunk.
+        """
+        logger.info(f"\n[STEPS 1-4/5] STREAMING EXTRACT/TRANSFORM/LOAD ({chunk_size:,} rows per chunk)")
+        
+        if incremental:
+            loaded = self.loader.get_loaded_match_ids()
+        else:
+            loaded = set()
+            self.loader.truncate_tables(dimensions=load_dimensions, facts=load_facts)
+        
+        rows_processed = 0
+        # Full runs load the facts without secondary indexes (rebuild_indexes)
+        with self.loader.bulk_load_indexes(enabled=load_facts and not incremental):
+            chunks = timed_iter(self.extractor.extract_chunks(chunk_size), 'extract')
+            for chunk_number, chunk in enumerate(chunks, 1):
+                if incremental:
+                    chunk = self._filter_new_matches(chunk, loaded)
+                    if chunk.empty:
+                        continue
+            
+                with stage('transform', rows_in=len(chunk)) as metrics:
+                    transformed_df = self._transform(chunk, copy=False)
+                    metrics.rows_out = len(transformed_df)
+                del chunk
+            
+                with stage('load', rows_in=len(transformed_df)):
+                    self.loader.load(transformed_df, incremental=True,
+                                     dimensions=load_dimensions, facts=load_facts)
+            
+                rows_processed += len(transformed_df)
+                self.loaded_match_ids.update(transformed_df['match_id'].unique())
+                logger.info(f"Chunk {chunk_number}: {transformed_df['match_id'].nunique()} matches, "
+                            f"{len(transformed_df):,} rows ({rows_processed:,} total)")
+                del transformed_df
+        
+        return rows_processed
+    
+    def _transform(self, df, copy=True):
+        """DataTransformer, or match-sharded over the process pool when transform_workers != 1.
+        
+        With validate set the result is checked before anything is loaded.
+        """
+        if self.parallel is not None:
+            transformed_df = self.parallel.transform(df)
+        else:
+            transformed_df = DataTransformer(df, copy=copy).transform()
+        
+        if self.validate:
+            with stage('validate', rows_in=len(transformed_df)):
+                result = validate_frame(transformed_df)
+            if result.warnings:
+                logger.warning(f"Frame validation: {result.summary()}")
+            if result.errors:
+                raise ValueError(f"Transformed data failed validation: {result.errors}")
+        return transformed_df
+    
+    def _transform_cache_variant(self):
+        # Invalidate cached transforms whenever the transform code changes
+        with open(transform.__file__, 'rb') as f:
+            code_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+        return f"{self.extractor.cache_variant}-{code_hash}"
+    
+    def _filter_new_matches(self, df, loaded=None):
+        """Keep only matches that are not in the warehouse yet"""
+        if loaded is None:
+            loaded = self.loader.get_loaded_match_ids()
+        is_new = ~df['match_id'].isin(loaded)
+        
+        new_matches = df.loc[is_new, 'match_id'].nunique()
+        logger.info(f"Incremental mode: {new_matches} new matches, "
+                    f"{df['match_id'].nunique() - new_matches} already loaded")
+        
+        return df[is_new]
 
 if __name__ == "__main__":
     import sys
+    from .logs import configure_logging
     
+    configure_logging(log_dir='data/logs')
     csv_path = sys.argv[1] if len(sys.argv) > 1 else "data/raw/ipl.csv"
     
     pipeline = IPLDataPipeline(csv_path)
@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text
+from config.database import db_config
+
+logger = logging.getLogger(__name__)
+
+# Leaderboard metric -> (mart, ORDER BY, qualifying condition). The
+# condition may use :min_balls; rows failing it are not ranked.
+LEADERBOARDS = {
+    'runs': ('mart_player_stats', 'runs DESC', None),
+    'wickets': ('mart_player_stats', 'wickets DESC, economy_rate ASC', None),
+    'strike_rate': ('mart_player_stats', 'strike_rate DESC', 'balls_faced >= :min_balls'),
+    'economy': ('mart_player_stats', 'economy_rate ASC', 'balls_bowled >= :min_balls'),
+    'death_batting': ('mart_death_over_specialists', 'batting_impact_score DESC',
+                      'batting_impact_score IS NOT NULL'),
+    'death_bowling': ('mart_death_over_specialists', 'bowling_impact_score DESC',
+                      'bowling_impact_score IS NOT NULL'),
+    'powerplay_batting': ('mart_powerplay_performers', 'pp_strike_rate DESC', 'pp_balls_faced >= :min_balls'),
+    'powerplay_bowling': ('mart_powerplay_performers', 'pp_economy_rate ASC', 'pp_balls_bowled >= :min_balls'),
+    'pressure': ('mart_pressure_performance', 'pressure_performance_index DESC NULLS LAST', None)
+}
+
+# Marts making up a player profile, each read as one row per season (and
+# pressure level)
+PROFILE_MARTS = {
+    'stats': ('mart_player_stats', 'season DESC'),
+    'death_overs': ('mart_death_over_specialists', 'season DESC'),
+    'powerplay': ('mart_powerplay_performers', 'season DESC'),
+    'pressure': ('mart_pressure_performance', 'season DESC, pressure_level')
+}
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results with a time-to-live.
+
+    Every entry is tagged with the marts its query reads, so a refresh can
+    drop exactly the results it made stale. The cache lives in the process;
+    other processes only see a refresh once their entries expire.
+    """
+
+    def __init__(self, maxsize=512, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, marts, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(marts), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, marts=None):
+        """Drop the entries reading any of marts (everything when marts is None)"""
+        with self._lock:
+            if marts is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                marts = set(marts)
+                stale = [key for key, entry in self._entries.items() if entry[1] & marts]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+        logger.debug(f"Invalidated {dropped} cached mart queries")
+        return dropped
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by every MartQueries of the process; DataLoader.refresh_marts
+# invalidates it
+mart_cache = QueryCache()
+
+
+class MartQueries:
+    """Read API over the analytical marts for dashboards and notebooks.
+
+    Queries run on one pooled engine and their results are cached (see
+    QueryCache). Rows come back as plain dicts; cached rows are copied on
+    every hit so callers may modify what they get.
+    """
+
+    def __init__(self, engine=None, cache=mart_cache):
+        self.engine = engine or db_config.get_engine('read')
+        self.cache = cache
+
+    def _fetch(self, marts, sql, params=None):
+        params = params or {}
+        key = (str(self.engine.url), sql, tuple(sorted(params.items())))
+        rows = self.cache.get(key)
+        if rows is None:
+            with self.engine.connect() as conn:
+                rows = tuple(dict(row) for row in conn.execute(text(sql), params).mappings())
+            self.cache.put(key, marts, rows)
+        return [dict(row) for row in rows]
+
+    def seasons(self):
+        """Seasons present in the marts, newest first"""
+        rows = self._fetch(['mart_player_stats'], """
+            SELECT DISTINCT season FROM ipl_analytics.mart_player_stats ORDER BY season DESC
+        """)
+        return [row['season'] for row in rows]
+
+    def leaderboard(self, metric, season=None, limit=10, min_balls=60):
+        """Top players by one of the LEADERBOARDS metrics, for a season or across all of them"""
+        if metric not in LEADERBOARDS:
+            raise ValueError(f"Unknown leaderboard '{metric}', expected one of {sorted(LEADERBOARDS)}")
+
+        mart, order_by, condition = LEADERBOARDS[metric]
+        conditions = [condition] if condition else []
+        params = {'limit': int(limit)}
+        if condition and ':min_balls' in condition:
+            params['min_balls'] = int(min_balls)
+        if season is not None:
+            conditions.append('season = :season')
+            params['season'] = str(season)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self._fetch([mart], f"""
+            SELECT * FROM ipl_analytics.{mart}
+            {where}
+            ORDER BY {order_by}, player_id, season DESC
+            LIMIT :limit
+        """, params)
+
+    def player_profile(self, player_id):
+        """Season by season stats, death-over, powerplay and pressure rows of one player"""
+        profile = {}
+        for section, (mart, order_by) in PROFILE_MARTS.items():
+            profile[section] = self._fetch([mart], f"""
+                SELECT * FROM ipl_analytics.{mart}
+                WHERE player_id = :player_id
+                ORDER BY {order_by}
+            """, {'player_id': int(player_id)})
+        return profile
+
+    def find_players(self, name, limit=10):
+        """Players whose name contains name (case-insensitive), for profile lookups"""
+        return self._fetch(['mart_player_stats'], """
+            SELECT player_id, player_name, MAX(season) AS last_season
+            FROM ipl_analytics.mart_player_stats
+            WHERE player_name ILIKE :pattern
+            GROUP BY player_id, player_name
+            ORDER BY player_name
+            LIMIT :limit
+        """, {'pattern': f"%{name}%", 'limit': int(limit)})
+
+    def venue_analytics(self, season=None, venue_id=None):
+        """mart_venue_analytics rows, optionally for one season and/or venue"""
+        conditions, params = [], {}
+        if season is not None:
+            conditions.append('season = :season')
+            params['season'] = str(season)
+        if venue_id is not None:
+            conditions.append('venue_id = :venue_id')
+            params['venue_id'] = int(venue_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self._fetch(['mart_venue_analytics'], f"""
+            SELECT * FROM ipl_analytics.mart_venue_analytics
+            {where}
+            ORDER BY season DESC, total_matches DESC, venue_id
+        """, params)
+
+    def partnerships(self, season=None, player_id=None, limit=20):
+        """Most productive batting pairs, optionally for one season and/or player"""
+        conditions, params = [], {'limit': int(limit)}
+        if season is not None:
+            conditions.append('season = :season')
+            params['season'] = str(season)
+        if player_id is not None:
+            conditions.append('(player1_id = :player_id OR player2_id = :player_id)')
+            params['player_id'] = int(player_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self._fetch(['mart_partnership_analysis'], f"""
+            SELECT * FROM ipl_analytics.mart_partnership_analysis
+            {where}
+            ORDER BY total_partnership_runs DESC, player1_id, player2_id, season DESC
+            LIMIT :limit
+        """, params)
+
+    def warm(self, seasons=1, limit=10):
+        """Pre-run the common queries: every leaderboard and the venue and
+        partnership pages, all-time and for the latest seasons. Returns the
+        number of queries run."""
+        queries = 0
+        for season in [None] + self.seasons()[:seasons]:
+            for metric in LEADERBOARDS:
+                self.leaderboard(metric, season=season, limit=limit)
+            self.venue_analytics(season=season)
+            self.partnerships(season=season)
+            queries += len(LEADERBOARDS) + 2
+        logger.info(f"Warmed the mart query cache with {queries} queries")
+        return queries
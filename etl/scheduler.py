@@ -0,0 +1,99 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class LoadFailed(RuntimeError):
+    """Raised by LoadScheduler.run when one of the tasks failed"""
+
+    def __init__(self, task, error):
+        super().__init__(f"Load of {task} failed: {error}")
+        self.task = task
+        self.error = error
+
+
+class LoadScheduler:
+    """Run named load tasks on a thread pool in dependency order.
+
+    A task is submitted as soon as every task it depends on has finished, so
+    independent tables load at the same time on their own pooled
+    connections. After the first failure nothing new is started; tasks that
+    are already running are allowed to finish before LoadFailed is raised.
+    """
+
+    def __init__(self, max_workers=4):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+        self.max_workers = max_workers
+        self.tasks = {}
+
+    def add(self, name, func, depends_on=()):
+        if name in self.tasks:
+            raise ValueError(f"Task {name} is already scheduled")
+        self.tasks[name] = (func, tuple(depends_on))
+
+    def _check_graph(self):
+        for name, (_, depends_on) in self.tasks.items():
+            unknown = [dep for dep in depends_on if dep not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {name} depends on unscheduled tasks: {unknown}")
+
+        # Kahn's algorithm: anything left over is part of a cycle
+        remaining = {name: set(deps) for name, (_, deps) in self.tasks.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _timed(self, name, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def run(self):
+        """Run all tasks and return {task: seconds}; raises LoadFailed"""
+        self._check_graph()
+
+        pending = dict(self.tasks)
+        running = {}
+        done = set()
+        timings = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='load') as executor:
+            while pending or running:
+                if failure is None:
+                    for name, (func, depends_on) in list(pending.items()):
+                        if all(dep in done for dep in depends_on):
+                            logger.debug(f"Starting {name}")
+                            running[executor.submit(self._timed, name, func)] = name
+                            del pending[name]
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        timings[name] = future.result()
+                        done.add(name)
+                    except Exception as e:
+                        logger.error(f"✗ {name} failed: {e}")
+                        if failure is None:
+                            failure = LoadFailed(name, e)
+
+        if failure is not None:
+            skipped = sorted(pending)
+            if skipped:
+                logger.error(f"Not started after failure: {', '.join(skipped)}")
+            raise failure from failure.error
+
+        return timings
@@ -0,0 +1,570 @@
+import logging
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from .bulk import copy_arrow
+from .load import (DataLoader, DIMENSION_KEYS, DIMENSION_TABLES, FACT_TABLES, FLAG_COLUMNS,
+                   PHASE_PREFIXES, PRESSURE_LEVELS)
+from .metrics import stage
+from .scheduler import LoadScheduler
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = 'staging.ball_delivery'
+
+# Facts only take the deliveries of innings 1 and 2 (see
+# DataLoader._validate_fact_data); the dimensions take every row
+FACT_ROWS = 's.innings IN (1, 2)'
+
+# Natural key joins from the staged names to the dimensions, as resolved by
+# SurrogateKeyResolver. A venue without a city matches the one without a city.
+DATE_JOIN = "LEFT JOIN ipl_analytics.dim_date {alias} ON {alias}.full_date = {date}"
+PLAYER_JOIN = "LEFT JOIN ipl_analytics.dim_player {alias} ON {alias}.player_name = {name}"
+TEAM_JOIN = "LEFT JOIN ipl_analytics.dim_team {alias} ON {alias}.team_name = {name}"
+UMPIRE_JOIN = "LEFT JOIN ipl_analytics.dim_umpire {alias} ON {alias}.umpire_name = {name}"
+VENUE_JOIN = (
+    "LEFT JOIN ipl_analytics.dim_venue {alias} ON {alias}.venue_name = {venue} "
+    "AND ({alias}.city = {city} OR ({alias}.city IS NULL AND {city} IS NULL))"
+)
+
+DIMENSION_COLUMNS = {
+    'dim_date': ['date_id', 'full_date', 'day', 'month', 'year', 'season', 'day_of_week', 'day_name',
+                 'week_of_year', 'month_name', 'quarter', 'is_weekend', 'is_holiday'],
+    'dim_player': ['player_name', 'player_role', 'nationality', 'batting_style', 'bowling_style',
+                   'is_active', 'debut_year'],
+    'dim_team': ['team_name', 'team_short_name', 'home_city', 'team_color', 'franchise_owner',
+                 'established_year', 'is_active', 'championships_won'],
+    'dim_venue': ['venue_name', 'city', 'state', 'country', 'capacity', 'established_year',
+                  'pitch_type', 'typical_score'],
+    'dim_event': ['event_name', 'event_year', 'event_type', 'total_matches', 'start_date', 'end_date'],
+    'dim_umpire': ['umpire_name', 'nationality', 'experience_years', 'is_elite_panel', 'total_matches'],
+    'dim_match': ['match_id', 'match_type', 'balls_per_over', 'gender', 'team_type', 'match_number',
+                  'event_stage']
+}
+
+# Candidate members of each dimension (DIMENSION_COLUMNS, in that order), as
+# built by DataLoader._build_dim_*, plus a sort_key giving the order serial
+# keys are handed out in: names sorted by code point, venues and events by
+# first appearance.
+DIMENSION_SELECTS = {
+    'dim_date': """
+        SELECT DISTINCT ON (s.date)
+            to_char(s.date, 'YYYYMMDD')::INTEGER AS date_id, s.date AS full_date, s.day, s.month,
+            s.year, s.season, s.day_of_week, s.day_of_week AS day_name, s.week_of_year,
+            to_char(s.date, 'FMMonth') AS month_name, s.quarter, s.is_weekend, FALSE AS is_holiday,
+            s.date AS sort_key
+        FROM staging.ball_delivery s
+        WHERE s.date IS NOT NULL
+        ORDER BY s.date, s.source_row
+    """,
+    'dim_player': """
+        SELECT player_name, NULL AS player_role, 'India' AS nationality, NULL AS batting_style,
+            NULL AS bowling_style, TRUE AS is_active, NULL::SMALLINT AS debut_year,
+            player_name COLLATE "C" AS sort_key
+        FROM (
+            SELECT batter AS player_name FROM staging.ball_delivery
+            UNION SELECT bowler FROM staging.ball_delivery
+            UNION SELECT non_striker FROM staging.ball_delivery
+            UNION SELECT player_out FROM staging.ball_delivery
+            UNION SELECT next_batter FROM staging.ball_delivery
+            UNION SELECT player_of_match FROM staging.ball_delivery
+        ) players
+        WHERE player_name IS NOT NULL
+    """,
+    'dim_team': """
+        SELECT team_name, upper(left(team_name, 3)) AS team_short_name, NULL AS home_city,
+            NULL AS team_color, NULL AS franchise_owner, NULL::SMALLINT AS established_year,
+            TRUE AS is_active, 0 AS championships_won, team_name COLLATE "C" AS sort_key
+        FROM (
+            SELECT batting_team AS team_name FROM staging.ball_delivery
+            UNION SELECT bowling_team FROM staging.ball_delivery
+            UNION SELECT toss_winner FROM staging.ball_delivery
+            UNION SELECT match_won_by FROM staging.ball_delivery
+        ) teams
+        WHERE team_name IS NOT NULL
+    """,
+    'dim_venue': """
+        SELECT venue AS venue_name, city, NULL AS state, 'India' AS country, NULL::INTEGER AS capacity,
+            NULL::SMALLINT AS established_year, NULL AS pitch_type, NULL::SMALLINT AS typical_score,
+            MIN(source_row) AS sort_key
+        FROM staging.ball_delivery
+        WHERE venue IS NOT NULL
+        GROUP BY venue, city
+    """,
+    'dim_event': """
+        SELECT event_name, year AS event_year, 'League' AS event_type, NULL::SMALLINT AS total_matches,
+            NULL::DATE AS start_date, NULL::DATE AS end_date, MIN(source_row) AS sort_key
+        FROM staging.ball_delivery
+        WHERE event_name IS NOT NULL
+        GROUP BY event_name, year
+    """,
+    'dim_umpire': """
+        SELECT umpire_name, NULL AS nationality, NULL::SMALLINT AS experience_years,
+            FALSE AS is_elite_panel, 0 AS total_matches, umpire_name COLLATE "C" AS sort_key
+        FROM (SELECT DISTINCT umpire AS umpire_name FROM staging.ball_delivery) umpires
+        WHERE umpire_name IS NOT NULL
+    """,
+    'dim_match': """
+        SELECT DISTINCT ON (s.match_id)
+            s.match_id, s.match_type, s.balls_per_over,
+            upper(left(s.gender, 1)) || lower(substr(s.gender, 2)) AS gender, s.team_type,
+            CASE WHEN s.match_number ~ '^[0-9]+$' THEN s.match_number::SMALLINT END AS match_number,
+            s.stage AS event_stage, s.match_id AS sort_key
+        FROM staging.ball_delivery s
+        ORDER BY s.match_id, s.source_row
+    """
+}
+
+FACT_BALL_DELIVERY_SQL = f"""
+    INSERT INTO ipl_analytics.fact_ball_delivery (
+        match_id, date_id, batter_id, bowler_id, non_striker_id,
+        batting_team_id, bowling_team_id, venue_id, umpire_id,
+        innings, over_number, ball_number, ball_sequence,
+        bat_position, non_striker_position, match_phase,
+        runs_scored, runs_extras, runs_total, runs_bowler,
+        balls_faced, runs_target, runs_required, balls_remaining,
+        team_runs, team_balls, team_wickets,
+        batter_runs, batter_balls, bowler_wickets,
+        current_run_rate, required_run_rate, pressure_index,
+        is_valid_ball, is_wicket, is_boundary, is_six, is_four,
+        is_dot_ball, is_new_batter, is_striker_out,
+        extra_type, wicket_kind, player_out_id, fielders,
+        batting_partners, next_batter_id
+    )
+    SELECT
+        s.match_id, d.date_id, b.player_id, bo.player_id, ns.player_id,
+        bt.team_id, bw.team_id, v.venue_id, u.umpire_id,
+        s.innings, s."over", s.ball, s.ball_sequence,
+        s.bat_pos, s.non_striker_pos, s.match_phase,
+        s.runs_batter, s.runs_extras, s.runs_total, s.runs_bowler,
+        s.balls_faced, s.runs_target, s.runs_required, s.balls_remaining,
+        s.team_runs, s.team_balls, s.team_wicket,
+        s.batter_runs, s.batter_balls, s.bowler_wicket,
+        s.current_run_rate, s.required_run_rate, s.pressure_index,
+        s.is_valid_ball, s.is_wicket, s.is_boundary, s.is_six, s.is_four,
+        s.is_dot_ball, s.is_new_batter, s.is_striker_out,
+        s.extra_type, s.wicket_kind, po.player_id, s.fielders,
+        s.batting_partners, nb.player_id
+    FROM staging.ball_delivery s
+    {DATE_JOIN.format(alias='d', date='s.date')}
+    {PLAYER_JOIN.format(alias='b', name='s.batter')}
+    {PLAYER_JOIN.format(alias='bo', name='s.bowler')}
+    {PLAYER_JOIN.format(alias='ns', name='s.non_striker')}
+    {PLAYER_JOIN.format(alias='po', name='s.player_out')}
+    {PLAYER_JOIN.format(alias='nb', name='s.next_batter')}
+    {TEAM_JOIN.format(alias='bt', name='s.batting_team')}
+    {TEAM_JOIN.format(alias='bw', name='s.bowling_team')}
+    {VENUE_JOIN.format(alias='v', venue='s.venue', city='s.city')}
+    {UMPIRE_JOIN.format(alias='u', name='s.umpire')}
+    WHERE {FACT_ROWS}
+"""
+
+
+def first(expr, order='s.source_row'):
+    """First non-null value of expr in frame order, like pandas' groupby first"""
+    return f"(array_agg({expr} ORDER BY {order}) FILTER (WHERE {expr} IS NOT NULL))[1]"
+
+
+def count(col):
+    """A count or flag column as an integer, missing values counting as 0"""
+    return f"COALESCE(s.{col}::INTEGER, 0)"
+
+
+def total(expr, *conditions):
+    """SUM of expr over the rows meeting all conditions (0 when there are none)"""
+    if not conditions:
+        return f"SUM({expr})"
+    return f"SUM(CASE WHEN {' AND '.join(conditions)} THEN {expr} ELSE 0 END)"
+
+
+# Match level values of fact_innings_summary and fact_match_summary: each
+# column's first non-null value within the match
+MATCH_INFO_SQL = f"""
+    SELECT s.match_id,
+        {first('s.date')} AS date, {first('s.venue')} AS venue, {first('s.city')} AS city,
+        {first('s.batting_team')} AS batting_team, {first('s.bowling_team')} AS bowling_team,
+        {first('s.toss_winner')} AS toss_winner, {first('s.match_won_by')} AS match_won_by,
+        {first('s.player_of_match')} AS player_of_match
+    FROM staging.ball_delivery s
+    WHERE {FACT_ROWS}
+    GROUP BY s.match_id
+"""
+
+FACT_INNINGS_SUMMARY_SQL = f"""
+    WITH match_info AS ({MATCH_INFO_SQL}),
+    innings AS (
+        SELECT s.match_id, s.innings, s.batting_team, s.bowling_team,
+            COALESCE(SUM(s.runs_total), 0) AS total_runs,
+            {total(count('is_wicket'))} AS total_wickets,
+            COUNT(s.ball_no) AS total_balls
+        FROM staging.ball_delivery s
+        WHERE {FACT_ROWS} AND s.batting_team IS NOT NULL AND s.bowling_team IS NOT NULL
+        GROUP BY s.match_id, s.innings, s.batting_team, s.bowling_team
+    )
+    INSERT INTO ipl_analytics.fact_innings_summary (
+        match_id, innings_number, batting_team_id, bowling_team_id, date_id, venue_id,
+        total_runs, total_wickets, total_overs, total_balls
+    )
+    SELECT i.match_id, i.innings, bt.team_id, bw.team_id, d.date_id, v.venue_id,
+        i.total_runs, i.total_wickets, i.total_balls / 6.0, i.total_balls
+    FROM innings i
+    JOIN match_info m ON m.match_id = i.match_id
+    {TEAM_JOIN.format(alias='bt', name='i.batting_team')}
+    {TEAM_JOIN.format(alias='bw', name='i.bowling_team')}
+    {DATE_JOIN.format(alias='d', date='m.date')}
+    {VENUE_JOIN.format(alias='v', venue='m.venue', city='m.city')}
+"""
+
+FACT_MATCH_SUMMARY_SQL = f"""
+    WITH match_info AS ({MATCH_INFO_SQL}),
+    team_totals AS (
+        SELECT s.match_id, s.innings, MAX(s.team_runs) AS runs, MAX(s.team_wicket) AS wickets,
+            MAX(s.team_balls) AS balls
+        FROM staging.ball_delivery s
+        WHERE {FACT_ROWS}
+        GROUP BY s.match_id, s.innings
+    )
+    INSERT INTO ipl_analytics.fact_match_summary (
+        match_id, date_id, venue_id, team1_id, team2_id,
+        toss_winner_id, match_winner_id, player_of_match_id,
+        team1_score, team1_wickets, team1_overs,
+        team2_score, team2_wickets, team2_overs
+    )
+    SELECT m.match_id, d.date_id, v.venue_id, t1.team_id, t2.team_id,
+        tw.team_id, mw.team_id, pom.player_id,
+        i1.runs, i1.wickets, i1.balls / 6.0,
+        i2.runs, i2.wickets, i2.balls / 6.0
+    FROM match_info m
+    LEFT JOIN team_totals i1 ON i1.match_id = m.match_id AND i1.innings = 1
+    LEFT JOIN team_totals i2 ON i2.match_id = m.match_id AND i2.innings = 2
+    {DATE_JOIN.format(alias='d', date='m.date')}
+    {VENUE_JOIN.format(alias='v', venue='m.venue', city='m.city')}
+    {TEAM_JOIN.format(alias='t1', name='m.batting_team')}
+    {TEAM_JOIN.format(alias='t2', name='m.bowling_team')}
+    {TEAM_JOIN.format(alias='tw', name='m.toss_winner')}
+    {TEAM_JOIN.format(alias='mw', name='m.match_won_by')}
+    {PLAYER_JOIN.format(alias='pom', name='m.player_of_match')}
+"""
+
+# Date, team and venue ids of every ball, resolved as for fact_ball_delivery
+CONTEXT_JOINS = f"""
+    {DATE_JOIN.format(alias='d', date='s.date')}
+    {TEAM_JOIN.format(alias='bt', name='s.batting_team')}
+    {TEAM_JOIN.format(alias='bw', name='s.bowling_team')}
+    {VENUE_JOIN.format(alias='v', venue='s.venue', city='s.city')}
+"""
+CONTEXT_COLUMNS = {'date_id': 'd.date_id', 'batting_team_id': 'bt.team_id',
+                   'bowling_team_id': 'bw.team_id', 'venue_id': 'v.venue_id'}
+
+# Chasing in the last 10 overs, bucketed by required run rate (see
+# DataLoader._load_fact_batter_innings)
+CHASING = "s.innings = 2 AND s.balls_remaining <= 60 AND s.balls_remaining > 0 AND s.runs_required > 0"
+PRESSURE_LEVEL = ("CASE WHEN s.required_run_rate > 12 THEN 'extreme' WHEN s.required_run_rate > 9 THEN 'high' "
+                  "WHEN s.required_run_rate > 6 THEN 'medium' ELSE 'low' END")
+
+
+def innings_fact_sql(table, player_key, player_col, columns):
+    """INSERT ... SELECT of a per-player innings fact grouped by match, innings and player id"""
+    select = {**{col: first(expr) for col, expr in CONTEXT_COLUMNS.items()}, **columns}
+    return f"""
+        INSERT INTO ipl_analytics.{table} (match_id, innings, {player_key}, {', '.join(select)})
+        SELECT s.match_id, s.innings, p.player_id,
+            {', '.join(f"{expr} AS {col}" for col, expr in select.items())}
+        FROM staging.ball_delivery s
+        {PLAYER_JOIN.format(alias='p', name=f's.{player_col}')}
+        {CONTEXT_JOINS}
+        WHERE {FACT_ROWS} AND p.player_id IS NOT NULL
+        GROUP BY s.match_id, s.innings, p.player_id
+    """
+
+
+def batter_innings_sql():
+    measures = {
+        'balls': '1', 'runs': count('runs_batter'), 'fours': count('is_four'), 'sixes': count('is_six'),
+        'boundaries': count('is_boundary'), 'dots': count('is_dot_ball'), 'extras': count('runs_extras'),
+        'wickets': count('is_wicket')
+    }
+    columns = {name: total(expr) for name, expr in measures.items()}
+    columns['dismissals'] = total(measures['wickets'], 's.batter = s.player_out')
+    for prefix, label in PHASE_PREFIXES.items():
+        for name, expr in measures.items():
+            columns[f"{prefix}_{name}"] = total(expr, f"s.match_phase = '{label}'")
+    for level in PRESSURE_LEVELS:
+        for name in ('balls', 'runs', 'boundaries', 'wickets'):
+            columns[f"pressure_{level}_{name}"] = total(measures[name], CHASING, f"{PRESSURE_LEVEL} = '{level}'")
+    columns['highest_batter_runs'] = 'MAX(s.batter_runs)'
+    return innings_fact_sql('fact_batter_innings', 'batter_id', 'batter', columns)
+
+
+def bowler_innings_sql():
+    # Bowling figures count legal deliveries only, extras count every delivery
+    legal = 's.is_valid_ball'
+    measures = {
+        'balls': '1', 'runs_conceded': count('runs_bowler'), 'wickets': count('is_wicket'),
+        'dots': count('is_dot_ball'), 'boundaries': count('is_boundary')
+    }
+    columns = {
+        'deliveries': 'COUNT(*)',
+        'extras': total(count('runs_extras')),
+        'all_wickets': total(count('is_wicket')),
+        **{name: total(expr, legal) for name, expr in measures.items()}
+    }
+    for prefix, label in PHASE_PREFIXES.items():
+        phase = f"s.match_phase = '{label}'"
+        for name, expr in measures.items():
+            columns[f"{prefix}_{name}"] = total(expr, phase, legal)
+        columns[f"{prefix}_extras"] = total(count('runs_extras'), phase)
+    return innings_fact_sql('fact_bowler_innings', 'bowler_id', 'bowler', columns)
+
+
+# Partnerships as in DataLoader._build_fact_partnership: a new one starts
+# with the innings, after every wicket ball and wherever the pair at the
+# crease changes. Balls with an unknown batter or non-striker (or both the
+# same) form no pair but still take a partnership number.
+FACT_PARTNERSHIP_SQL = f"""
+    WITH balls AS (
+        SELECT s.match_id, s.innings, s.ball_sequence, s.is_wicket,
+            COALESCE(b.player_id, -1) AS batter_id,
+            LEAST(COALESCE(b.player_id, -1), COALESCE(ns.player_id, -1)) AS player1_id,
+            GREATEST(COALESCE(b.player_id, -1), COALESCE(ns.player_id, -1)) AS player2_id,
+            po.player_id AS player_out_id,
+            {', '.join(f"{expr} AS {col}" for col, expr in CONTEXT_COLUMNS.items())},
+            {count('runs_total')} AS runs, {count('runs_batter')} AS runs_batter,
+            {count('runs_extras')} AS extras, {count('is_valid_ball')} AS balls,
+            {count('is_boundary')} AS boundaries, {count('is_four')} AS fours, {count('is_six')} AS sixes
+        FROM staging.ball_delivery s
+        {PLAYER_JOIN.format(alias='b', name='s.batter')}
+        {PLAYER_JOIN.format(alias='ns', name='s.non_striker')}
+        {PLAYER_JOIN.format(alias='po', name='s.player_out')}
+        {CONTEXT_JOINS}
+        WHERE {FACT_ROWS}
+    ),
+    starts AS (
+        SELECT *,
+            CASE WHEN LAG(player1_id) OVER innings_balls IS DISTINCT FROM player1_id
+                   OR LAG(player2_id) OVER innings_balls IS DISTINCT FROM player2_id
+                   OR LAG(is_wicket) OVER innings_balls
+                 THEN 1 ELSE 0 END AS is_start
+        FROM balls
+        WINDOW innings_balls AS (PARTITION BY match_id, innings ORDER BY ball_sequence)
+    ),
+    numbered AS (
+        SELECT *, SUM(is_start) OVER (PARTITION BY match_id, innings ORDER BY ball_sequence) AS partnership_number
+        FROM starts
+    ),
+    partnerships AS (
+        SELECT match_id, innings, partnership_number,
+            {', '.join(f"(array_agg({col} ORDER BY ball_sequence))[1] AS {col}" for col in CONTEXT_COLUMNS)},
+            MIN(player1_id) AS player1_id, MIN(player2_id) AS player2_id,
+            MIN(ball_sequence) AS start_ball, MAX(ball_sequence) AS end_ball,
+            SUM(runs) AS runs,
+            SUM(CASE WHEN batter_id = player1_id THEN runs_batter ELSE 0 END) AS player1_runs,
+            SUM(CASE WHEN batter_id <> player1_id THEN runs_batter ELSE 0 END) AS player2_runs,
+            SUM(extras) AS extras, SUM(balls) AS balls, COUNT(*) AS deliveries,
+            SUM(boundaries) AS boundaries, SUM(fours) AS fours, SUM(sixes) AS sixes,
+            (array_agg(CASE WHEN is_wicket THEN player_out_id END ORDER BY ball_sequence DESC))[1]
+                AS dismissed_player_id
+        FROM numbered
+        GROUP BY match_id, innings, partnership_number
+    )
+    INSERT INTO ipl_analytics.fact_partnership (
+        match_id, innings, partnership_number, {', '.join(CONTEXT_COLUMNS)},
+        player1_id, player2_id, start_ball, end_ball, runs, player1_runs, player2_runs,
+        extras, balls, deliveries, boundaries, fours, sixes, dismissed_player_id
+    )
+    SELECT match_id, innings, partnership_number, {', '.join(CONTEXT_COLUMNS)},
+        player1_id, player2_id, start_ball, end_ball, runs, player1_runs, player2_runs,
+        extras, balls, deliveries, boundaries, fours, sixes, dismissed_player_id
+    FROM partnerships
+    WHERE player1_id > 0 AND player1_id <> player2_id
+"""
+
+FACT_SQL = {
+    'fact_ball_delivery': FACT_BALL_DELIVERY_SQL,
+    'fact_innings_summary': FACT_INNINGS_SUMMARY_SQL,
+    'fact_batter_innings': batter_innings_sql(),
+    'fact_bowler_innings': bowler_innings_sql(),
+    'fact_partnership': FACT_PARTNERSHIP_SQL,
+    'fact_match_summary': FACT_MATCH_SUMMARY_SQL
+}
+
+
+def check_fact_rows(df):
+    """Same checks as DataLoader._validate_fact_data, without copying the frame"""
+    duplicated = df.duplicated(subset=['match_id', 'innings', 'ball_sequence'])
+    if duplicated.any():
+        logger.error(f"Found {int(duplicated.sum())} duplicate keys in data!")
+        raise ValueError("Duplicate keys found in source data")
+
+    invalid_innings = int((~df['innings'].isin([1, 2])).sum())
+    if invalid_innings:
+        logger.warning(f"{invalid_innings} rows with invalid innings (not 1 or 2) are left out of the facts")
+
+
+class StagingLoader(DataLoader):
+    """Set-based ELT load through the UNLOGGED staging.ball_delivery table.
+
+    The transformed frame is COPYed into staging once. The dimension
+    upserts, surrogate key lookups and every fact are then INSERT ... SELECT
+    statements joining staging to the dimensions inside Postgres, instead of
+    being resolved and written back from pandas. With workers > 1 the facts
+    are inserted concurrently, each on its own connection, once staging and
+    the dimensions are committed; otherwise the whole load is one
+    transaction. Either way a load holds an advisory lock on staging until
+    it is done, so ELT loads run one at a time. Season reloads keep using
+    the DataLoader path.
+    """
+
+    def load(self, df, incremental=False, dimensions=True, facts=True):
+        if not (dimensions or facts):
+            return
+        if facts:
+            check_fact_rows(df)
+
+        with self._staging_lock(), self.bulk_load_indexes(enabled=facts and not incremental):
+            if self.workers > 1 and facts:
+                self._load_concurrently(df, incremental, dimensions)
+            else:
+                with self.engine.begin() as conn:
+                    self._prepare(conn, df, incremental, dimensions, facts)
+                    if facts:
+                        for table in FACT_TABLES:
+                            self._insert_fact(conn, table)
+                    conn.execute(text(f"TRUNCATE TABLE {STAGING_TABLE}"))
+        logger.info("All tables loaded successfully (set-based)")
+
+    def load_dimensions(self, df, incremental=False):
+        self.load(df, incremental=incremental, dimensions=True, facts=False)
+
+    def load_facts(self, df, incremental=False):
+        self.load(df, incremental=incremental, dimensions=False, facts=True)
+
+    def load_parallel(self, df, incremental=False, dimensions=True, facts=True):
+        self.load(df, incremental=incremental, dimensions=dimensions, facts=facts)
+
+    @contextmanager
+    def _staging_lock(self):
+        """Hold a session advisory lock on staging for a whole load.
+
+        The concurrent path commits staging before the facts read it, so the
+        TRUNCATE lock alone would let another load restage it in between.
+        """
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {'name': STAGING_TABLE})
+            # Session-level: the lock outlives this transaction, the connection stays idle
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {'name': STAGING_TABLE})
+                conn.commit()
+
+    def _load_concurrently(self, df, incremental, dimensions):
+        """Commit staging and the dimensions, then insert the facts side by side"""
+        match_ids = df['match_id'].unique()
+        with self.engine.begin() as conn:
+            self._prepare(conn, df, incremental, dimensions, facts=True)
+
+        def task(table):
+            def insert():
+                with self.engine.begin() as conn:
+                    self._insert_fact(conn, table)
+            return insert
+
+        scheduler = LoadScheduler(max_workers=self.workers)
+        for table in FACT_TABLES:
+            scheduler.add(table, task(table))
+        try:
+            timings = scheduler.run()
+        except Exception:
+            self._discard_partial_load(match_ids, incremental, dimensions, facts=True)
+            raise
+        finally:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"TRUNCATE TABLE {STAGING_TABLE}"))
+        logger.info("Fact timings: " + ", ".join(f"{table}={elapsed:.2f}s" for table, elapsed in timings.items()))
+
+    def _prepare(self, conn, df, incremental, dimensions, facts):
+        """Empty or trim the target tables, stage the frame and upsert the dimensions"""
+        # Other ELT loads wait on the advisory lock (_staging_lock), not on this TRUNCATE
+        conn.execute(text(f"TRUNCATE TABLE {STAGING_TABLE}"))
+        if not incremental:
+            if dimensions:
+                self._truncate_dimensions(conn)
+            # Named too, as rebuild_indexes drops the FKs the CASCADE follows
+            if facts:
+                conn.execute(text(f"TRUNCATE TABLE {', '.join(f'ipl_analytics.{t}' for t in FACT_TABLES)}"))
+
+        self._stage(conn, df)
+
+        if dimensions:
+            for table in DIMENSION_TABLES:
+                self._upsert_dimension_from_staging(conn, table)
+            self.keys.invalidate()
+
+        if facts:
+            if incremental:
+                for table in FACT_TABLES:
+                    result = conn.execute(text(
+                        f"DELETE FROM ipl_analytics.{table} "
+                        f"WHERE match_id IN (SELECT DISTINCT match_id FROM {STAGING_TABLE})"
+                    ))
+                    if result.rowcount:
+                        logger.info(f"Removed {result.rowcount} stale rows from {table}")
+            years = conn.execute(text(
+                f"SELECT DISTINCT EXTRACT(YEAR FROM date)::INTEGER FROM {STAGING_TABLE} WHERE date IS NOT NULL"
+            )).scalars().all()
+            for table in FACT_TABLES:
+                if self.partitions.is_partitioned(table):
+                    self.partitions.ensure_partitions(conn, table, years)
+
+    def _stage(self, conn, df):
+        """COPY the columns staging.ball_delivery has into it, in frame order"""
+        with stage('load.staging', rows_in=len(df)) as metrics:
+            start = time.perf_counter()
+            staged = conn.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'staging' AND table_name = 'ball_delivery'
+                ORDER BY ordinal_position
+            """)).scalars().all()
+            if not staged:
+                raise RuntimeError(f"{STAGING_TABLE} does not exist - run scripts/setup_database.py")
+
+            columns = [col for col in staged if col in df.columns]
+            frame = pd.DataFrame({
+                'source_row': np.arange(len(df), dtype='int64'),
+                **{col: df[col].astype(bool) if col in FLAG_COLUMNS else df[col] for col in columns}
+            }, index=df.index)
+            copy_arrow(conn, frame, 'ball_delivery', schema='staging', chunk_size=self.copy_chunk_size)
+            del frame
+
+            # Planner statistics for the joins below
+            conn.execute(text(f"ANALYZE {STAGING_TABLE}"))
+            metrics.rows_out = len(df)
+        logger.info(f"Staged {len(df)} rows ({len(columns)} columns) in {time.perf_counter() - start:.2f}s")
+
+    def _upsert_dimension_from_staging(self, conn, table):
+        """Insert the staged members a dimension does not have yet"""
+        start = time.perf_counter()
+        with stage(f"load.{table}") as metrics:
+            columns = ', '.join(DIMENSION_COLUMNS[table])
+            # Same NOT EXISTS as DataLoader._upsert_dimension, so NULL key parts match
+            key_match = ' AND '.join(f"t.{key} IS NOT DISTINCT FROM s.{key}" for key in DIMENSION_KEYS[table])
+            result = conn.execute(text(f"""
+                INSERT INTO ipl_analytics.{table} ({columns})
+                SELECT {columns} FROM ({DIMENSION_SELECTS[table]}) s
+                WHERE NOT EXISTS (SELECT 1 FROM ipl_analytics.{table} t WHERE {key_match})
+                ORDER BY s.sort_key
+                ON CONFLICT DO NOTHING
+            """))
+            metrics.rows_out = result.rowcount
+        logger.info(f"Loaded {result.rowcount} rows into {table} ({time.perf_counter() - start:.2f}s)")
+
+    def _insert_fact(self, conn, table):
+        start = time.perf_counter()
+        with stage(f"load.{table}") as metrics:
+            result = conn.execute(text(FACT_SQL[table]))
+            metrics.rows_out = result.rowcount
+        logger.info(f"Loaded {result.rowcount} {table} rows ({time.perf_counter() - start:.2f}s)")
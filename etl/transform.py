@@ -2,137 +2,237 @@
 import pandas as pd
 import numpy as np
 import logging
+from .metrics import stage
 
 logger = logging.getLogger(__name__)
 
+# match_phase is stored as a categorical; overs outside 0-20 keep the 'nan'
+# label that the old str conversion of pd.cut produced
+PHASE_LABELS = ['Powerplay', 'Middle', 'Death', 'nan']
+PHASE_BOUNDS = np.array([6, 15, 20])
+
 class DataTransformer:
-    
-    def __init__(self, df):
-        self.df = df.copy()
-        
+    """Derive the per-ball warehouse columns in one pass over NumPy arrays.
+
+    Source columns are pulled out of the frame once, every derived column
+    is computed from those arrays and assigned back whole, so the input is
+    never written to. Rows are only reordered when the input is not already
+    sorted by match, innings and ball.
+    """
+
+    def __init__(self, df, copy=True):
+        # copy=False lets callers that own the frame (e.g. streamed chunks)
+        # add the derived columns to it in place. Existing columns are only
+        # ever replaced, never modified, so copy=True needs just a shallow copy
+        self.df = df.copy(deep=False) if copy else df
+
     def transform(self):
         logger.info("Starting data transformations...")
-        
-        self._create_ball_sequence() 
-        self._add_calculated_fields()
-        self._classify_match_phases()
-        self._calculate_pressure_metrics()
-        self._add_flags()
-        self._clean_data()
-        
+
+        steps = [
+            self._create_ball_sequence,
+            self._add_date_attributes,
+            self._derive_ball_fields,
+            self._clean_data
+        ]
+        for step in steps:
+            with stage(f"transform.{step.__name__.lstrip('_')}", rows_in=len(self.df)) as metrics:
+                step()
+                metrics.rows_out = len(self.df)
+
         logger.info("Transformations completed")
         return self.df
-    
-    def _add_calculated_fields(self):
-        logger.info("Adding calculated fields...")
-        
-        # Date components
-        self.df['day'] = self.df['date'].dt.day
-        self.df['month'] = self.df['date'].dt.month
-        self.df['year'] = self.df['date'].dt.year
-        self.df['day_of_week'] = self.df['date'].dt.day_name()
-        self.df['week_of_year'] = self.df['date'].dt.isocalendar().week
-        self.df['quarter'] = self.df['date'].dt.quarter
-        self.df['is_weekend'] = self.df['date'].dt.dayofweek.isin([5, 6])
-
-        self.df['balls_remaining'] = np.where(
-            self.df['innings'] == 2,
-            120 - self.df['team_balls'],
-            0
-        )
-
-        self.df['runs_required'] = np.where(
-            self.df['innings'] == 2,
-            self.df['runs_target'] - self.df['team_runs'],
-            0
-        )
-            
-        self.df['current_run_rate'] = np.where(
-            self.df['team_balls'] > 0,
-            (self.df['team_runs'] * 6.0) / self.df['team_balls'],
-            0
-        )   
-        
-        self.df['required_run_rate'] = np.where(
-            (self.df['innings'] == 2) & (self.df['balls_remaining'] > 0),
-            (self.df['runs_required'] * 6.0) / self.df['balls_remaining'],
-            0  
-        )
-        
-        self.df['current_run_rate'] = self.df['current_run_rate'].clip(upper=99.99)
-        self.df['required_run_rate'] = self.df['required_run_rate'].clip(upper=99.99)
-    
-    def _classify_match_phases(self):
-        logger.info("Classifying match phases...")
-        
-        self.df['match_phase'] = pd.cut(
-            self.df['over'],
-            bins=[0, 6, 15, 20],
-            labels=['Powerplay', 'Middle', 'Death'],
-            include_lowest=True
-        )
-        
-        self.df['match_phase'] = self.df['match_phase'].astype(str)
-    
-    def _calculate_pressure_metrics(self):
-        logger.info("Calculating pressure metrics...")
-        
-        self.df['pressure_index'] = np.where(
-            (self.df['innings'] == 2) & (self.df['balls_remaining'] > 0),
-            np.minimum(  # Cap at 999.99
-                (self.df['required_run_rate'] * 10) + 
-                (10 / (self.df['balls_remaining'] + 1)) +
-                (self.df['team_wicket'] * 5),
-                999.99
-            ),
-            0
-        )
-    
-    def _add_flags(self):
-        logger.info("Adding flags...")
-        
-        self.df['is_wicket'] = self.df['wicket_kind'].notna()
-        self.df['is_boundary'] = self.df['runs_batter'].isin([4, 6])
-        self.df['is_six'] = self.df['runs_batter'] == 6
-        self.df['is_four'] = self.df['runs_batter'] == 4
-        self.df['is_dot_ball'] = (self.df['runs_total'] == 0) & (self.df['valid_ball'] == True)
-        self.df['is_new_batter'] = self.df.get('new_batter', False).fillna(False)
-        self.df['is_striker_out'] = self.df.get('striker_out', False).fillna(False)
-        self.df['is_valid_ball'] = self.df['valid_ball'].fillna(True)
-    
-    def _clean_data(self):
-        logger.info("Cleaning data...")
-        
-        string_cols = self.df.select_dtypes(include=['object']).columns
-        for col in string_cols:
-            if col != 'date': 
-                self.df[col] = self.df[col].str.strip()
-        
-        self.df['extra_type'] = self.df['extra_type'].fillna('none')
-        self.df['wicket_kind'] = self.df['wicket_kind'].fillna('not out')
-        
-        numeric_cols = ['runs_batter', 'runs_extras', 'runs_total', 'team_runs', 'team_wicket']
-        for col in numeric_cols:
-            self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(0)
-    
+
+    def _array(self, col):
+        """Column values without the index: ndarray, or the extension array of nullable columns"""
+        series = self.df[col]
+        return series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+
     def _create_ball_sequence(self):
         logger.info("Creating ball sequence...")
-        
+
         if 'over' not in self.df.columns or 'ball' not in self.df.columns:
             logger.error("Missing 'over' or 'ball' columns")
             raise ValueError("Cannot create ball_sequence without over and ball columns")
-        
-        self.df['ball_no'] = self.df['over'] + (self.df['ball'] / 10.0)
-        
-        self.df = self.df.sort_values(['match_id', 'innings', 'ball_no'])
-        
-        self.df['ball_sequence'] = self.df.groupby(['match_id', 'innings']).cumcount() + 1
-        
+
+        ball_no = self._array('over') + (self._array('ball') / 10.0)
+        keys = [self._array('match_id'), self._array('innings'), ball_no]
+
+        if not all(isinstance(key, np.ndarray) and key.dtype.kind in 'iuf' for key in keys) or \
+                any(key.dtype.kind == 'f' and np.isnan(key).any() for key in keys):
+            # Missing keys: leave their ordering to pandas
+            self.df['ball_no'] = ball_no
+            self.df = self.df.sort_values(['match_id', 'innings', 'ball_no'])
+            self.df['ball_sequence'] = self.df.groupby(['match_id', 'innings']).cumcount() + 1
+        else:
+            if not self._is_sorted(*keys):
+                order = np.lexsort(keys[::-1])
+                self.df = self.df.take(order)
+                keys = [key[order] for key in keys]
+            self.df['ball_no'] = keys[2]
+            self.df['ball_sequence'] = self._sequence_within_innings(keys[0], keys[1])
+
         logger.info(f"Ball sequence created. Range: {self.df['ball_sequence'].min()} to {self.df['ball_sequence'].max()}")
 
+    @staticmethod
+    def _is_sorted(match_id, innings, ball_no):
+        same_match = match_id[1:] == match_id[:-1]
+        same_innings = same_match & (innings[1:] == innings[:-1])
+        ordered = (match_id[1:] > match_id[:-1]) | \
+            (same_match & (innings[1:] > innings[:-1])) | \
+            (same_innings & (ball_no[1:] >= ball_no[:-1]))
+        return bool(ordered.all())
+
+    @staticmethod
+    def _sequence_within_innings(match_id, innings):
+        """1-based position of each ball in its innings (rows sorted by match and innings)"""
+        n = len(match_id)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        starts = np.flatnonzero(np.r_[True, (match_id[1:] != match_id[:-1]) | (innings[1:] != innings[:-1])])
+        lengths = np.diff(np.r_[starts, n])
+        return np.arange(1, n + 1, dtype=np.int64) - np.repeat(starts, lengths)
+
+    def _add_date_attributes(self):
+        """Date parts computed once per distinct date and broadcast to the balls"""
+        logger.info("Adding date attributes...")
+
+        # NaT gets a code of its own, so missing dates come out as in a per-row .dt
+        codes, uniques = pd.factorize(self.df['date'], use_na_sentinel=False)
+        dates = pd.Series(uniques).dt
+        attributes = {
+            'day': dates.day,
+            'month': dates.month,
+            'year': dates.year,
+            'day_of_week': dates.day_name(),
+            'week_of_year': dates.isocalendar().week,
+            'quarter': dates.quarter,
+            'is_weekend': dates.dayofweek.isin([5, 6])
+        }
+        for col, values in attributes.items():
+            self.df[col] = values.array.take(codes)
+
+    def _derive_ball_fields(self):
+        """Run rates, phase, pressure and flags, all from the same source arrays"""
+        logger.info("Deriving run rates, phases, pressure and flags...")
+
+        innings = self._array('innings')
+        team_balls = self._array('team_balls')
+        team_runs = self._array('team_runs')
+        second_innings = innings == 2
+        derived = {}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            balls_remaining = np.where(second_innings, 120 - team_balls, 0)
+
+            # runs_target is NaN for first innings; go through float64 so a
+            # nullable Int16 column does not turn the result into objects
+            runs_required = np.where(
+                second_innings,
+                self._array('runs_target').astype('float64') - team_runs,
+                0
+            )
+            chasing = second_innings & (balls_remaining > 0)
+            current_run_rate = self._clip(
+                np.where(team_balls > 0, (team_runs * 6.0) / team_balls, 0), 99.99
+            )
+            required_run_rate = self._clip(
+                np.where(chasing, (runs_required * 6.0) / balls_remaining, 0), 99.99
+            )
+            derived['balls_remaining'] = balls_remaining
+            derived['runs_required'] = runs_required
+            derived['current_run_rate'] = current_run_rate
+            derived['required_run_rate'] = required_run_rate
+
+            derived['match_phase'] = self._phase_codes()
+
+            derived['pressure_index'] = np.where(
+                chasing,
+                np.minimum(  # Cap at 999.99
+                    (required_run_rate * 10) +
+                    (10 / (balls_remaining + 1)) +
+                    (self._array('team_wicket') * 5),
+                    999.99
+                ),
+                0
+            )
+
+        runs_batter = self.df['runs_batter']
+        valid_ball = self.df['valid_ball']
+        derived['is_wicket'] = self.df['wicket_kind'].notna().to_numpy()
+        derived['is_boundary'] = runs_batter.isin([4, 6]).to_numpy()
+        derived['is_six'] = self._array('runs_batter') == 6
+        derived['is_four'] = self._array('runs_batter') == 4
+        derived['is_dot_ball'] = (self._array('runs_total') == 0) & (self._array('valid_ball') == True)
+        derived['is_new_batter'] = self.df.get('new_batter', False).fillna(False).array
+        derived['is_striker_out'] = self.df.get('striker_out', False).fillna(False).array
+        derived['is_valid_ball'] = valid_ball.fillna(True).array
+
+        for col, values in derived.items():
+            self.df[col] = values
+
+    @staticmethod
+    def _clip(values, upper):
+        if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+            return np.minimum(values, upper)
+        return pd.Series(values).clip(upper=upper).array
+
+    def _phase_codes(self):
+        """Powerplay (overs 0-6), Middle (7-15), Death (16-20) as int8 category codes"""
+        over = self.df['over'].to_numpy(dtype='float64', na_value=np.nan)
+        codes = np.searchsorted(PHASE_BOUNDS, over).astype(np.int8)
+        codes[~((over >= 0) & (over <= PHASE_BOUNDS[-1]))] = PHASE_LABELS.index('nan')
+        return pd.Categorical.from_codes(codes, categories=PHASE_LABELS)
+
+    def _clean_data(self):
+        logger.info("Cleaning data...")
+
+        fill_values = {'extra_type': 'none', 'wicket_kind': 'not out'}
+
+        # Strings are stripped once per distinct value and broadcast back
+        string_cols = self.df.select_dtypes(include=['object']).columns
+        for col in string_cols:
+            if col == 'date':
+                continue
+            codes, uniques = pd.factorize(self.df[col])
+            stripped = pd.Series(uniques, dtype=object).str.strip()
+            # The extra slot at the end is picked by the -1 code of missing values
+            values = np.append(stripped.to_numpy(dtype=object), np.nan)
+            if col in fill_values:
+                values[pd.isna(values)] = fill_values[col]
+            self.df[col] = values[codes]
+
+        # Categorical columns are stripped once per category, not per row
+        category_cols = self.df.select_dtypes(include=['category']).columns
+        for col in category_cols:
+            categories = self.df[col].cat.categories
+            if categories.dtype != object:
+                continue
+            stripped = categories.str.strip()
+            if stripped.is_unique:
+                self.df[col] = self.df[col].cat.rename_categories(stripped)
+            else:
+                self.df[col] = self.df[col].astype(object).str.strip().astype('category')
+
+        for col, fill_value in fill_values.items():
+            if self.df[col].dtype == object:
+                continue  # filled while stripping
+            if isinstance(self.df[col].dtype, pd.CategoricalDtype) and \
+                    fill_value not in self.df[col].cat.categories:
+                self.df[col] = self.df[col].cat.add_categories([fill_value])
+            self.df[col] = self.df[col].fillna(fill_value)
+
+        # Numeric columns without missing values are already what to_numeric returns
+        numeric_cols = ['runs_batter', 'runs_extras', 'runs_total', 'team_runs', 'team_wicket']
+        for col in numeric_cols:
+            series = self.df[col]
+            if pd.api.types.is_numeric_dtype(series.dtype) and not series.hasnans:
+                continue
+            self.df[col] = pd.to_numeric(series, errors='coerce').fillna(0)
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     df = pd.read_csv("data/raw/ipl.csv", nrows=1000, parse_dates=['date'])
     transformer = DataTransformer(df)
     transformed_df = transformer.transform()
-    print(transformed_df[['match_phase', 'pressure_index', 'is_boundary']].head(20))
\ No newline at end of file
+    print(transformed_df[['match_phase', 'pressure_index', 'is_boundary']].head(20))
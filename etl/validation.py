@@ -0,0 +1,183 @@
+import logging
+import time
+from sqlalchemy import text
+from .scheduler import LoadScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class Rule:
+    """A row-level data quality rule.
+
+    predicate is a SQL condition over the table (alias f) counting the
+    violating rows; joins are LEFT JOINs it needs (e.g. to spot orphans).
+    frame_check, if given, is the same rule over a transformed frame: a
+    callable returning a boolean mask of the violating rows.
+    """
+
+    def __init__(self, name, table, predicate, frame_check=None, joins=(), severity='warn'):
+        self.name = name
+        self.table = table
+        self.predicate = predicate
+        self.frame_check = frame_check
+        self.joins = tuple(joins)
+        self.severity = severity
+
+
+def _column(df, col):
+    return df[col].to_numpy(dtype='float64', na_value=float('nan'))
+
+
+RULES = [
+    Rule('null_batters', 'fact_ball_delivery', "f.batter_id IS NULL",
+         lambda df: df['batter'].isna().to_numpy(), severity='error'),
+    Rule('null_bowlers', 'fact_ball_delivery', "f.bowler_id IS NULL",
+         lambda df: df['bowler'].isna().to_numpy(), severity='error'),
+    Rule('orphan_batters', 'fact_ball_delivery', "f.batter_id IS NOT NULL AND batter.player_id IS NULL",
+         joins=["ipl_analytics.dim_player batter ON batter.player_id = f.batter_id"]),
+    Rule('orphan_bowlers', 'fact_ball_delivery', "f.bowler_id IS NOT NULL AND bowler.player_id IS NULL",
+         joins=["ipl_analytics.dim_player bowler ON bowler.player_id = f.bowler_id"]),
+    Rule('invalid_runs', 'fact_ball_delivery', "f.runs_scored < 0 OR f.runs_scored > 7",
+         lambda df: (_column(df, 'runs_batter') < 0) | (_column(df, 'runs_batter') > 7)),
+    Rule('invalid_overs', 'fact_ball_delivery', "f.over_number < 0 OR f.over_number > 50",
+         lambda df: (_column(df, 'over') < 0) | (_column(df, 'over') > 50)),
+    Rule('invalid_innings', 'fact_ball_delivery', "f.innings NOT IN (1, 2)",
+         lambda df: ~df['innings'].isin([1, 2]).to_numpy()),
+    Rule('null_match_teams', 'fact_match_summary', "f.team1_id IS NULL OR f.team2_id IS NULL",
+         severity='error'),
+    Rule('negative_scores', 'fact_match_summary', "f.team1_score < 0 OR f.team2_score < 0"),
+    Rule('invalid_innings_totals', 'fact_innings_summary',
+         "f.total_runs < 0 OR f.total_balls <= 0 OR f.total_wickets > 10"),
+]
+
+# Tables only counted (no row rules)
+COUNTED_TABLES = ['dim_player', 'dim_team', 'dim_venue', 'dim_date', 'dim_match']
+
+# fact_match_summary against the ball-level totals of every match
+MATCH_RECONCILIATION_SQL = """
+    WITH balls AS (
+        SELECT match_id,
+               SUM(runs_total) FILTER (WHERE innings = 1) AS team1_runs,
+               SUM(runs_total) FILTER (WHERE innings = 2) AS team2_runs,
+               MAX(team_wickets) FILTER (WHERE innings = 1) AS team1_wickets,
+               MAX(team_wickets) FILTER (WHERE innings = 2) AS team2_wickets
+        FROM ipl_analytics.fact_ball_delivery
+        GROUP BY match_id
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE m.match_id IS NULL) AS matches_without_summary,
+        COUNT(*) FILTER (WHERE b.match_id IS NULL) AS summaries_without_balls,
+        COUNT(*) FILTER (WHERE m.team1_score IS DISTINCT FROM b.team1_runs
+                            OR m.team2_score IS DISTINCT FROM b.team2_runs) AS score_mismatches,
+        COUNT(*) FILTER (WHERE m.team1_wickets IS DISTINCT FROM b.team1_wickets
+                            OR m.team2_wickets IS DISTINCT FROM b.team2_wickets) AS wicket_mismatches
+    FROM ipl_analytics.fact_match_summary m
+    FULL JOIN balls b ON b.match_id = m.match_id
+"""
+
+
+class ValidationResult:
+    """Violation counts of one check (a table scan or a reconciliation)"""
+
+    def __init__(self, check, rows, violations, severities, seconds):
+        self.check = check
+        self.rows = rows
+        self.violations = violations
+        self.severities = severities
+        self.seconds = seconds
+
+    @property
+    def errors(self):
+        return {name: count for name, count in self.violations.items()
+                if count and self.severities.get(name) == 'error'}
+
+    @property
+    def warnings(self):
+        return {name: count for name, count in self.violations.items()
+                if count and self.severities.get(name) != 'error'}
+
+    def summary(self):
+        found = {name: count for name, count in self.violations.items() if count}
+        rows = f"{self.rows:,} rows" if self.rows is not None else ''
+        if not found:
+            return f"{rows}{', ' if rows else ''}all rules passed"
+        return f"{rows}{': ' if rows else ''}" + ", ".join(f"{count:,} {name}" for name, count in found.items())
+
+
+class ValidationEngine:
+    """Run the warehouse rules with one aggregate scan per table, tables in parallel.
+
+    All rules of a table become COUNT(*) FILTER columns of a single
+    SELECT over it (with the LEFT JOINs they need), and every table's scan
+    plus the per-match reconciliation run as separate tasks on the
+    LoadScheduler thread pool.
+    """
+
+    def __init__(self, engine, rules=RULES, counted_tables=COUNTED_TABLES, workers=4):
+        self.engine = engine
+        self.rules = list(rules)
+        self.counted_tables = list(counted_tables)
+        self.workers = workers
+
+    def table_query(self, table):
+        rules = [rule for rule in self.rules if rule.table == table]
+        columns = ["COUNT(*) AS row_count"] + [
+            f"COUNT(*) FILTER (WHERE {rule.predicate}) AS {rule.name}" for rule in rules
+        ]
+        joins = list(dict.fromkeys(join for rule in rules for join in rule.joins))
+        return f"SELECT {', '.join(columns)} FROM ipl_analytics.{table} f " + \
+            " ".join(f"LEFT JOIN {join}" for join in joins)
+
+    def run(self):
+        tables = list(dict.fromkeys([rule.table for rule in self.rules] + self.counted_tables))
+        results = {}
+
+        def scan(table):
+            severities = {rule.name: rule.severity for rule in self.rules if rule.table == table}
+            start = time.perf_counter()
+            with self.engine.connect() as conn:
+                counts = conn.execute(text(self.table_query(table))).one()._asdict()
+            rows = counts.pop('row_count')
+            results[table] = ValidationResult(table, rows, counts, severities, time.perf_counter() - start)
+
+        def reconcile():
+            start = time.perf_counter()
+            with self.engine.connect() as conn:
+                counts = conn.execute(text(MATCH_RECONCILIATION_SQL)).one()._asdict()
+            results['match_reconciliation'] = ValidationResult(
+                'match_reconciliation', None, counts, {}, time.perf_counter() - start
+            )
+
+        scheduler = LoadScheduler(max_workers=self.workers)
+        for table in tables:
+            scheduler.add(table, lambda table=table: scan(table))
+        scheduler.add('match_reconciliation', reconcile)
+        scheduler.run()
+
+        return [results[name] for name in tables + ['match_reconciliation']]
+
+
+def validate_frame(df, rules=RULES):
+    """Apply the frame-capable rules and the per-match totals check to a transformed frame.
+
+    Catches bad data before any of it reaches the database. Returns a
+    ValidationResult like the warehouse checks.
+    """
+    start = time.perf_counter()
+    rules = [rule for rule in rules if rule.frame_check is not None]
+    violations = {rule.name: int(rule.frame_check(df).sum()) for rule in rules}
+    severities = {rule.name: rule.severity for rule in rules}
+
+    # The same keys the fact table's unique constraint enforces
+    keys = df[['match_id', 'innings', 'ball_sequence']]
+    violations['duplicate_balls'] = int(keys.duplicated().sum())
+    severities['duplicate_balls'] = 'error'
+
+    # fact_match_summary takes the final team_runs of each innings as the
+    # score; it has to be the sum of the innings' deliveries
+    innings = df.groupby(['match_id', 'innings'], sort=False, observed=True).agg(
+        score=('team_runs', 'max'), runs=('runs_total', 'sum')
+    )
+    violations['score_mismatches'] = int((innings['score'] != innings['runs']).sum())
+
+    return ValidationResult('frame', len(df), violations, severities, time.perf_counter() - start)
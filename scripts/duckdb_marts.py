@@ -0,0 +1,60 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl.logs import configure_logging
+from etl.marts import MARTS
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Build the IPL marts in an embedded DuckDB file')
+    parser.add_argument('marts', nargs='*', metavar='MART',
+                       help=f"Marts to build (default: all of {', '.join(MARTS)})")
+    parser.add_argument('--database', default='data/ipl.duckdb',
+                       help='DuckDB database file (loaded with run_etl.py --target duckdb or --parquet)')
+    parser.add_argument('--parquet', default=None, metavar='DIR',
+                       help='First rebuild the star schema from the <table>.parquet files in DIR')
+    parser.add_argument('--from-postgres', default=None, metavar='DIR',
+                       help='First export the Postgres star schema to DIR as Parquet and load it')
+    parser.add_argument('--export-parquet', default=None, metavar='DIR',
+                       help='Write the DuckDB star schema to DIR as Parquet')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='DuckDB threads (default: one per core)')
+    parser.add_argument('--compare', action='store_true',
+                       help='Compare the marts with the Postgres ones, exit 1 if they differ')
+
+    args = parser.parse_args(argv)
+    unknown = [mart for mart in args.marts if mart not in MARTS]
+    if unknown:
+        parser.error(f"unknown marts: {', '.join(unknown)}")
+    if args.parquet and args.from_postgres:
+        parser.error("--parquet and --from-postgres both load the star schema, pick one")
+
+    configure_logging()
+    from etl.embedded import DuckDBWarehouse, export_postgres_parquet
+
+    warehouse = DuckDBWarehouse(args.database, threads=args.threads)
+    try:
+        if args.from_postgres:
+            export_postgres_parquet(args.from_postgres)
+        if args.parquet or args.from_postgres:
+            warehouse.load_parquet(args.parquet or args.from_postgres)
+        if not warehouse.has_schema():
+            parser.error(f"{args.database} holds no star schema, load it first")
+        if args.export_parquet:
+            warehouse.export_parquet(args.export_parquet)
+
+        warehouse.build_marts(args.marts or None)
+        if args.compare:
+            results = warehouse.compare_marts(marts=args.marts or None)
+            differing = [mart for mart, result in results.items()
+                         if result['only_duckdb'] or result['only_postgres'] or result['mismatched']]
+            if differing:
+                print(f"Marts differing from Postgres: {', '.join(differing)}")
+                sys.exit(1)
+    finally:
+        warehouse.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+
+import sys
+import json
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from config.database import db_config
+
+def load_history(limit):
+    """Most recent runs from etl_run_history, newest first"""
+    with db_config.get_engine('read').connect() as conn:
+        rows = conn.execute(text("""
+            SELECT run_id, started_at, status, source_file, rows_processed,
+                   duration_seconds, options, stages
+            FROM ipl_analytics.etl_run_history
+            ORDER BY started_at DESC, run_id DESC
+            LIMIT :limit
+        """), {'limit': limit}).mappings().all()
+    return [{**row, 'started_at': row['started_at'].isoformat(timespec='seconds'),
+             'duration_seconds': float(row['duration_seconds'] or 0)} for row in rows]
+
+def load_json_runs(directory, limit):
+    """Most recent runs from the per-run JSON metrics files, newest first"""
+    runs = []
+    for path in sorted(Path(directory).glob('etl_*.json'), reverse=True)[:limit]:
+        run = json.loads(path.read_text())
+        run['run_id'] = path.stem
+        runs.append(run)
+    return runs
+
+def print_trend(runs, count):
+    print(f"\nLast {min(count, len(runs))} runs:")
+    print(f"  {'run':>16} {'started':19} {'status':8} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'rss MB':>8}")
+    for run in runs[:count]:
+        total = run['stages'].get('total', {})
+        print(f"  {str(run['run_id']):>16} {run['started_at']:19} {run['status']:8} "
+              f"{run['rows_processed'] or 0:>10,} {run['duration_seconds']:>9.2f} "
+              f"{total.get('rows_per_sec') or 0:>10,.0f} {total.get('peak_rss_mb') or 0:>8}")
+
+def find_regressions(runs, window, threshold, min_seconds):
+    """Compare the latest successful run with the median of comparable earlier runs"""
+    successful = [run for run in runs if run['status'] == 'success']
+    if not successful:
+        print("\nNo successful runs recorded")
+        return []
+
+    latest = successful[0]
+    # Only runs of the same file with the same options are comparable
+    previous = [run for run in successful[1:]
+                if run['source_file'] == latest['source_file'] and run['options'] == latest['options']][:window]
+    if not previous:
+        print(f"\nNo earlier comparable runs for run {latest['run_id']}")
+        return []
+
+    print(f"\nRun {latest['run_id']} vs median of {len(previous)} earlier comparable runs:")
+    print(f"  {'stage':40} {'median':>9} {'latest':>9} {'change':>8} {'rows/s':>10}")
+    regressions = []
+    # JSONB does not keep key order; list stages by name, total first
+    for name in sorted(latest['stages'], key=lambda name: (name != 'total', name)):
+        entry = latest['stages'][name]
+        history = [run['stages'][name]['seconds'] for run in previous if name in run['stages']]
+        if not history:
+            continue
+
+        median = statistics.median(history)
+        change = entry['seconds'] / median - 1 if median else 0.0
+        regressed = change > threshold and entry['seconds'] - median > min_seconds
+        rate = f"{entry['rows_per_sec']:>10,.0f}" if entry.get('rows_per_sec') else ' ' * 10
+        flag = '  REGRESSION' if regressed else ''
+        print(f"  {name:40} {median:>8.2f}s {entry['seconds']:>8.2f}s {change:>+7.1%} {rate}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Show ETL run trends and flag regressions')
+    parser.add_argument('--runs', type=int, default=10,
+                       help='Number of recent runs to list')
+    parser.add_argument('--window', type=int, default=7,
+                       help='Earlier comparable runs whose median is the reference')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                       help='Relative slowdown of a stage reported as a regression')
+    parser.add_argument('--min-seconds', type=float, default=0.5,
+                       help='Ignore slowdowns smaller than this many seconds')
+    parser.add_argument('--metrics-dir', default=None,
+                       help='Read the JSON metrics files here instead of etl_run_history')
+
+    args = parser.parse_args(argv)
+
+    limit = max(args.runs, args.window) * 5
+    runs = load_json_runs(args.metrics_dir, limit) if args.metrics_dir else load_history(limit)
+    if not runs:
+        print("No ETL runs recorded yet")
+        return
+
+    print_trend(runs, args.runs)
+    regressions = find_regressions(runs, args.window, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"\n{len(regressions)} stages regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
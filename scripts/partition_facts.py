@@ -0,0 +1,27 @@
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.database import db_config
+from etl.logs import configure_logging
+from etl.partitions import SeasonPartitioner
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Partition fact tables by season (fact_ball_delivery is created partitioned)')
+    parser.add_argument('tables', nargs='*', metavar='TABLE', default=['fact_innings_summary'],
+                       help='Fact tables to convert (default: fact_innings_summary)')
+
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    partitioner = SeasonPartitioner(db_config.get_engine())
+    for table in args.tables:
+        partitioner.partition_table(table)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,43 @@
 
 import sys
+import argparse
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from etl.load import DataLoader
-import logging
+from etl.logs import configure_logging
+from etl.marts import MARTS, MartRefresher
 
-logging.basicConfig(level=logging.INFO)
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Refresh IPL analytical marts')
+    parser.add_argument('marts', nargs='*', metavar='MART',
+                       help=f"Marts to refresh (default: all of {', '.join(MARTS)})")
+    parser.add_argument('--workers', type=int, default=3,
+                       help='Number of marts refreshed at the same time')
+    parser.add_argument('--no-concurrently', action='store_true',
+                       help='Always use a plain (blocking) REFRESH')
+    parser.add_argument('--match-ids', type=int, nargs='+', default=None,
+                       help='Only rebuild the partitions of these matches (table marts)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--convert-to-tables', action='store_true',
+                      help='Store the marts as tables maintained incrementally after each load')
+    mode.add_argument('--convert-to-views', action='store_true',
+                      help='Turn table marts back into materialized views')
 
-def main():
-    loader = DataLoader()
-    loader.refresh_marts()
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    refresher = MartRefresher(workers=args.workers, concurrently=not args.no_concurrently)
+    if args.convert_to_tables:
+        refresher.convert_to_tables(args.marts or None)
+        return
+    if args.convert_to_views:
+        refresher.convert_to_views(args.marts or None)
+        return
+
+    results = refresher.refresh(args.marts or None, match_ids=args.match_ids)
+
+    sys.exit(0 if all(r['status'] == 'ok' for r in results.values()) else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
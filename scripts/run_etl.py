@@ -6,10 +6,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from etl.pipeline import IPLDataPipeline
+from etl.logs import configure_logging
 
-def main():
-    parser = argparse.ArgumentParser(description='Run IPL Data Warehouse ETL')
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Run IPL Data Warehouse ETL')
     parser.add_argument('csv_file', help='Path to IPL CSV file')
     parser.add_argument('--skip-dimensions', action='store_true', 
                        help='Skip loading dimensions')
@@ -17,21 +17,95 @@ def main():
                        help='Skip loading facts')
     parser.add_argument('--skip-marts', action='store_true',
                        help='Skip refreshing marts')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only load matches not already in the warehouse (no truncation)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                       help='Stream the CSV in match-aligned chunks of about this many rows')
+    parser.add_argument('--optimize-memory', action='store_true',
+                       help='Use narrow numeric dtypes and categorical string columns')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Cache the parsed CSV as Arrow IPC in this directory (requires pyarrow)')
+    parser.add_argument('--cache-transformed', action='store_true',
+                       help='Also cache the transformed frame (needs --cache-dir)')
+    parser.add_argument('--load-method', choices=['copy', 'batch', 'elt'], default=None,
+                       help='Load strategy: COPY FROM STDIN (default), per-batch to_sql inserts, or elt '
+                            '(COPY into staging.ball_delivery, then set-based INSERT ... SELECT)')
+    parser.add_argument('--target', choices=['postgres', 'duckdb'], default='postgres',
+                       help='Load into the Postgres warehouse (default) or an embedded DuckDB file (requires duckdb)')
+    parser.add_argument('--duckdb-path', default=None,
+                       help='DuckDB database file for --target duckdb (default: data/ipl.duckdb)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='DuckDB threads for --target duckdb (default: one per core)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Load independent tables concurrently on this many connections')
+    parser.add_argument('--transform-workers', type=int, default=1,
+                       help='Transform match shards on this many processes (0 = one per core, requires pyarrow)')
+    parser.add_argument('--validate', action='store_true',
+                       help='Check the transformed data in memory before loading it')
+    parser.add_argument('--rebuild-indexes', action='store_true',
+                       help='Full loads: drop fact indexes and foreign keys, rebuild them after the load')
+    parser.add_argument('--metrics-dir', default='data/metrics',
+                       help='Directory for the per-run JSON metrics file')
+    parser.add_argument('--log-dir', default='data/logs',
+                       help='Directory for the per-run log file')
+    parser.add_argument('--no-history', action='store_true',
+                       help='Do not record the run in etl_run_history')
+    parser.add_argument('--reload-season', type=int, default=None, metavar='YEAR',
+                       help='Replace only the facts of this season (swaps its partition)')
     
-    args = parser.parse_args()
-    
+    args = parser.parse_args(argv)
+    # Options the other target has no use for are errors, not silently ignored
+    if args.target == 'duckdb':
+        postgres_only = {
+            '--load-method': args.load_method is not None,
+            '--workers': args.workers != 1,
+            '--rebuild-indexes': args.rebuild_indexes,
+            '--no-history': args.no_history,
+            '--reload-season': args.reload_season is not None
+        }
+        used = [option for option, given in postgres_only.items() if given]
+        if used:
+            parser.error(f"not available with --target duckdb: {', '.join(used)}")
+    else:
+        used = [option for option, value in (('--duckdb-path', args.duckdb_path), ('--threads', args.threads))
+                if value is not None]
+        if used:
+            parser.error(f"only available with --target duckdb: {', '.join(used)}")
+        args.load_method = args.load_method or 'copy'
 
     csv_path = Path(args.csv_file)
     if not csv_path.exists():
         print(f"Error: File not found: {csv_path}")
         sys.exit(1)
     
+    configure_logging(log_dir=args.log_dir)
+    # pandas and the rest of the ETL load only once there is work to do
+    from etl.pipeline import IPLDataPipeline
+
 
-    pipeline = IPLDataPipeline(str(csv_path))
+    pipeline = IPLDataPipeline(
+        str(csv_path),
+        load_method=args.load_method,
+        optimize_memory=args.optimize_memory,
+        cache_dir=args.cache_dir,
+        cache_transformed=args.cache_transformed,
+        workers=args.workers,
+        transform_workers=args.transform_workers,
+        validate=args.validate,
+        rebuild_indexes=args.rebuild_indexes,
+        metrics_dir=args.metrics_dir,
+        record_history=not args.no_history,
+        target=args.target,
+        duckdb_path=args.duckdb_path,
+        threads=args.threads
+    )
     success = pipeline.run(
         load_dimensions=not args.skip_dimensions,
         load_facts=not args.skip_facts,
-        refresh_marts=not args.skip_marts
+        refresh_marts=not args.skip_marts,
+        incremental=args.incremental,
+        chunk_size=args.chunk_size,
+        reload_season=args.reload_season
     )
     
     sys.exit(0 if success else 1)
@@ -1,125 +1,93 @@
-
+import sys
+import argparse
 import logging
 from pathlib import Path
 from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 from config.database import db_config
+from etl.logs import configure_logging
+from etl.migrations import MigrationRunner
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DatabaseSetup:
+    """Create or upgrade the warehouse schema through the migration runner"""
 
-    
-    def __init__(self):
+    def __init__(self, workers=4):
         self.engine = db_config.get_engine()
-        self.sql_dir = Path('sql')
-        
-    def run_sql_file(self, filepath):
-
-        logger.info(f"Running {filepath.name}...")
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            sql = f.read()
-        
-
-        statements = []
-        for line in sql.split('\n'):
-            line = line.strip()
-
-            if line.startswith('--') or not line:
-                continue
-            statements.append(line)
-        
-        full_sql = ' '.join(statements)
-        statements = [s.strip() for s in full_sql.split(';') if s.strip()]
-        
-        success_count = 0
-        error_count = 0
-        
-        for stmt in statements:
-            if not stmt or stmt.startswith('--'):
-                continue
-                
-            try:
-                with self.engine.begin() as conn: 
-                    conn.execute(text(stmt))
-                success_count += 1
-            except Exception as e:
-                error_count += 1
-                if 'already exists' in str(e).lower() or 'does not exist' in str(e).lower():
-                    logger.debug(f"Skipped (expected): {str(e)[:100]}")
-                else:
-                    logger.warning(f"Error executing statement: {str(e)[:200]}")
-                    logger.debug(f"Failed statement: {stmt[:100]}...")
-        
-        logger.info(f"✓ {filepath.name} completed ({success_count} statements executed, {error_count} skipped/failed)")
-    
-    def setup_database(self):
+        self.runner = MigrationRunner(self.engine, workers=workers)
+
+    def setup_database(self, populate=True):
         logger.info("="*60)
         logger.info("IPL DATA WAREHOUSE - DATABASE SETUP")
         logger.info("="*60)
-        
-        sql_files = [
-            'create_schema.sql',
-            'create_dimentions.sql',
-            'create_facts.sql',
-            'create_marts.sql'
-        ]
-        
-        for sql_file in sql_files:
-            filepath = self.sql_dir / sql_file
-            if filepath.exists():
-                self.run_sql_file(filepath)
-            else:
-                logger.warning(f"File not found: {filepath}")
-        
+
+        try:
+            applied = self.runner.run(populate=populate)
+        except Exception as e:
+            logger.error(f"Migration failed: {e}")
+            return False
+
         logger.info("\n" + "="*60)
-        logger.info("DATABASE SETUP COMPLETED!")
+        logger.info(f"DATABASE SETUP COMPLETED! ({len(applied)} migrations applied)")
         logger.info("="*60)
-        
 
-        self.verify_setup()
-    
+        return self.verify_setup()
+
     def verify_setup(self):
         logger.info("\nVerifying database setup...")
-        
+
         try:
             with self.engine.connect() as conn:
                 result = conn.execute(text("""
-                    SELECT table_name 
-                    FROM information_schema.tables 
+                    SELECT table_name
+                    FROM information_schema.tables
                     WHERE table_schema = 'ipl_analytics'
                     AND table_name LIKE 'dim_%'
                     ORDER BY table_name
                 """))
                 dims = [row[0] for row in result]
                 logger.info(f"✓ Dimension tables ({len(dims)}): {', '.join(dims)}")
-                
+
                 result = conn.execute(text("""
-                    SELECT table_name 
-                    FROM information_schema.tables 
+                    SELECT table_name
+                    FROM information_schema.tables
                     WHERE table_schema = 'ipl_analytics'
                     AND table_name LIKE 'fact_%'
+                    AND table_name NOT IN (SELECT relname FROM pg_class WHERE relispartition)
                     ORDER BY table_name
                 """))
                 facts = [row[0] for row in result]
                 logger.info(f"✓ Fact tables ({len(facts)}): {', '.join(facts)}")
-                
+
+                # Marts are materialized views, or tables in incremental mart mode
                 result = conn.execute(text("""
-                    SELECT matviewname 
-                    FROM pg_matviews 
-                    WHERE schemaname = 'ipl_analytics'
-                    ORDER BY matviewname
+                    SELECT c.relname
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'ipl_analytics'
+                    AND c.relkind IN ('m', 'r')
+                    AND c.relname LIKE 'mart%'
+                    ORDER BY c.relname
                 """))
                 marts = [row[0] for row in result]
                 logger.info(f"✓ Analytical marts ({len(marts)}): {', '.join(marts)}")
-                
+
                 if not dims and not facts and not marts:
                     logger.error("❌ No tables were created! Check the SQL files.")
                     return False
-                    
+
+                # The ELT load (--load-method elt) stages into it
+                staging = conn.execute(text("SELECT to_regclass('staging.ball_delivery')")).scalar()
+                if staging is None:
+                    logger.error("❌ staging.ball_delivery is missing (sql/migrations/001_create_staging_ball_delivery.sql)")
+                    return False
+                logger.info("✓ Staging table: staging.ball_delivery")
+
                 return True
-                
+
         except Exception as e:
             logger.error(f"Verification failed: {e}")
             return False
@@ -130,18 +98,35 @@ class DatabaseSetup:
         try:
             with self.engine.begin() as conn:
                 conn.execute(text("DROP SCHEMA IF EXISTS ipl_analytics CASCADE"))
+                conn.execute(text("DROP SCHEMA IF EXISTS staging CASCADE"))
                 logger.info("✓ Schema dropped")
         except Exception as e:
             logger.error(f"Failed to drop schema: {e}")
 
-if __name__ == "__main__":
-    import sys
-    
-    setup = DatabaseSetup()
-    
-    # Check for reset flag
-    if len(sys.argv) > 1 and sys.argv[1] == '--reset':
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='Create or upgrade the warehouse schema')
+    parser.add_argument('--reset', action='store_true',
+                       help='Drop the schema first and apply every migration')
+    parser.add_argument('--baseline', action='store_true',
+                       help='Record the baseline SQL files as applied without running them, then apply '
+                            'the later migrations (for a database set up before migrations were tracked)')
+    parser.add_argument('--no-populate', action='store_true',
+                       help='Leave recreated marts empty until the next refresh')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Marts populated and indexes built concurrently')
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup = DatabaseSetup(workers=args.workers)
+
+    if args.reset:
         setup.reset_database()
-    
-    success = setup.setup_database()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+
+    if args.baseline:
+        # Only the baseline files are recorded, sql/migrations/ is applied next
+        setup.runner.baseline()
+    success = setup.setup_database(populate=not args.no_populate)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 SET search_path TO ipl_analytics;
 CREATE TABLE fact_ball_delivery (
-    delivery_id BIGSERIAL PRIMARY KEY,
+    delivery_id BIGSERIAL,
     match_id INTEGER NOT NULL REFERENCES dim_match(match_id),
     date_id INTEGER NOT NULL REFERENCES dim_date(date_id),
     -- Player Foreign Keys
@@ -70,9 +70,13 @@ CREATE TABLE fact_ball_delivery (
         ball_number BETWEEN 0 AND 10
     ),
     CONSTRAINT chk_phase CHECK (match_phase IN ('Powerplay', 'Middle', 'Death')),
-    CONSTRAINT uk_delivery UNIQUE (match_id, innings, ball_sequence)
-);
--- Partitioning by date_id for performance
+    -- Partitioned tables need the partition key in every unique constraint
+    PRIMARY KEY (delivery_id, date_id),
+    CONSTRAINT uk_delivery UNIQUE (match_id, innings, ball_sequence, date_id)
+) PARTITION BY RANGE (date_id);
+-- Partitioning by date_id: one partition per season (fact_ball_delivery_YYYY),
+-- created by the loader as seasons arrive; anything else lands in the default
+CREATE TABLE fact_ball_delivery_default PARTITION OF fact_ball_delivery DEFAULT;
 CREATE INDEX idx_ball_match ON fact_ball_delivery(match_id);
 CREATE INDEX idx_ball_date ON fact_ball_delivery(date_id);
 CREATE INDEX idx_ball_batter ON fact_ball_delivery(batter_id);
@@ -142,6 +146,151 @@ CREATE INDEX idx_innings_team ON fact_innings_summary(batting_team_id, bowling_t
 CREATE INDEX idx_innings_date ON fact_innings_summary(date_id);
 CREATE INDEX idx_innings_venue ON fact_innings_summary(venue_id);
 COMMENT ON TABLE fact_innings_summary IS 'Innings-level aggregated fact table';
+CREATE TABLE fact_batter_innings (
+    match_id INTEGER NOT NULL REFERENCES dim_match(match_id),
+    innings SMALLINT NOT NULL,
+    batter_id INTEGER NOT NULL REFERENCES dim_player(player_id),
+    -- Foreign Keys
+    date_id INTEGER NOT NULL REFERENCES dim_date(date_id),
+    batting_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    bowling_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    venue_id INTEGER NOT NULL REFERENCES dim_venue(venue_id),
+    -- Innings Totals (every delivery faced on strike, wides included)
+    balls SMALLINT NOT NULL,
+    runs SMALLINT NOT NULL,
+    fours SMALLINT NOT NULL,
+    sixes SMALLINT NOT NULL,
+    boundaries SMALLINT NOT NULL,
+    dots SMALLINT NOT NULL,
+    extras SMALLINT NOT NULL,
+    wickets SMALLINT NOT NULL,
+    dismissals SMALLINT NOT NULL,
+    highest_batter_runs SMALLINT,
+    -- Phase-wise Breakdown
+    powerplay_balls SMALLINT NOT NULL,
+    powerplay_runs SMALLINT NOT NULL,
+    powerplay_fours SMALLINT NOT NULL,
+    powerplay_sixes SMALLINT NOT NULL,
+    powerplay_boundaries SMALLINT NOT NULL,
+    powerplay_dots SMALLINT NOT NULL,
+    powerplay_extras SMALLINT NOT NULL,
+    powerplay_wickets SMALLINT NOT NULL,
+    middle_overs_balls SMALLINT NOT NULL,
+    middle_overs_runs SMALLINT NOT NULL,
+    middle_overs_fours SMALLINT NOT NULL,
+    middle_overs_sixes SMALLINT NOT NULL,
+    middle_overs_boundaries SMALLINT NOT NULL,
+    middle_overs_dots SMALLINT NOT NULL,
+    middle_overs_extras SMALLINT NOT NULL,
+    middle_overs_wickets SMALLINT NOT NULL,
+    death_overs_balls SMALLINT NOT NULL,
+    death_overs_runs SMALLINT NOT NULL,
+    death_overs_fours SMALLINT NOT NULL,
+    death_overs_sixes SMALLINT NOT NULL,
+    death_overs_boundaries SMALLINT NOT NULL,
+    death_overs_dots SMALLINT NOT NULL,
+    death_overs_extras SMALLINT NOT NULL,
+    death_overs_wickets SMALLINT NOT NULL,
+    -- Chasing Under Pressure (last 10 overs, runs still required), by required run rate
+    pressure_low_balls SMALLINT NOT NULL,
+    pressure_low_runs SMALLINT NOT NULL,
+    pressure_low_boundaries SMALLINT NOT NULL,
+    pressure_low_wickets SMALLINT NOT NULL,
+    pressure_medium_balls SMALLINT NOT NULL,
+    pressure_medium_runs SMALLINT NOT NULL,
+    pressure_medium_boundaries SMALLINT NOT NULL,
+    pressure_medium_wickets SMALLINT NOT NULL,
+    pressure_high_balls SMALLINT NOT NULL,
+    pressure_high_runs SMALLINT NOT NULL,
+    pressure_high_boundaries SMALLINT NOT NULL,
+    pressure_high_wickets SMALLINT NOT NULL,
+    pressure_extreme_balls SMALLINT NOT NULL,
+    pressure_extreme_runs SMALLINT NOT NULL,
+    pressure_extreme_boundaries SMALLINT NOT NULL,
+    pressure_extreme_wickets SMALLINT NOT NULL,
+    CONSTRAINT pk_batter_innings PRIMARY KEY (match_id, innings, batter_id)
+);
+CREATE INDEX idx_batter_innings_batter ON fact_batter_innings(batter_id, date_id);
+CREATE INDEX idx_batter_innings_date ON fact_batter_innings(date_id);
+CREATE INDEX idx_batter_innings_team ON fact_batter_innings(batting_team_id);
+COMMENT ON TABLE fact_batter_innings IS 'One row per batter per innings, aggregated from the deliveries they faced';
+CREATE TABLE fact_bowler_innings (
+    match_id INTEGER NOT NULL REFERENCES dim_match(match_id),
+    innings SMALLINT NOT NULL,
+    bowler_id INTEGER NOT NULL REFERENCES dim_player(player_id),
+    -- Foreign Keys
+    date_id INTEGER NOT NULL REFERENCES dim_date(date_id),
+    bowling_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    batting_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    venue_id INTEGER NOT NULL REFERENCES dim_venue(venue_id),
+    -- Every Delivery (wides and no-balls included)
+    deliveries SMALLINT NOT NULL,
+    extras SMALLINT NOT NULL,
+    all_wickets SMALLINT NOT NULL,
+    -- Innings Totals (legal deliveries only)
+    balls SMALLINT NOT NULL,
+    runs_conceded SMALLINT NOT NULL,
+    wickets SMALLINT NOT NULL,
+    dots SMALLINT NOT NULL,
+    boundaries SMALLINT NOT NULL,
+    -- Phase-wise Breakdown (legal deliveries, extras over every delivery)
+    powerplay_balls SMALLINT NOT NULL,
+    powerplay_runs_conceded SMALLINT NOT NULL,
+    powerplay_wickets SMALLINT NOT NULL,
+    powerplay_dots SMALLINT NOT NULL,
+    powerplay_boundaries SMALLINT NOT NULL,
+    powerplay_extras SMALLINT NOT NULL,
+    middle_overs_balls SMALLINT NOT NULL,
+    middle_overs_runs_conceded SMALLINT NOT NULL,
+    middle_overs_wickets SMALLINT NOT NULL,
+    middle_overs_dots SMALLINT NOT NULL,
+    middle_overs_boundaries SMALLINT NOT NULL,
+    middle_overs_extras SMALLINT NOT NULL,
+    death_overs_balls SMALLINT NOT NULL,
+    death_overs_runs_conceded SMALLINT NOT NULL,
+    death_overs_wickets SMALLINT NOT NULL,
+    death_overs_dots SMALLINT NOT NULL,
+    death_overs_boundaries SMALLINT NOT NULL,
+    death_overs_extras SMALLINT NOT NULL,
+    CONSTRAINT pk_bowler_innings PRIMARY KEY (match_id, innings, bowler_id)
+);
+CREATE INDEX idx_bowler_innings_bowler ON fact_bowler_innings(bowler_id, date_id);
+CREATE INDEX idx_bowler_innings_date ON fact_bowler_innings(date_id);
+CREATE INDEX idx_bowler_innings_team ON fact_bowler_innings(bowling_team_id);
+COMMENT ON TABLE fact_bowler_innings IS 'One row per bowler per innings, aggregated from the deliveries they bowled';
+CREATE TABLE fact_partnership (
+    match_id INTEGER NOT NULL REFERENCES dim_match(match_id),
+    innings SMALLINT NOT NULL,
+    partnership_number SMALLINT NOT NULL,
+    -- Foreign Keys
+    date_id INTEGER NOT NULL REFERENCES dim_date(date_id),
+    batting_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    bowling_team_id INTEGER NOT NULL REFERENCES dim_team(team_id),
+    venue_id INTEGER NOT NULL REFERENCES dim_venue(venue_id),
+    -- The pair, lower player_id first
+    player1_id INTEGER NOT NULL REFERENCES dim_player(player_id),
+    player2_id INTEGER NOT NULL REFERENCES dim_player(player_id),
+    -- Span (ball_sequence of the first and last delivery)
+    start_ball INTEGER NOT NULL,
+    end_ball INTEGER NOT NULL,
+    -- Measures
+    runs SMALLINT NOT NULL,
+    player1_runs SMALLINT NOT NULL,
+    player2_runs SMALLINT NOT NULL,
+    extras SMALLINT NOT NULL,
+    balls SMALLINT NOT NULL,
+    deliveries SMALLINT NOT NULL,
+    boundaries SMALLINT NOT NULL,
+    fours SMALLINT NOT NULL,
+    sixes SMALLINT NOT NULL,
+    -- Ended by this dismissal (NULL if unbroken)
+    dismissed_player_id INTEGER REFERENCES dim_player(player_id),
+    CONSTRAINT pk_partnership PRIMARY KEY (match_id, innings, partnership_number)
+);
+CREATE INDEX idx_partnership_pair ON fact_partnership(player1_id, player2_id);
+CREATE INDEX idx_partnership_player2 ON fact_partnership(player2_id);
+CREATE INDEX idx_partnership_date ON fact_partnership(date_id);
+COMMENT ON TABLE fact_partnership IS 'One row per batting partnership, from the first ball of the pair to the wicket that ended it';
 CREATE TABLE fact_match_summary (
     match_id INTEGER PRIMARY KEY REFERENCES dim_match(match_id),
     -- Foreign Keys
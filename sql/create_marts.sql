@@ -1,48 +1,24 @@
 -- ================================================
 -- ANALYTICAL MARTS (Materialized Views)
+-- Created empty (WITH NO DATA), populated by the first mart refresh
 -- ================================================
 SET search_path TO ipl_analytics;
 CREATE MATERIALIZED VIEW mart_death_over_specialists AS WITH death_over_batting AS (
     SELECT p.player_id,
         p.player_name,
         d.season,
-        COUNT(*) as death_balls_faced,
-        SUM(f.runs_scored) as death_runs_scored,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as death_boundaries,
-        SUM(
-            CASE
-                WHEN f.is_six THEN 1
-                ELSE 0
-            END
-        ) as death_sixes,
-        SUM(
-            CASE
-                WHEN f.is_four THEN 1
-                ELSE 0
-            END
-        ) as death_fours,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as death_dots,
-        SUM(
-            CASE
-                WHEN f.is_wicket THEN 1
-                ELSE 0
-            END
-        ) as times_out,
+        SUM(f.death_overs_balls) as death_balls_faced,
+        SUM(f.death_overs_runs) as death_runs_scored,
+        SUM(f.death_overs_boundaries) as death_boundaries,
+        SUM(f.death_overs_sixes) as death_sixes,
+        SUM(f.death_overs_fours) as death_fours,
+        SUM(f.death_overs_dots) as death_dots,
+        SUM(f.death_overs_wickets) as times_out,
         COUNT(DISTINCT f.match_id) as matches_batted
-    FROM fact_ball_delivery f
+    FROM fact_batter_innings f
         JOIN dim_player p ON f.batter_id = p.player_id
         JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.match_phase = 'Death'
+    WHERE f.death_overs_balls > 0
     GROUP BY p.player_id,
         p.player_name,
         d.season
@@ -51,32 +27,16 @@ death_over_bowling AS (
     SELECT p.player_id,
         p.player_name,
         d.season,
-        COUNT(*) as death_balls_bowled,
-        SUM(f.runs_bowler) as death_runs_conceded,
-        SUM(
-            CASE
-                WHEN f.is_wicket THEN 1
-                ELSE 0
-            END
-        ) as death_wickets,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as death_dots_bowled,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as death_boundaries_conceded,
+        SUM(f.death_overs_balls) as death_balls_bowled,
+        SUM(f.death_overs_runs_conceded) as death_runs_conceded,
+        SUM(f.death_overs_wickets) as death_wickets,
+        SUM(f.death_overs_dots) as death_dots_bowled,
+        SUM(f.death_overs_boundaries) as death_boundaries_conceded,
         COUNT(DISTINCT f.match_id) as matches_bowled
-    FROM fact_ball_delivery f
+    FROM fact_bowler_innings f
         JOIN dim_player p ON f.bowler_id = p.player_id
         JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.match_phase = 'Death'
-        AND f.is_valid_ball = TRUE
+    WHERE f.death_overs_balls > 0
     GROUP BY p.player_id,
         p.player_name,
         d.season
@@ -163,7 +123,8 @@ FROM death_over_batting bat
     FULL OUTER JOIN death_over_bowling bowl ON bat.player_id = bowl.player_id
     AND bat.season = bowl.season
 WHERE COALESCE(bat.death_balls_faced, 0) >= 20
-    OR COALESCE(bowl.death_balls_bowled, 0) >= 20;
+    OR COALESCE(bowl.death_balls_bowled, 0) >= 20
+WITH NO DATA;
 CREATE UNIQUE INDEX idx_death_specialists_pk ON mart_death_over_specialists(player_id, season);
 CREATE INDEX idx_death_specialists_season ON mart_death_over_specialists(season);
 CREATE INDEX idx_death_bat_impact ON mart_death_over_specialists(batting_impact_score DESC NULLS LAST);
@@ -174,31 +135,16 @@ CREATE MATERIALIZED VIEW mart_powerplay_performers AS WITH powerplay_batting AS
         p.player_name,
         p.player_role,
         d.season,
-        COUNT(*) as pp_balls_faced,
-        SUM(f.runs_scored) as pp_runs,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as pp_boundaries,
-        SUM(
-            CASE
-                WHEN f.is_six THEN 1
-                ELSE 0
-            END
-        ) as pp_sixes,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as pp_dots_played,
+        SUM(f.powerplay_balls) as pp_balls_faced,
+        SUM(f.powerplay_runs) as pp_runs,
+        SUM(f.powerplay_boundaries) as pp_boundaries,
+        SUM(f.powerplay_sixes) as pp_sixes,
+        SUM(f.powerplay_dots) as pp_dots_played,
         COUNT(DISTINCT f.match_id) as matches_batted
-    FROM fact_ball_delivery f
+    FROM fact_batter_innings f
         JOIN dim_player p ON f.batter_id = p.player_id
         JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.match_phase = 'Powerplay'
+    WHERE f.powerplay_balls > 0
     GROUP BY p.player_id,
         p.player_name,
         p.player_role,
@@ -208,32 +154,16 @@ powerplay_bowling AS (
     SELECT p.player_id,
         p.player_name,
         d.season,
-        COUNT(*) as pp_balls_bowled,
-        SUM(f.runs_bowler) as pp_runs_conceded,
-        SUM(
-            CASE
-                WHEN f.is_wicket THEN 1
-                ELSE 0
-            END
-        ) as pp_wickets,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as pp_dots_bowled,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as pp_boundaries_conceded,
+        SUM(f.powerplay_balls) as pp_balls_bowled,
+        SUM(f.powerplay_runs_conceded) as pp_runs_conceded,
+        SUM(f.powerplay_wickets) as pp_wickets,
+        SUM(f.powerplay_dots) as pp_dots_bowled,
+        SUM(f.powerplay_boundaries) as pp_boundaries_conceded,
         COUNT(DISTINCT f.match_id) as matches_bowled
-    FROM fact_ball_delivery f
+    FROM fact_bowler_innings f
         JOIN dim_player p ON f.bowler_id = p.player_id
         JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.match_phase = 'Powerplay'
-        AND f.is_valid_ball = TRUE
+    WHERE f.powerplay_balls > 0
     GROUP BY p.player_id,
         p.player_name,
         d.season
@@ -295,62 +225,90 @@ FROM powerplay_batting bat
     FULL OUTER JOIN powerplay_bowling bowl ON bat.player_id = bowl.player_id
     AND bat.season = bowl.season
 WHERE COALESCE(bat.pp_balls_faced, 0) >= 18
-    OR COALESCE(bowl.pp_balls_bowled, 0) >= 18;
+    OR COALESCE(bowl.pp_balls_bowled, 0) >= 18
+WITH NO DATA;
 CREATE UNIQUE INDEX idx_powerplay_pk ON mart_powerplay_performers(player_id, season);
 CREATE INDEX idx_powerplay_season ON mart_powerplay_performers(season);
 CREATE INDEX idx_powerplay_sr ON mart_powerplay_performers(pp_strike_rate DESC);
 CREATE INDEX idx_powerplay_economy ON mart_powerplay_performers(pp_economy_rate ASC);
 COMMENT ON MATERIALIZED VIEW mart_powerplay_performers IS 'Powerplay (overs 1-6) performance analysis';
-CREATE MATERIALIZED VIEW mart_pressure_performance AS WITH pressure_balls AS (
-    SELECT f.*,
-        CASE
-            WHEN f.required_run_rate > 12 THEN 'Extreme'
-            WHEN f.required_run_rate > 9 THEN 'High'
-            WHEN f.required_run_rate > 6 THEN 'Medium'
-            ELSE 'Low'
-        END as pressure_level
-    FROM fact_ball_delivery f
-    WHERE f.innings = 2
-        AND f.balls_remaining <= 60
-        AND f.balls_remaining > 0
-        AND f.runs_required > 0
+CREATE MATERIALIZED VIEW mart_pressure_performance AS WITH pressure_innings AS (
+    -- Chasing batters' balls in the last 10 overs with runs still required,
+    -- by required run rate: Extreme > 12, High > 9, Medium > 6, else Low
+    SELECT f.match_id,
+        f.batter_id,
+        f.batting_team_id,
+        f.date_id,
+        'Low' as pressure_level,
+        f.pressure_low_balls as balls,
+        f.pressure_low_runs as runs,
+        f.pressure_low_boundaries as boundaries,
+        f.pressure_low_wickets as wickets
+    FROM fact_batter_innings f
+    WHERE f.pressure_low_balls > 0
+    UNION ALL
+    SELECT f.match_id,
+        f.batter_id,
+        f.batting_team_id,
+        f.date_id,
+        'Medium' as pressure_level,
+        f.pressure_medium_balls as balls,
+        f.pressure_medium_runs as runs,
+        f.pressure_medium_boundaries as boundaries,
+        f.pressure_medium_wickets as wickets
+    FROM fact_batter_innings f
+    WHERE f.pressure_medium_balls > 0
+    UNION ALL
+    SELECT f.match_id,
+        f.batter_id,
+        f.batting_team_id,
+        f.date_id,
+        'High' as pressure_level,
+        f.pressure_high_balls as balls,
+        f.pressure_high_runs as runs,
+        f.pressure_high_boundaries as boundaries,
+        f.pressure_high_wickets as wickets
+    FROM fact_batter_innings f
+    WHERE f.pressure_high_balls > 0
+    UNION ALL
+    SELECT f.match_id,
+        f.batter_id,
+        f.batting_team_id,
+        f.date_id,
+        'Extreme' as pressure_level,
+        f.pressure_extreme_balls as balls,
+        f.pressure_extreme_runs as runs,
+        f.pressure_extreme_boundaries as boundaries,
+        f.pressure_extreme_wickets as wickets
+    FROM fact_batter_innings f
+    WHERE f.pressure_extreme_balls > 0
 )
 SELECT p.player_id,
     p.player_name,
     d.season,
     pb.pressure_level,
     -- Performance Metrics
-    COUNT(*) as balls_in_pressure,
-    SUM(pb.runs_scored) as runs_in_pressure,
-    SUM(
-        CASE
-            WHEN pb.is_boundary THEN 1
-            ELSE 0
-        END
-    ) as boundaries_in_pressure,
-    SUM(
-        CASE
-            WHEN pb.is_wicket THEN 1
-            ELSE 0
-        END
-    ) as wickets_in_pressure,
+    SUM(pb.balls) as balls_in_pressure,
+    SUM(pb.runs) as runs_in_pressure,
+    SUM(pb.boundaries) as boundaries_in_pressure,
+    SUM(pb.wickets) as wickets_in_pressure,
     COUNT(DISTINCT pb.match_id) as matches_in_pressure,
     -- Success Metrics
-    ROUND(AVG(pb.runs_scored), 3) as avg_runs_per_ball,
+    ROUND(SUM(pb.runs) * 1.0 / SUM(pb.balls), 3) as avg_runs_per_ball,
     ROUND(
-        (SUM(pb.runs_scored) * 100.0) / NULLIF(COUNT(*), 0),
+        (SUM(pb.runs) * 100.0) / NULLIF(SUM(pb.balls), 0),
         2
     ) as strike_rate_under_pressure,
-    -- Match Outcomes
+    -- Match Outcomes (counted per ball)
     SUM(
         CASE
-            WHEN ms.match_winner_id = pb.batting_team_id THEN 1
+            WHEN ms.match_winner_id = pb.batting_team_id THEN pb.balls
             ELSE 0
         END
     ) as matches_won,
     SUM(
         CASE
-            WHEN ms.match_winner_id != pb.batting_team_id THEN 1
+            WHEN ms.match_winner_id != pb.batting_team_id THEN pb.balls
             ELSE 0
         END
     ) as matches_lost,
@@ -358,7 +316,7 @@ SELECT p.player_id,
         (
             SUM(
                 CASE
-                    WHEN ms.match_winner_id = pb.batting_team_id THEN 1
+                    WHEN ms.match_winner_id = pb.batting_team_id THEN pb.balls
                     ELSE 0
                 END
             ) * 100.0
@@ -368,21 +326,16 @@ SELECT p.player_id,
     -- Pressure Performance Index
     ROUND(
         (
-            (SUM(pb.runs_scored) * 100.0) / NULLIF(COUNT(*), 0)
+            (SUM(pb.runs) * 100.0) / NULLIF(SUM(pb.balls), 0)
         ) * (
             1 - (
-                SUM(
-                    CASE
-                        WHEN pb.is_wicket THEN 1
-                        ELSE 0
-                    END
-                ) * 1.0 / NULLIF(COUNT(DISTINCT pb.match_id), 0)
+                SUM(pb.wickets) * 1.0 / NULLIF(COUNT(DISTINCT pb.match_id), 0)
             )
         ) * (
             1 + (
                 SUM(
                     CASE
-                        WHEN ms.match_winner_id = pb.batting_team_id THEN 1
+                        WHEN ms.match_winner_id = pb.batting_team_id THEN pb.balls
                         ELSE 0
                     END
                 ) * 1.0 / NULLIF(COUNT(DISTINCT pb.match_id), 0)
@@ -390,7 +343,7 @@ SELECT p.player_id,
         ),
         2
     ) as pressure_performance_index
-FROM pressure_balls pb
+FROM pressure_innings pb
     JOIN dim_player p ON pb.batter_id = p.player_id
     JOIN dim_date d ON pb.date_id = d.date_id
     JOIN fact_match_summary ms ON pb.match_id = ms.match_id
@@ -398,99 +351,49 @@ GROUP BY p.player_id,
     p.player_name,
     d.season,
     pb.pressure_level
-HAVING COUNT(*) >= 12
+HAVING SUM(pb.balls) >= 12
 ORDER BY season DESC,
-    pressure_performance_index DESC;
+    pressure_performance_index DESC
+WITH NO DATA;
 CREATE INDEX idx_pressure_player_season ON mart_pressure_performance(player_id, season);
 CREATE INDEX idx_pressure_level ON mart_pressure_performance(pressure_level);
 CREATE INDEX idx_pressure_index ON mart_pressure_performance(pressure_performance_index DESC);
 COMMENT ON MATERIALIZED VIEW mart_pressure_performance IS 'Performance analysis in pressure situations (chasing, last 10 overs)';
-CREATE MATERIALIZED VIEW mart_partnership_analysis AS WITH partnerships AS (
-    SELECT f.match_id,
-        f.innings,
-        f.batter_id as player1_id,
-        f.non_striker_id as player2_id,
-        f.batting_team_id,
-        d.season,
-        MIN(f.ball_sequence) as start_ball,
-        MAX(f.ball_sequence) as end_ball,
-        SUM(f.runs_scored) as partnership_runs,
-        COUNT(*) as balls_faced,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as boundaries,
-        SUM(
-            CASE
-                WHEN f.is_six THEN 1
-                ELSE 0
-            END
-        ) as sixes,
-        MAX(
-            CASE
-                WHEN f.is_wicket THEN f.batter_id
-            END
-        ) as dismissed_player_id
-    FROM fact_ball_delivery f
-        JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.non_striker_id IS NOT NULL
-        AND f.batter_id != f.non_striker_id
-    GROUP BY f.match_id,
-        f.innings,
-        f.batter_id,
-        f.non_striker_id,
-        f.batting_team_id,
-        d.season
-    HAVING SUM(f.runs_scored) >= 10
-)
-SELECT CASE
-        WHEN p1.player_id < p2.player_id THEN p1.player_id
-        ELSE p2.player_id
-    END as player1_id,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p1.player_name
-        ELSE p2.player_name
-    END as player1_name,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p2.player_id
-        ELSE p1.player_id
-    END as player2_id,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p2.player_name
-        ELSE p1.player_name
-    END as player2_name,
+CREATE MATERIALIZED VIEW mart_partnership_analysis AS
+SELECT ptn.player1_id,
+    p1.player_name as player1_name,
+    ptn.player2_id,
+    p2.player_name as player2_name,
     t.team_name,
-    ptn.season,
+    d.season,
     -- Partnership Stats
     COUNT(*) as total_partnerships,
-    SUM(ptn.partnership_runs) as total_partnership_runs,
-    MAX(ptn.partnership_runs) as highest_partnership,
-    ROUND(AVG(ptn.partnership_runs), 2) as avg_partnership_runs,
-    ROUND(AVG(ptn.balls_faced), 1) as avg_balls_faced,
+    SUM(ptn.runs) as total_partnership_runs,
+    MAX(ptn.runs) as highest_partnership,
+    ROUND(AVG(ptn.runs), 2) as avg_partnership_runs,
+    ROUND(AVG(ptn.balls), 1) as avg_balls_faced,
     -- Run Rate
     ROUND(
-        (SUM(ptn.partnership_runs) * 6.0) / NULLIF(SUM(ptn.balls_faced), 0),
+        (SUM(ptn.runs) * 6.0) / NULLIF(SUM(ptn.balls), 0),
         2
     ) as partnership_run_rate,
     -- Boundary Stats
     SUM(ptn.boundaries) as total_boundaries,
     ROUND(
-        (SUM(ptn.boundaries) * 4.0 * 100.0) / NULLIF(SUM(ptn.partnership_runs), 0),
+        (SUM(ptn.fours * 4 + ptn.sixes * 6) * 100.0) / NULLIF(SUM(ptn.runs), 0),
         2
     ) as boundary_contribution_pct,
     -- Milestones
     SUM(
         CASE
-            WHEN ptn.partnership_runs >= 50
-            AND ptn.partnership_runs < 100 THEN 1
+            WHEN ptn.runs >= 50
+            AND ptn.runs < 100 THEN 1
             ELSE 0
         END
     ) as fifty_plus_partnerships,
     SUM(
         CASE
-            WHEN ptn.partnership_runs >= 100 THEN 1
+            WHEN ptn.runs >= 100 THEN 1
             ELSE 0
         END
     ) as century_partnerships,
@@ -499,37 +402,27 @@ SELECT CASE
         (
             SUM(
                 CASE
-                    WHEN ptn.partnership_runs >= 30 THEN 1
+                    WHEN ptn.runs >= 30 THEN 1
                     ELSE 0
                 END
             ) * 100.0
         ) / NULLIF(COUNT(*), 0),
         2
     ) as productive_partnership_pct
-FROM partnerships ptn
+FROM fact_partnership ptn
     JOIN dim_player p1 ON ptn.player1_id = p1.player_id
     JOIN dim_player p2 ON ptn.player2_id = p2.player_id
     JOIN dim_team t ON ptn.batting_team_id = t.team_id
-GROUP BY CASE
-        WHEN p1.player_id < p2.player_id THEN p1.player_id
-        ELSE p2.player_id
-    END,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p1.player_name
-        ELSE p2.player_name
-    END,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p2.player_id
-        ELSE p1.player_id
-    END,
-    CASE
-        WHEN p1.player_id < p2.player_id THEN p2.player_name
-        ELSE p1.player_name
-    END,
+    JOIN dim_date d ON ptn.date_id = d.date_id
+GROUP BY ptn.player1_id,
+    p1.player_name,
+    ptn.player2_id,
+    p2.player_name,
     t.team_name,
-    ptn.season
+    d.season
 HAVING COUNT(*) >= 3
-ORDER BY total_partnership_runs DESC;
+ORDER BY total_partnership_runs DESC
+WITH NO DATA;
 CREATE INDEX idx_partnership_players ON mart_partnership_analysis(player1_id, player2_id);
 CREATE INDEX idx_partnership_season ON mart_partnership_analysis(season);
 CREATE INDEX idx_partnership_total ON mart_partnership_analysis(total_partnership_runs DESC);
@@ -704,7 +597,8 @@ GROUP BY v.venue_id,
     d.season
 HAVING COUNT(DISTINCT f.match_id) >= 5
 ORDER BY season DESC,
-    total_matches DESC;
+    total_matches DESC
+WITH NO DATA;
 CREATE INDEX idx_venue_analytics_venue ON mart_venue_analytics(venue_id);
 CREATE INDEX idx_venue_analytics_season ON mart_venue_analytics(season);
 CREATE INDEX idx_venue_analytics_type ON mart_venue_analytics(venue_type);
@@ -716,42 +610,16 @@ CREATE MATERIALIZED VIEW mart_player_stats AS WITH batting_stats AS (
     SELECT f.batter_id as player_id,
         d.season,
         COUNT(DISTINCT f.match_id) as matches_batted,
-        COUNT(DISTINCT CONCAT(f.match_id, '-', f.innings)) as innings_batted,
-        SUM(f.runs_scored) as total_runs,
-        COUNT(*) as balls_faced,
-        SUM(
-            CASE
-                WHEN f.is_six THEN 1
-                ELSE 0
-            END
-        ) as sixes,
-        SUM(
-            CASE
-                WHEN f.is_four THEN 1
-                ELSE 0
-            END
-        ) as fours,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as boundaries,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as dots_played,
-        SUM(
-            CASE
-                WHEN f.is_wicket
-                AND f.batter_id = f.player_out_id THEN 1
-                ELSE 0
-            END
-        ) as times_dismissed,
-        MAX(f.batter_runs) as highest_score
-    FROM fact_ball_delivery f
+        COUNT(*) as innings_batted,
+        SUM(f.runs) as total_runs,
+        SUM(f.balls) as balls_faced,
+        SUM(f.sixes) as sixes,
+        SUM(f.fours) as fours,
+        SUM(f.boundaries) as boundaries,
+        SUM(f.dots) as dots_played,
+        SUM(f.dismissals) as times_dismissed,
+        MAX(f.highest_batter_runs) as highest_score
+    FROM fact_batter_innings f
         JOIN dim_date d ON f.date_id = d.date_id
     GROUP BY f.batter_id,
         d.season
@@ -760,43 +628,15 @@ bowling_stats AS (
     SELECT f.bowler_id as player_id,
         d.season,
         COUNT(DISTINCT f.match_id) as matches_bowled,
-        COUNT(
-            CASE
-                WHEN f.is_valid_ball THEN 1
-            END
-        ) as balls_bowled,
-        SUM(f.runs_bowler) as runs_conceded,
-        SUM(
-            CASE
-                WHEN f.is_wicket THEN 1
-                ELSE 0
-            END
-        ) as wickets,
-        SUM(
-            CASE
-                WHEN f.is_dot_ball THEN 1
-                ELSE 0
-            END
-        ) as dot_balls_bowled,
-        SUM(
-            CASE
-                WHEN f.is_boundary THEN 1
-                ELSE 0
-            END
-        ) as boundaries_conceded,
-        MAX(
-            (
-                SELECT COUNT(*)
-                FROM fact_ball_delivery f2
-                WHERE f2.match_id = f.match_id
-                    AND f2.innings = f.innings
-                    AND f2.bowler_id = f.bowler_id
-                    AND f2.is_wicket = TRUE
-            )
-        ) as best_bowling_wickets
-    FROM fact_ball_delivery f
+        SUM(f.balls) as balls_bowled,
+        SUM(f.runs_conceded) as runs_conceded,
+        SUM(f.wickets) as wickets,
+        SUM(f.dots) as dot_balls_bowled,
+        SUM(f.boundaries) as boundaries_conceded,
+        MAX(f.all_wickets) as best_bowling_wickets
+    FROM fact_bowler_innings f
         JOIN dim_date d ON f.date_id = d.date_id
-    WHERE f.is_valid_ball = TRUE
+    WHERE f.balls > 0
     GROUP BY f.bowler_id,
         d.season
 )
@@ -905,7 +745,8 @@ FROM dim_player p
 WHERE bs.player_id IS NOT NULL
     OR bws.player_id IS NOT NULL
 ORDER BY season DESC,
-    runs DESC;
+    runs DESC
+WITH NO DATA;
 CREATE INDEX idx_player_stats_player ON mart_player_stats(player_id);
 CREATE INDEX idx_player_stats_season ON mart_player_stats(season);
 CREATE INDEX idx_player_stats_runs ON mart_player_stats(runs DESC);
@@ -0,0 +1,21 @@
+-- ================================================
+-- ETL RUN HISTORY (one row per pipeline run)
+-- ================================================
+SET search_path TO ipl_analytics;
+CREATE TABLE etl_run_history (
+    run_id BIGSERIAL PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP,
+    status VARCHAR(20) NOT NULL,
+    source_file VARCHAR(500),
+    rows_processed INTEGER,
+    duration_seconds DECIMAL(10, 3),
+    -- Command line options (load method, workers, incremental, ...)
+    options JSONB,
+    -- {stage: {calls, seconds, cpu_seconds, rows_in, rows_out, rows_per_sec, round_trips, peak_rss_mb}}
+    stages JSONB NOT NULL,
+    error TEXT,
+    CONSTRAINT chk_run_status CHECK (status IN ('success', 'failed', 'running'))
+);
+CREATE INDEX idx_run_history_started ON etl_run_history(started_at);
+COMMENT ON TABLE etl_run_history IS 'Per-stage timings and throughput of every ETL run';
@@ -0,0 +1,82 @@
+-- ================================================
+-- STAGING (set-based ELT, see etl/staging.py)
+-- ================================================
+-- The transformed frame as COPYed by the ELT load, one row per delivery
+-- (source_row keeps the frame order). UNLOGGED: it only holds the batch in
+-- flight, so it skips the WAL and is emptied after every load.
+CREATE UNLOGGED TABLE staging.ball_delivery (
+    source_row BIGINT NOT NULL,
+    match_id INTEGER NOT NULL,
+    date DATE,
+    match_type TEXT,
+    event_name TEXT,
+    innings SMALLINT,
+    batting_team TEXT,
+    bowling_team TEXT,
+    "over" SMALLINT,
+    ball SMALLINT,
+    ball_no NUMERIC,
+    ball_sequence INTEGER,
+    batter TEXT,
+    bat_pos SMALLINT,
+    bowler TEXT,
+    non_striker TEXT,
+    non_striker_pos SMALLINT,
+    player_out TEXT,
+    next_batter TEXT,
+    player_of_match TEXT,
+    umpire TEXT,
+    toss_winner TEXT,
+    match_won_by TEXT,
+    venue TEXT,
+    city TEXT,
+    -- Calendar attributes of dim_date
+    day SMALLINT,
+    month SMALLINT,
+    year SMALLINT,
+    season TEXT,
+    day_of_week TEXT,
+    week_of_year SMALLINT,
+    quarter SMALLINT,
+    is_weekend BOOLEAN,
+    -- Match attributes of dim_match
+    gender TEXT,
+    team_type TEXT,
+    balls_per_over SMALLINT,
+    match_number TEXT,
+    stage TEXT,
+    -- Measures
+    runs_batter INTEGER,
+    runs_extras INTEGER,
+    runs_total INTEGER,
+    runs_bowler INTEGER,
+    balls_faced INTEGER,
+    runs_target NUMERIC,
+    runs_required NUMERIC,
+    balls_remaining INTEGER,
+    team_runs INTEGER,
+    team_balls INTEGER,
+    team_wicket INTEGER,
+    batter_runs INTEGER,
+    batter_balls INTEGER,
+    bowler_wicket INTEGER,
+    current_run_rate NUMERIC,
+    required_run_rate NUMERIC,
+    pressure_index NUMERIC,
+    match_phase TEXT,
+    -- Flags
+    is_valid_ball BOOLEAN,
+    is_wicket BOOLEAN,
+    is_boundary BOOLEAN,
+    is_six BOOLEAN,
+    is_four BOOLEAN,
+    is_dot_ball BOOLEAN,
+    is_new_batter BOOLEAN,
+    is_striker_out BOOLEAN,
+    -- Attributes
+    extra_type TEXT,
+    wicket_kind TEXT,
+    fielders TEXT,
+    batting_partners TEXT
+);
+COMMENT ON TABLE staging.ball_delivery IS 'Transformed deliveries of the ELT load in flight';